@@ -0,0 +1,236 @@
+# Admission Control - 엔드포인트/사용자별 동시 실행 제한 + 대기열
+# /api/chat, /api/analyze 요청이 한꺼번에 Azure OpenAI로 몰리지 않도록
+# 정해진 수만큼만 실행하고 나머지는 대기열에서 순서대로 기다리게 함.
+# 대기열이 가득 차거나 대기 시간이 초과되면 Retry-After와 함께 429를 즉시 반환.
+
+import asyncio
+import math
+from collections import deque
+from contextlib import asynccontextmanager
+from time import monotonic
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.config import (
+    ADMISSION_CHAT_MAX_CONCURRENT,
+    ADMISSION_CHAT_MAX_PER_USER,
+    ADMISSION_CHAT_MAX_QUEUE,
+    ADMISSION_CHAT_QUEUE_TIMEOUT,
+    ADMISSION_ANALYZE_MAX_CONCURRENT,
+    ADMISSION_ANALYZE_MAX_PER_USER,
+    ADMISSION_ANALYZE_MAX_QUEUE,
+    ADMISSION_ANALYZE_QUEUE_TIMEOUT,
+)
+
+WAIT_SAMPLE_SIZE = 1000  # 대기 시간 백분위 계산용 최근 샘플 수
+
+
+class AdmissionController:
+    """
+    엔드포인트 하나의 동시 실행 수를 제한하는 컨트롤러 (이벤트 루프 1개 기준)
+
+    사용법:
+    async with admission_controllers["chat"].slot(user['email']):
+        ...
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_per_user: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self.active_per_user = {}
+        self.waiters = deque()  # [(user_key, future), ...] FIFO
+
+        # 메트릭
+        self.admitted_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.max_queue_depth = 0
+        self.wait_samples = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self.avg_service_time = 1.0  # 요청 처리 시간 (EWMA, 초)
+
+    def _can_run(self, user_key: str) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        return self.active_per_user.get(user_key, 0) < self.max_per_user
+
+    def _has_eligible_waiter(self) -> bool:
+        """지금 바로 실행 가능한 대기 요청이 있는지 (사용자별 제한에만 걸린 대기 요청은 제외)"""
+        return any(not future.done() and self._can_run(waiter_user) for waiter_user, future in self.waiters)
+
+    def _start(self, user_key: str):
+        self.active += 1
+        self.active_per_user[user_key] = self.active_per_user.get(user_key, 0) + 1
+        self.admitted_total += 1
+
+    def _retry_after(self) -> int:
+        """대기열이 비워지기까지 걸릴 예상 시간 (초)"""
+        pending = len(self.waiters) + 1
+        estimate = self.avg_service_time * pending / max(self.max_concurrent, 1)
+        return max(1, math.ceil(estimate))
+
+    def _reject(self, reason: str):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"요청이 많아 처리할 수 없습니다 ({reason}). 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": str(self._retry_after())},
+        )
+
+    async def acquire(self, user_key: str):
+        """실행 슬롯 획득 (대기열이 가득 찼거나 시간 초과 시 429)"""
+        # 앞에 실행 가능한 대기 요청이 없으면 바로 실행
+        # (자기 사용자 제한에 걸려 기다리는 요청 때문에 다른 사용자가 막히지 않도록)
+        if self._can_run(user_key) and not self._has_eligible_waiter():
+            self._start(user_key)
+            self.wait_samples.append(0.0)
+            return
+
+        if len(self.waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            self._reject("대기열 초과")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (user_key, future)
+        self.waiters.append(entry)
+        self.max_queue_depth = max(self.max_queue_depth, len(self.waiters))
+        started = monotonic()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # 타임아웃 직전에 슬롯이 배정된 경우 - 그대로 실행
+                self.wait_samples.append(monotonic() - started)
+                return
+            self.waiters.remove(entry)
+            future.cancel()
+            self.rejected_timeout += 1
+            self._reject("대기 시간 초과")
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료 등으로 취소된 경우 배정된 슬롯 반납
+            if future.done() and not future.cancelled():
+                self.release(user_key)
+            elif entry in self.waiters:
+                self.waiters.remove(entry)
+            raise
+
+        self.wait_samples.append(monotonic() - started)
+
+    def release(self, user_key: str, service_time: float = None):
+        """실행 슬롯 반납 후 대기 중인 요청 중 실행 가능한 첫 요청을 깨움"""
+        self.active -= 1
+        remaining = self.active_per_user.get(user_key, 1) - 1
+        if remaining > 0:
+            self.active_per_user[user_key] = remaining
+        else:
+            self.active_per_user.pop(user_key, None)
+
+        if service_time is not None:
+            self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * service_time
+
+        for entry in list(self.waiters):
+            waiter_user, future = entry
+            if future.done():
+                self.waiters.remove(entry)
+                continue
+            if self._can_run(waiter_user):
+                self.waiters.remove(entry)
+                self._start(waiter_user)
+                future.set_result(True)
+                if self.active >= self.max_concurrent:
+                    break
+
+    @asynccontextmanager
+    async def slot(self, user_key: str):
+        await self.acquire(user_key)
+        started = monotonic()
+        try:
+            yield
+        finally:
+            self.release(user_key, monotonic() - started)
+
+    def snapshot(self) -> dict:
+        """현재 상태 및 누적 메트릭"""
+        waits = sorted(self.wait_samples)
+
+        def percentile(p):
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))], 3)
+
+        return {
+            "name": self.name,
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "max_per_user": self.max_per_user,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+            },
+            "active": self.active,
+            "queue_depth": len(self.waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted_total": self.admitted_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_seconds": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(waits[-1], 3) if waits else 0.0,
+            },
+            "avg_service_seconds": round(self.avg_service_time, 3),
+        }
+
+
+class SlotStreamingResponse(StreamingResponse):
+    """
+    이미 획득한 슬롯을 스트림이 끝날 때 반납하는 StreamingResponse
+    스트림이 시작되기 전에 연결이 끊겨도(제너레이터가 한 번도 돌지 않아도) 응답 처리가 끝나면 반납됨.
+    응답 객체를 만들기 전에 실패하면 호출자가 직접 release() 해야 함.
+
+    사용법:
+    await controller.acquire(user_key)
+    return SlotStreamingResponse(stream(), controller, user_key, media_type="application/x-ndjson")
+    """
+
+    def __init__(self, content, controller: AdmissionController, user_key: str, **kwargs):
+        self._controller = controller
+        self._user_key = user_key
+        self._acquired_at = monotonic()
+        self._released = False
+        super().__init__(content, **kwargs)
+
+    def release_slot(self):
+        if not self._released:
+            self._released = True
+            self._controller.release(self._user_key, monotonic() - self._acquired_at)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release_slot()
+
+
+# 전역 인스턴스 (엔드포인트별)
+admission_controllers = {
+    "chat": AdmissionController(
+        "chat",
+        ADMISSION_CHAT_MAX_CONCURRENT,
+        ADMISSION_CHAT_MAX_PER_USER,
+        ADMISSION_CHAT_MAX_QUEUE,
+        ADMISSION_CHAT_QUEUE_TIMEOUT,
+    ),
+    "analyze": AdmissionController(
+        "analyze",
+        ADMISSION_ANALYZE_MAX_CONCURRENT,
+        ADMISSION_ANALYZE_MAX_PER_USER,
+        ADMISSION_ANALYZE_MAX_QUEUE,
+        ADMISSION_ANALYZE_QUEUE_TIMEOUT,
+    ),
+}
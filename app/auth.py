@@ -91,6 +91,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     return payload
 
+optional_security = HTTPBearer(auto_error=False)
+
+async def get_optional_user(credentials: HTTPAuthorizationCredentials = Depends(optional_security)):
+    """
+    로그인했으면 사용자 정보, 아니면 None (공개 엔드포인트에서 일부 기능만 인증이 필요할 때)
+    토큰을 보냈는데 유효하지 않으면 401
+    """
+    if credentials is None:
+        return None
+    return await get_current_user(credentials)
+
 def require_role(required_role: str):
     """
     역할 기반 접근 제어
@@ -1,6 +1,12 @@
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import time
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # proto.env 파일 경로 지정
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), "proto.env"))
 
@@ -31,6 +37,99 @@ AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-pre
 # Google Gemini (추가)
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-3-pro-preview")
+# 업로드 전처리: 입력에 줄 번호를 붙여 보내고 LLM은 청크 줄 범위만 출력 (app.services.chunk_spans)
+ANALYZE_SEGMENT_MAX_CHARS = int(os.getenv("ANALYZE_SEGMENT_MAX_CHARS", "400"))  # 이보다 긴 줄은 나눠서 번호 부여
+
+# 인수인계서 생성 (섹션 병렬 처리)
+HANDOVER_MAX_CONCURRENCY = int(os.getenv("HANDOVER_MAX_CONCURRENCY", "4"))  # 동시에 생성할 섹션 수
+HANDOVER_SECTION_TOP_K = int(os.getenv("HANDOVER_SECTION_TOP_K", "20"))  # 섹션별 검색 청크 수
+HANDOVER_SECTION_CONTEXT_CHARS = int(os.getenv("HANDOVER_SECTION_CONTEXT_CHARS", "12000"))  # 섹션별 컨텍스트 최대 길이
+
+# 멀티 인덱스 검색 (Federated Search)
+FEDERATED_SEARCH_TIMEOUT = float(os.getenv("FEDERATED_SEARCH_TIMEOUT", "5"))  # 인덱스별 검색 제한 시간(초)
+FEDERATED_SEARCH_MAX_INDEXES = int(os.getenv("FEDERATED_SEARCH_MAX_INDEXES", "8"))  # 한 번에 검색할 최대 인덱스 수
+FEDERATED_RRF_K = int(os.getenv("FEDERATED_RRF_K", "60"))  # Reciprocal Rank Fusion 상수
+
+# 인덱싱 배치 업로드
+INDEX_BATCH_MAX_DOCS = int(os.getenv("INDEX_BATCH_MAX_DOCS", "1000"))  # 요청당 최대 문서 수 (서비스 제한 1000)
+INDEX_BATCH_MAX_BYTES = int(os.getenv("INDEX_BATCH_MAX_BYTES", str(12 * 1024 * 1024)))  # 요청당 최대 크기 (서비스 제한 16MB)
+INDEX_UPLOAD_CONCURRENCY = int(os.getenv("INDEX_UPLOAD_CONCURRENCY", "4"))  # 동시 업로드 배치 수
+INDEX_UPLOAD_MAX_RETRIES = int(os.getenv("INDEX_UPLOAD_MAX_RETRIES", "3"))  # 실패 문서 재시도 횟수
+
+# 재색인 (processed JSON → 새 인덱스)
+REINDEX_DOWNLOAD_CONCURRENCY = int(os.getenv("REINDEX_DOWNLOAD_CONCURRENCY", "8"))  # 동시 Blob 다운로드 수
+REINDEX_EMBEDDING_BATCH_SIZE = int(os.getenv("REINDEX_EMBEDDING_BATCH_SIZE", "16"))  # 임베딩 요청당 텍스트 수
+
+# 인덱스 통계 캐시
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "300"))  # 인덱스별 문서 수/패싯 캐시 유지 시간(초)
+INDEX_LIST_CACHE_TTL = float(os.getenv("INDEX_LIST_CACHE_TTL", "300"))  # 인덱스 목록 캐시 유지 시간(초)
+
+# Admission Control (엔드포인트별 동시 실행 제한)
+# MAX_CONCURRENT: 동시에 실행할 요청 수 / MAX_PER_USER: 사용자당 동시 실행 수
+# MAX_QUEUE: 대기열 최대 길이 (초과 시 즉시 429) / QUEUE_TIMEOUT: 대기 최대 시간(초)
+ADMISSION_CHAT_MAX_CONCURRENT = int(os.getenv("ADMISSION_CHAT_MAX_CONCURRENT", "8"))
+ADMISSION_CHAT_MAX_PER_USER = int(os.getenv("ADMISSION_CHAT_MAX_PER_USER", "2"))
+ADMISSION_CHAT_MAX_QUEUE = int(os.getenv("ADMISSION_CHAT_MAX_QUEUE", "32"))
+ADMISSION_CHAT_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_CHAT_QUEUE_TIMEOUT", "10"))
+ADMISSION_ANALYZE_MAX_CONCURRENT = int(os.getenv("ADMISSION_ANALYZE_MAX_CONCURRENT", "2"))
+ADMISSION_ANALYZE_MAX_PER_USER = int(os.getenv("ADMISSION_ANALYZE_MAX_PER_USER", "1"))
+ADMISSION_ANALYZE_MAX_QUEUE = int(os.getenv("ADMISSION_ANALYZE_MAX_QUEUE", "8"))
+ADMISSION_ANALYZE_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_ANALYZE_QUEUE_TIMEOUT", "30"))
+
+# Rate Limiting ("요청 수/윈도우 초")
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | sqlite (여러 워커가 카운터 공유)
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "ratelimit.db")
+RATE_LIMIT_SWEEP_INTERVAL = float(os.getenv("RATE_LIMIT_SWEEP_INTERVAL", "60"))  # 유휴 키 정리 주기(초)
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "300/60")  # 그 외 /api/* (IP 기준)
+RATE_LIMIT_CHAT = os.getenv("RATE_LIMIT_CHAT", "30/60")  # POST /api/chat (사용자 기준)
+RATE_LIMIT_ANALYZE = os.getenv("RATE_LIMIT_ANALYZE", "10/60")  # POST /api/analyze* (사용자 기준)
+RATE_LIMIT_UPLOAD = os.getenv("RATE_LIMIT_UPLOAD", "20/60")  # POST /api/upload* (사용자 기준)
+RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "10/60")  # POST /api/auth/login (IP 기준)
+
+# 토큰 저장소 (CSRF / Refresh Token)
+TOKEN_STORE_BACKEND = os.getenv("TOKEN_STORE_BACKEND", "memory")  # memory | sqlite | redis (여러 워커 사용 시 sqlite/redis)
+TOKEN_STORE_SQLITE_PATH = os.getenv("TOKEN_STORE_SQLITE_PATH", "tokens.db")
+TOKEN_STORE_REDIS_URL = os.getenv("TOKEN_STORE_REDIS_URL", "redis://localhost:6379/0")
+TOKEN_STORE_MAX_ENTRIES = int(os.getenv("TOKEN_STORE_MAX_ENTRIES", "100000"))  # 최대 보관 토큰 수
+TOKEN_STORE_SWEEP_INTERVAL = float(os.getenv("TOKEN_STORE_SWEEP_INTERVAL", "60"))  # 만료 토큰 정리 주기(초)
+
+# 시작 시 워밍업 (클라이언트/연결/캐시 미리 준비, 완료 여부는 /api/ready)
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_LLM = os.getenv("WARMUP_LLM", "true").lower() == "true"  # OpenAI/Gemini 연결까지 미리 열기 (소량 토큰 사용)
+
+# 메트릭 (/metrics - Prometheus 텍스트 포맷)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# 업로드 처리 스케줄러 (app.ingest_scheduler)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))  # 동시에 처리할 업로드 수
+INGEST_BULK_EVERY = int(os.getenv("INGEST_BULK_EVERY", "4"))  # 둘 다 대기 중일 때 N번에 1번은 bulk 레인 처리
+INGEST_BULK_THRESHOLD = int(os.getenv("INGEST_BULK_THRESHOLD", "3"))  # 사용자 대기 작업이 이 이상이면 bulk 레인으로 분류
+INGEST_CHECKPOINT_PATH = os.getenv("INGEST_CHECKPOINT_PATH", "ingest_checkpoints.db")  # 단계별 체크포인트 (재시작 후 재개)
+INGEST_RESUME_ON_STARTUP = os.getenv("INGEST_RESUME_ON_STARTUP", "true").lower() == "true"
+
+# 로깅 (app.logging_setup)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # text | json
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # 출력 대기 로그 수 (초과분은 버림)
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))  # DEBUG 레벨에서 큰 페이로드를 남길 비율
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))  # 페이로드 로그 최대 길이
+
+# LLM/임베딩 호출 텔레메트리 (/api/admin/llm)
+LLM_TELEMETRY_WINDOW_SECONDS = float(os.getenv("LLM_TELEMETRY_WINDOW_SECONDS", "3600"))  # 집계 구간(초)
+LLM_TELEMETRY_MAX_SAMPLES = int(os.getenv("LLM_TELEMETRY_MAX_SAMPLES", "2000"))  # (배포, 호출 위치)별 보관 호출 수
+
+# LLM 모델 라우팅 (app.services.model_router) - 입력 크기/파일 유형/호출 위치별로 fast / big 티어 선택
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"  # false면 항상 big 티어
+GEMINI_FAST_MODEL = os.getenv("GEMINI_FAST_MODEL", "gemini-2.5-flash")  # 전처리 fast 티어 (big 티어는 GEMINI_MODEL)
+AZURE_OPENAI_FAST_CHAT_DEPLOYMENT = os.getenv("AZURE_OPENAI_FAST_CHAT_DEPLOYMENT", "")  # 채팅/인수인계서 fast 티어 배포 (비우면 big 티어 사용)
+MODEL_ROUTE_PREPROCESS_FAST_MAX_CHARS = int(os.getenv("MODEL_ROUTE_PREPROCESS_FAST_MAX_CHARS", "8000"))  # 이하 길이의 문서는 fast 티어
+MODEL_ROUTE_PREPROCESS_FAST_TYPES = os.getenv("MODEL_ROUTE_PREPROCESS_FAST_TYPES", "doc")  # fast 티어 허용 파일 유형 (쉼표 구분, code는 기본 제외)
+MODEL_ROUTE_CHAT_FAST_MAX_QUERY_CHARS = int(os.getenv("MODEL_ROUTE_CHAT_FAST_MAX_QUERY_CHARS", "200"))  # 짧은 질문만 fast 티어
+MODEL_ROUTE_CHAT_FAST_MAX_CONTEXT_CHARS = int(os.getenv("MODEL_ROUTE_CHAT_FAST_MAX_CONTEXT_CHARS", "12000"))  # 검색 컨텍스트가 이하일 때만
+MODEL_ROUTE_CHAT_BIG_KEYWORDS = os.getenv("MODEL_ROUTE_CHAT_BIG_KEYWORDS", "인수인계,작성,정리,분석,비교,요약")  # 포함되면 big 티어 (쉼표 구분)
+MODEL_ROUTE_HANDOVER_FAST_MAX_CHARS = int(os.getenv("MODEL_ROUTE_HANDOVER_FAST_MAX_CHARS", "3000"))  # 자료가 적은 섹션은 fast 티어
+MODEL_ROUTE_OVERRIDES = os.getenv("MODEL_ROUTE_OVERRIDES", "")  # 호출 위치별 고정 티어 (예: "chat_with_context=big,generate_handover_section=fast")
 
 # ===== NEW: Key Vault 설정 =====
 
@@ -39,18 +138,53 @@ ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 
 # ===== NEW: Key Vault 클라이언트 초기화 =====
 
-from azure.identity import DefaultAzureCredential
-from azure.keyvault.secrets import SecretClient
+# azure.identity / azure.keyvault는 처음 사용할 때 import (앱 시작 시간 단축)
+
+# 시크릿 캐시: TTL 동안 재사용, 조회할 때마다 만료 SECRET_REFRESH_AHEAD초 전에 백그라운드 갱신을 예약
+# (예약 갱신이 실패해도 그 구간에 읽히면 캐시 값을 반환하면서 다시 갱신 시도)
+SECRET_CACHE_TTL = float(os.getenv("SECRET_CACHE_TTL", "3600"))
+SECRET_REFRESH_AHEAD = float(os.getenv("SECRET_REFRESH_AHEAD", "300"))
+# 시작 시 병렬로 미리 조회할 시크릿 이름 (쉼표 구분)
+PRELOAD_SECRETS = [name.strip() for name in os.getenv("PRELOAD_SECRETS", "").split(",") if name.strip()]
+# 시작 시 미리 받아둘 액세스 토큰 scope
+CREDENTIAL_PREFETCH_SCOPES = [
+    "https://vault.azure.net/.default",
+    "https://storage.azure.com/.default",
+]
+
+_credential = None
+_credential_lock = threading.Lock()
 
 def get_credential():
-    """Azure 자격증명 가져오기"""
-    if ENVIRONMENT == "development":
-        # 로컬 개발: Azure CLI 자격증명 사용
-        # 먼저 `az login` 실행해야 함
-        return DefaultAzureCredential()
-    else:
-        # 프로덕션: Managed Identity 사용
-        return DefaultAzureCredential()
+    """
+    Azure 자격증명 가져오기 (싱글톤)
+    DefaultAzureCredential은 사용 가능한 공급자를 차례로 탐색하느라 첫 토큰 발급이 수 초 걸릴 수 있으므로
+    인스턴스를 재사용해서 발급된 토큰 캐시를 공유함
+    """
+    global _credential
+    if _credential is None:
+        with _credential_lock:
+            if _credential is None:
+                from azure.identity import DefaultAzureCredential
+
+                if ENVIRONMENT == "development":
+                    # 로컬 개발: Azure CLI 자격증명 사용
+                    # 먼저 `az login` 실행해야 함
+                    _credential = DefaultAzureCredential()
+                else:
+                    # 프로덕션: Managed Identity 사용
+                    _credential = DefaultAzureCredential()
+    return _credential
+
+def prefetch_credential_token(scopes: list = None):
+    """공급자 탐색 + 토큰 발급을 미리 수행 (이후 요청은 캐시된 토큰 사용)"""
+    credential = get_credential()
+    for scope in scopes or CREDENTIAL_PREFETCH_SCOPES:
+        try:
+            credential.get_token(scope)
+            logger.info(f"✅ 토큰 미리 발급: {scope}")
+        except Exception as e:
+            logger.warning(f"⚠️ 토큰 미리 발급 실패 ({scope}): {e}")
 
 _keyvault_client = None
 
@@ -59,15 +193,65 @@ def get_keyvault_client():
     global _keyvault_client
     if _keyvault_client is None:
         try:
+            from azure.keyvault.secrets import SecretClient
+
             credential = get_credential()
             _keyvault_client = SecretClient(vault_url=KEYVAULT_URL, credential=credential)
-            print(f"✅ Key Vault 연결 성공: {KEYVAULT_URL}")
+            logger.info(f"✅ Key Vault 연결 성공: {KEYVAULT_URL}")
         except Exception as e:
-            print(f"⚠️ Key Vault 연결 실패: {e}")
+            logger.warning(f"⚠️ Key Vault 연결 실패: {e}")
     return _keyvault_client
 
+_secret_cache = {}  # {secret_name: (value, fetched_at)}
+_secret_refreshing = set()  # 백그라운드 갱신 중인 시크릿 이름
+_secret_timers = {}  # {secret_name: threading.Timer} 예약된 갱신
+_secret_lock = threading.Lock()
+
+def _fetch_secret(secret_name: str) -> str:
+    """Key Vault에서 조회 후 캐시에 저장하고 다음 갱신 예약 (실패 시 None)"""
+    try:
+        client = get_keyvault_client()
+        if client:
+            value = client.get_secret(secret_name).value
+            with _secret_lock:
+                _secret_cache[secret_name] = (value, time())
+            _schedule_secret_refresh(secret_name)
+            return value
+    except Exception as e:
+        logger.warning(f"⚠️ Key Vault에서 {secret_name} 조회 실패: {e}")
+    return None
+
+def _refresh_secret_in_background(secret_name: str):
+    with _secret_lock:
+        if secret_name in _secret_refreshing:
+            return
+        _secret_refreshing.add(secret_name)
+
+    def run():
+        try:
+            _fetch_secret(secret_name)
+        finally:
+            with _secret_lock:
+                _secret_refreshing.discard(secret_name)
+
+    threading.Thread(target=run, name=f"secret-refresh-{secret_name}", daemon=True).start()
+
+def _schedule_secret_refresh(secret_name: str):
+    """만료 SECRET_REFRESH_AHEAD초 전에 백그라운드 갱신 (요청 경로에서 Key Vault를 기다리지 않도록)"""
+    delay = SECRET_CACHE_TTL - SECRET_REFRESH_AHEAD
+    if delay <= 0:
+        return
+    timer = threading.Timer(delay, _refresh_secret_in_background, args=(secret_name,))
+    timer.daemon = True
+    with _secret_lock:
+        previous = _secret_timers.get(secret_name)
+        _secret_timers[secret_name] = timer
+    if previous:
+        previous.cancel()
+    timer.start()
+
 def get_secret(secret_name: str) -> str:
-    """Key Vault에서 시크릿 가져오기 (캐싱 없음)"""
+    """Key Vault에서 시크릿 가져오기 (TTL 캐시 + 만료 전 예약 갱신)"""
     
     # 로컬 개발: 먼저 .env에서 확인
     if ENVIRONMENT == "development":
@@ -75,14 +259,27 @@ def get_secret(secret_name: str) -> str:
         if env_value:
             return env_value
     
+    # 캐시 확인
+    cached = _secret_cache.get(secret_name)
+    if cached:
+        value, fetched_at = cached
+        age = time() - fetched_at
+        if age < SECRET_CACHE_TTL - SECRET_REFRESH_AHEAD:
+            return value
+        if age < SECRET_CACHE_TTL:
+            # 곧 만료인데 예약 갱신이 아직 반영되지 않음: 캐시 값을 바로 반환하고 갱신은 백그라운드에서
+            _refresh_secret_in_background(secret_name)
+            return value
+    
     # Key Vault에서 가져오기
-    try:
-        client = get_keyvault_client()
-        if client:
-            secret = client.get_secret(secret_name)
-            return secret.value
-    except Exception as e:
-        print(f"⚠️ Key Vault에서 {secret_name} 조회 실패: {e}")
+    value = _fetch_secret(secret_name)
+    if value is not None:
+        return value
+    
+    # 조회 실패 시 만료된 캐시 값이라도 있으면 사용
+    if cached:
+        logger.warning(f"⚠️ {secret_name}: 만료된 캐시 값 사용")
+        return cached[0]
     
     # 환경변수에도 없고 Key Vault도 실패 시
     if ENVIRONMENT == "development":
@@ -90,6 +287,32 @@ def get_secret(secret_name: str) -> str:
     else:
         raise Exception(f"필수 시크릿 {secret_name}을(를) 찾을 수 없습니다")
 
+def preload_secrets(secret_names: list = None, max_workers: int = 8) -> dict:
+    """
+    시작 시 시크릿을 병렬로 미리 조회해서 캐시에 채움 (토큰 미리 발급 포함)
+    Returns: {secret_name: 성공 여부}
+    """
+    secret_names = PRELOAD_SECRETS if secret_names is None else secret_names
+    started = time()
+
+    # 공급자 탐색/토큰 발급을 먼저 한 번만 수행 (각 스레드가 동시에 탐색하지 않도록)
+    prefetch_credential_token()
+    if not secret_names:
+        return {}
+
+    def load(secret_name):
+        try:
+            return secret_name, bool(get_secret(secret_name))
+        except Exception as e:
+            logger.warning(f"⚠️ 시크릿 미리 조회 실패 ({secret_name}): {e}")
+            return secret_name, False
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(secret_names))) as executor:
+        results = dict(executor.map(load, secret_names))
+
+    logger.info(f"✅ 시크릿 {sum(results.values())}/{len(results)}개 미리 조회 ({time() - started:.2f}s)")
+    return results
+
 # ===== 환경변수 검증 (기존) =====
 
 def validate_config():
@@ -106,6 +329,5 @@ def validate_config():
     
     missing = [name for name, value in required if not value]
     if missing:
-        print(f"⚠️ Missing environment variables: {', '.join(missing)}")
-        print("   Please check your proto.env file")
+        logger.warning(f"⚠️ Missing environment variables: {', '.join(missing)} - please check your proto.env file")
     return len(missing) == 0
\ No newline at end of file
@@ -0,0 +1,181 @@
+# 업로드 파이프라인 체크포인트 (SQLite)
+# 프로세스가 재시작되면 메모리의 task 상태와 스케줄러 대기열이 사라짐.
+# 작업별로 마지막으로 끝난 단계를 파일 DB에 기록해 두고, 시작 시(또는 재시도 요청 시) 그 다음 단계부터 이어서 처리.
+#
+# 단계 (stage):
+# - received:      업로드 요청 접수 (원본 바이트는 아직 메모리에만 있음 → 재시작되면 복구 불가, 다시 업로드 필요)
+# - raw_uploaded:  원본 Blob 저장 완료 → 재개 시 업로드 생략, Blob에서 다시 읽어 텍스트 추출부터
+# - processed:     Gemini 결과({task_id}_processed.json) 저장 완료 → 재개 시 Gemini 재호출 없이 인덱싱만
+#                  (인덱스에 이미 들어간 청크는 stable id로 걸러지므로 남은 청크만 임베딩)
+# 인덱싱까지 끝나거나 취소되면 행 삭제. 실패하면 status="failed"로 남겨서 재시도 가능.
+#
+# owner_pid / owner_token: 작업을 맡은 프로세스. 시작 시 주인이 없어진 작업만 가져감
+# (같은 호스트의 여러 uvicorn 워커가 같은 작업을 중복 재개하지 않도록 UPDATE 조건으로 선점)
+
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from time import time
+
+from app.config import INGEST_CHECKPOINT_PATH
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("received", "raw_uploaded", "processed")
+
+# 현재 프로세스 식별자 (컨테이너 재시작 후 같은 pid를 다시 받는 경우 구분용)
+_OWNER_TOKEN = uuid.uuid4().hex
+
+_COLUMNS = ("task_id", "stage", "status", "file_name", "file_ext", "index_name", "user", "lane", "size",
+            "raw_blob", "processed_blob", "error", "owner_pid", "owner_token", "created_at", "updated_at", "source_path")
+
+
+def _pid_alive(pid: int) -> bool:
+    if not pid:
+        return False
+    if os.name == "nt":
+        import ctypes
+
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _owner_alive(row: dict) -> bool:
+    if row["owner_pid"] == os.getpid():
+        return row["owner_token"] == _OWNER_TOKEN
+    return _pid_alive(row["owner_pid"])
+
+
+class IngestCheckpointStore:
+    def __init__(self, path: str = INGEST_CHECKPOINT_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS ingest_checkpoints ("
+                        " task_id TEXT PRIMARY KEY, stage TEXT, status TEXT, file_name TEXT, file_ext TEXT,"
+                        " index_name TEXT, user TEXT, lane TEXT, size INTEGER, raw_blob TEXT, processed_blob TEXT,"
+                        " error TEXT, owner_pid INTEGER, owner_token TEXT, created_at REAL, updated_at REAL,"
+                        " source_path TEXT)"
+                    )
+                    # source_path 컬럼 이전에 만든 DB
+                    columns = {row[1] for row in conn.execute("PRAGMA table_info(ingest_checkpoints)")}
+                    if "source_path" not in columns:
+                        conn.execute("ALTER TABLE ingest_checkpoints ADD COLUMN source_path TEXT")
+                    self._initialized = True
+        return conn
+
+    def _row(self, values) -> dict:
+        return dict(zip(_COLUMNS, values)) if values else None
+
+    # ===== 기록 =====
+
+    def create(self, task_id: str, file_name: str, file_ext: str, index_name: str, user: str,
+               lane: str, size: int, source_path: str = None):
+        """업로드 접수 (stage=received, status=queued)"""
+        now = time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO ingest_checkpoints"
+            " (task_id, stage, status, file_name, file_ext, index_name, user, lane, size,"
+            "  owner_pid, owner_token, created_at, updated_at, source_path)"
+            " VALUES (?, 'received', 'queued', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (task_id, file_name, file_ext, index_name, user, lane, size, os.getpid(), _OWNER_TOKEN, now, now,
+             source_path)
+        )
+
+    def advance(self, task_id: str, stage: str, raw_blob: str = None, processed_blob: str = None):
+        """단계 완료 기록 (Blob 이름은 지정한 것만 갱신)"""
+        self._connect().execute(
+            "UPDATE ingest_checkpoints SET stage = ?, raw_blob = COALESCE(?, raw_blob),"
+            " processed_blob = COALESCE(?, processed_blob), updated_at = ? WHERE task_id = ?",
+            (stage, raw_blob, processed_blob, time(), task_id)
+        )
+
+    def mark_running(self, task_id: str):
+        self._connect().execute(
+            "UPDATE ingest_checkpoints SET status = 'running', error = NULL, owner_pid = ?, owner_token = ?,"
+            " updated_at = ? WHERE task_id = ?",
+            (os.getpid(), _OWNER_TOKEN, time(), task_id)
+        )
+
+    def mark_failed(self, task_id: str, error: str):
+        self._connect().execute(
+            "UPDATE ingest_checkpoints SET status = 'failed', error = ?, updated_at = ? WHERE task_id = ?",
+            (error, time(), task_id)
+        )
+
+    def delete(self, task_id: str):
+        self._connect().execute("DELETE FROM ingest_checkpoints WHERE task_id = ?", (task_id,))
+
+    # ===== 조회 / 재개 =====
+
+    def get(self, task_id: str):
+        return self._row(self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM ingest_checkpoints WHERE task_id = ?", (task_id,)
+        ).fetchone())
+
+    def claim(self, task_id: str, include_failed: bool = True):
+        """
+        작업을 현재 프로세스가 가져감 (주인이 없어진 queued/running 작업, include_failed면 failed 작업 포함)
+        다른 프로세스가 먼저 가져갔거나 아직 처리 중이면 None
+        """
+        row = self.get(task_id)
+        if row is None:
+            return None
+        if row["status"] == "failed":
+            if not include_failed:
+                return None
+        elif _owner_alive(row):
+            return None
+        claimed = self._connect().execute(
+            "UPDATE ingest_checkpoints SET status = 'queued', owner_pid = ?, owner_token = ?, updated_at = ?"
+            " WHERE task_id = ? AND status = ? AND owner_pid IS ? AND owner_token IS ?",
+            (os.getpid(), _OWNER_TOKEN, time(), task_id, row["status"], row["owner_pid"], row["owner_token"])
+        ).rowcount
+        if not claimed:
+            return None
+        return {**row, "status": "queued", "owner_pid": os.getpid(), "owner_token": _OWNER_TOKEN}
+
+    def claim_orphans(self) -> list:
+        """주인 프로세스가 없어진 queued/running 작업 전부 가져옴 (시작 시 재개용)"""
+        rows = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM ingest_checkpoints WHERE status IN ('queued', 'running')"
+            " ORDER BY created_at"
+        ).fetchall()
+        claimed = []
+        for values in rows:
+            row = self._row(values)
+            if _owner_alive(row):
+                continue
+            row = self.claim(row["task_id"], include_failed=False)
+            if row is not None:
+                claimed.append(row)
+        return claimed
+
+
+# 전역 인스턴스
+ingest_checkpoints = IngestCheckpointStore()
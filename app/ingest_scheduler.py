@@ -0,0 +1,334 @@
+# 업로드 처리 스케줄러 (공정 + 우선순위 큐)
+# 업로드 파이프라인(process_file_background)을 도착 순서대로 실행하면
+# 한 사용자가 올린 대용량 PDF 묶음 뒤에서 다른 사용자의 작은 메모가 몇 분씩 기다리게 됨.
+#
+# - 레인(lane): interactive(단일 파일 업로드) / bulk(대량 업로드)
+#   interactive를 우선 처리하되, 둘 다 대기 중이면 INGEST_BULK_EVERY번에 한 번은 bulk 처리 (기아 방지)
+#   lane을 지정하지 않으면, 같은 사용자의 대기 작업이 INGEST_BULK_THRESHOLD개 이상일 때 bulk로 분류
+# - 공정 큐: 레인 안에서 (사용자, 인덱스)별 flow로 나누고, 지금까지 처리한 비용이 가장 적은 flow부터 처리
+#   (Start-time Fair Queuing - 새로 들어온 flow는 레인의 가상 시간부터 시작해서 몰아받지 않음)
+# - 비용: 파일 크기 × 유형 가중치 (텍스트/코드 < DOCX < PDF/이미지) → 작은 텍스트 파일이 먼저
+#   같은 flow 안에서도 비용이 작은 작업부터 처리
+#
+# 작업은 INGEST_WORKERS개의 워커 스레드에서 동기 함수로 실행됨.
+# 파이프라인은 자기 오류를 잡아서 task 상태로 남기므로, 성공/실패는 실행 후 task 상태로 판단.
+
+import heapq
+import itertools
+import logging
+import threading
+from time import time
+
+from app.config import INGEST_BULK_EVERY, INGEST_BULK_THRESHOLD, INGEST_WORKERS
+from app.logging_setup import propagate_context
+from app.state import task_manager
+
+logger = logging.getLogger(__name__)
+
+LANES = ("interactive", "bulk")
+
+# 파일 유형별 비용 가중치 (텍스트 추출 + LLM 처리 비용 기준)
+TEXT_EXTENSIONS = {'txt', 'py', 'js', 'java', 'c', 'cpp', 'h', 'cs', 'ts', 'tsx', 'html', 'css', 'json', 'md'}
+TYPE_COST_WEIGHTS = {"text": 1.0, "docx": 2.0, "other": 4.0}  # other: PDF/이미지 (Document Intelligence 경유)
+BASE_COST_BYTES = 64 * 1024  # 파일 크기와 무관한 고정 비용 (LLM 호출 1회 등)
+
+
+def estimate_cost(size: int, file_ext: str) -> float:
+    if file_ext in TEXT_EXTENSIONS:
+        weight = TYPE_COST_WEIGHTS["text"]
+    elif file_ext == "docx":
+        weight = TYPE_COST_WEIGHTS["docx"]
+    else:
+        weight = TYPE_COST_WEIGHTS["other"]
+    return (BASE_COST_BYTES + size) * weight
+
+
+class _Job:
+    __slots__ = ("task_id", "fn", "args", "user", "index_name", "lane", "cost", "seq", "enqueued_at")
+
+    def __init__(self, task_id, fn, args, user, index_name, lane, cost, seq):
+        self.task_id = task_id
+        self.fn = fn
+        self.args = args
+        self.user = user
+        self.index_name = index_name
+        self.lane = lane
+        self.cost = cost
+        self.seq = seq
+        self.enqueued_at = time()
+
+
+class _Lane:
+    """레인 하나의 flow별 대기열 (Start-time Fair Queuing)"""
+
+    def __init__(self):
+        self.flows = {}  # flow key → [(cost, seq, job), ...] heap
+        self.served = {}  # flow key → 누적 처리 비용 (가상 시간)
+        self.virtual_time = 0.0
+
+    def __len__(self):
+        return sum(len(jobs) for jobs in self.flows.values())
+
+    def push(self, key, job):
+        jobs = self.flows.get(key)
+        if not jobs:
+            jobs = self.flows[key] = []
+            # 쉬고 있던 flow는 현재 가상 시간부터 시작 (과거에 덜 쓴 몫을 몰아서 받지 않도록)
+            self.served[key] = max(self.served.get(key, 0.0), self.virtual_time)
+        heapq.heappush(jobs, (job.cost, job.seq, job))
+
+    def _next_key(self):
+        # (처리 누적 + 다음 작업 비용)이 가장 작은 flow → 공정하면서도 작은 작업이 먼저
+        return min(
+            (key for key, jobs in self.flows.items() if jobs),
+            key=lambda key: (self.served[key] + self.flows[key][0][0], self.flows[key][0][1]),
+            default=None,
+        )
+
+    def pop(self):
+        key = self._next_key()
+        if key is None:
+            return None
+        cost, _, job = heapq.heappop(self.flows[key])
+        self.virtual_time = max(self.virtual_time, self.served[key])
+        self.served[key] += cost
+        if not self.flows[key]:
+            del self.flows[key]
+        # 오래 쉰 flow의 누적값은 정리 (가상 시간보다 작으면 의미 없음)
+        for idle in [k for k, v in self.served.items() if k not in self.flows and v <= self.virtual_time]:
+            del self.served[idle]
+        return job
+
+    def remove(self, task_id):
+        for key, jobs in self.flows.items():
+            for i, (_, _, job) in enumerate(jobs):
+                if job.task_id == task_id:
+                    jobs.pop(i)
+                    heapq.heapify(jobs)
+                    if not jobs:
+                        del self.flows[key]
+                    return job
+        return None
+
+    def copy(self):
+        lane = _Lane()
+        lane.flows = {key: list(jobs) for key, jobs in self.flows.items()}
+        lane.served = dict(self.served)
+        lane.virtual_time = self.virtual_time
+        return lane
+
+
+class IngestScheduler:
+    """
+    업로드 작업 스케줄러
+
+    사용법:
+    ingest_scheduler.submit(task_id, process_file_background, (task_id, ...), user=email,
+                            index_name=index_name, size=len(file_data), file_ext=ext)
+    """
+
+    def __init__(self, workers: int = INGEST_WORKERS, bulk_every: int = INGEST_BULK_EVERY,
+                 bulk_threshold: int = INGEST_BULK_THRESHOLD):
+        self.workers = workers
+        self.bulk_every = bulk_every
+        self.bulk_threshold = bulk_threshold
+
+        self._lanes = {lane: _Lane() for lane in LANES}
+        self._interactive_streak = 0  # bulk가 대기 중인데 interactive를 연속 처리한 횟수
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = {}  # task_id → job
+        self._stopping = False
+
+        # 대기 순서 캐시 (큐가 바뀌면 버리고, 조회된 작업 순번까지만 디스패치를 재현)
+        self._version = 0
+        self._positions = None
+
+        # 메트릭
+        self.completed_total = 0
+        self.failed_total = 0
+        self.cancelled_total = 0
+
+    # ===== 작업 등록 =====
+
+    def _pending_for_user(self, user: str) -> int:
+        return sum(
+            len(jobs)
+            for lane in self._lanes.values()
+            for (flow_user, _), jobs in lane.flows.items() if flow_user == user
+        )
+
+    def submit(self, task_id: str, fn, args: tuple, user: str, index_name: str = None,
+               size: int = 0, file_ext: str = "", lane: str = None) -> dict:
+        """작업을 대기열에 추가하고 대기 정보 반환 ({"lane", "position"})"""
+        if lane not in LANES:
+            lane = None
+        with self._cond:
+            if lane is None:
+                lane = "bulk" if self._pending_for_user(user) >= self.bulk_threshold else "interactive"
+            job = _Job(task_id, propagate_context(fn), args, user, index_name or "default", lane,
+                       estimate_cost(size, file_ext), next(self._seq))
+            self._lanes[lane].push((job.user, job.index_name), job)
+            self._version += 1
+            self._cond.notify()
+        self.start()
+        return {"lane": lane, "position": self.queue_position(task_id)}
+
+    def cancel(self, task_id: str) -> bool:
+        """아직 시작하지 않은 작업을 대기열에서 제거"""
+        with self._cond:
+            for lane in self._lanes.values():
+                if lane.remove(task_id) is not None:
+                    self._version += 1
+                    return True
+        return False
+
+    # ===== 디스패치 =====
+
+    def _pop_next(self):
+        interactive, bulk = self._lanes["interactive"], self._lanes["bulk"]
+        if len(bulk) and (not len(interactive) or self._interactive_streak >= self.bulk_every - 1):
+            self._interactive_streak = 0
+            return bulk.pop()
+        if len(interactive):
+            self._interactive_streak = self._interactive_streak + 1 if len(bulk) else 0
+            return interactive.pop()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._pop_next()
+                while job is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait()
+                    job = self._pop_next()
+                self._running[job.task_id] = job
+                self._version += 1
+
+            waited = time() - job.enqueued_at
+            logger.info(f"▶️ Ingest job {job.task_id} started ({job.lane}, user={job.user}, waited {waited:.1f}s)")
+            outcome = "failed"
+            try:
+                job.fn(*job.args)
+                outcome = _outcome(job.task_id)
+            except Exception as e:
+                logger.exception(f"❌ Ingest job {job.task_id} failed: {e}")
+            finally:
+                with self._cond:
+                    self._running.pop(job.task_id, None)
+                    self._version += 1
+                    if outcome == "failed":
+                        self.failed_total += 1
+                    elif outcome == "cancelled":
+                        self.cancelled_total += 1
+                    else:
+                        self.completed_total += 1
+
+    def start(self):
+        with self._cond:
+            self._stopping = False
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._worker, name=f"ingest-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        """대기 작업 처리를 멈추고 워커 종료 (실행 중인 작업은 끝까지 진행)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    # ===== 조회 =====
+
+    def _simulation(self):
+        """현재 대기열 복사본 - 여기서 _pop_next를 반복하면 실제 디스패치 순서와 같음"""
+        simulation = IngestScheduler.__new__(IngestScheduler)
+        simulation._lanes = {name: lane.copy() for name, lane in self._lanes.items()}
+        simulation._interactive_streak = self._interactive_streak
+        simulation.bulk_every = self.bulk_every
+        return simulation
+
+    def queue_position(self, task_id: str):
+        """
+        대기 순번 (1 = 다음 차례). 실행 중이면 0, 대기열에 없으면 None
+        순번은 디스패치 순서를 재현해서 구하되, 조회한 작업 차례까지만 진행하고 이어서 쓸 수 있게 보관
+        (같은 버전에서 앞쪽 작업 상태 조회가 많으므로 대기열 전체를 매번 재현하지 않음)
+        """
+        with self._cond:
+            if task_id in self._running:
+                return 0
+            if not any(job.task_id == task_id for lane in self._lanes.values()
+                       for jobs in lane.flows.values() for _, _, job in jobs):
+                return None
+            if self._positions is None or self._positions["version"] != self._version:
+                self._positions = {"version": self._version, "simulation": self._simulation(), "positions": {}}
+            state = self._positions
+            positions = state["positions"]
+            while task_id not in positions:
+                job = state["simulation"]._pop_next()
+                if job is None:
+                    return None
+                positions[job.task_id] = len(positions) + 1
+            return positions[task_id]
+
+    def owner_of(self, task_id: str):
+        """대기 중이거나 실행 중인 작업의 업로드 사용자 (없으면 None)"""
+        with self._cond:
+            job = self._find(task_id)
+            return job.user if job else None
+
+    def _find(self, task_id: str):
+        return self._running.get(task_id) or next(
+            (job for lane in self._lanes.values() for jobs in lane.flows.values()
+             for _, _, job in jobs if job.task_id == task_id),
+            None,
+        )
+
+    def queue_info(self, task_id: str):
+        position = self.queue_position(task_id)
+        if position is None:
+            return None
+        with self._cond:
+            queued = sum(len(lane) for lane in self._lanes.values())
+            job = self._find(task_id)
+        return {
+            "position": position,
+            "queued": queued,
+            "lane": job.lane if job else None,
+            "waiting_seconds": round(time() - job.enqueued_at, 1) if job and position else 0,
+        }
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            lanes = {
+                name: {
+                    "queued": len(lane),
+                    "flows": {f"{user}:{index}": len(jobs) for (user, index), jobs in lane.flows.items()},
+                }
+                for name, lane in self._lanes.items()
+            }
+            return {
+                "workers": self.workers,
+                "running": len(self._running),
+                "lanes": lanes,
+                "completed_total": self.completed_total,
+                "failed_total": self.failed_total,
+                "cancelled_total": self.cancelled_total,
+            }
+
+
+def _outcome(task_id: str) -> str:
+    """실행이 끝난 작업의 결과 ("completed" / "failed" / "cancelled") - task 상태 기준"""
+    task = task_manager.get_task(task_id)
+    status = task["status"] if task else None
+    if status in ("failed", "cancelled"):
+        return status
+    return "completed"
+
+
+# 전역 인스턴스
+ingest_scheduler = IngestScheduler()
@@ -0,0 +1,233 @@
+# 구조화 로깅 설정
+# - 큐 기반 비동기 핸들러: 호출한 스레드는 큐에 넣기만 하고, 실제 출력은 별도 리스너 스레드에서 처리
+#   (큐가 가득 차면 기다리지 않고 버림 - 로그 때문에 요청 처리 스레드가 막히지 않도록)
+# - 요청/작업 상관관계 ID: 모든 로그에 request_id / task_id 자동 첨부
+# - 큰 페이로드(LLM 응답, 사용자 메시지 등)는 log_payload()로 DEBUG 레벨 + 샘플링 + 길이 제한
+#
+# 각 모듈은 표준 방식대로 logger = logging.getLogger(__name__) 사용,
+# 앱 시작 시(main.py, CLI) setup_logging() 1회 호출.
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from app.config import (
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_PAYLOAD_MAX_CHARS,
+    LOG_PAYLOAD_SAMPLE_RATE,
+    LOG_QUEUE_SIZE,
+)
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+task_id_var = contextvars.ContextVar("task_id", default=None)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# 시끄러운 SDK 로거 (요청마다 헤더 전체를 INFO로 남김)
+_NOISY_LOGGERS = ("azure.core.pipeline.policies.http_logging_policy", "azure.identity", "httpx", "httpcore", "openai")
+
+# LogRecord 기본 속성 (JSON 출력 시 extra 필드만 골라내기 위해)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "task_id"}
+
+_listener = None
+_queue_handler = None
+_setup_lock = threading.Lock()
+
+
+class ContextFilter(logging.Filter):
+    """로그를 남긴 시점(호출 스레드)의 request_id / task_id를 레코드에 복사"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        record.task_id = task_id_var.get()
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 버리고 개수만 셈 (호출 스레드를 막지 않음)"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # 메시지/예외는 호출 스레드에서 문자열로 확정 (args 객체가 나중에 바뀌는 것 방지)
+        record = logging.makeLogRecord(record.__dict__)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "task_id", None):
+            entry["task_id"] = record.task_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s%(correlation)s %(message)s")
+
+    def format(self, record):
+        ids = [f"req={record.request_id}"] if getattr(record, "request_id", None) else []
+        if getattr(record, "task_id", None):
+            ids.append(f"task={record.task_id}")
+        record.correlation = f" [{' '.join(ids)}]" if ids else ""
+        return super().format(record)
+
+
+def setup_logging(level: str = None):
+    """루트 로거에 큐 핸들러 설치 + 출력 리스너 스레드 시작 (여러 번 호출해도 1회만 적용)"""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+
+        root = logging.getLogger()
+        root.setLevel((level or LOG_LEVEL).upper())
+        root.addHandler(queue_handler)
+        _queue_handler = queue_handler
+        for name in _NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging():
+    """남은 로그를 모두 출력하고 리스너 종료 (다시 setup_logging() 호출 가능)"""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+
+
+def dropped_log_count() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+# ===== 페이로드 로깅 =====
+
+def truncate(text, limit: int = LOG_PAYLOAD_MAX_CHARS) -> str:
+    text = str(text)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... (+{len(text) - limit} chars)"
+
+
+def log_payload(logger: logging.Logger, label: str, payload, sample_rate: float = LOG_PAYLOAD_SAMPLE_RATE):
+    """
+    큰 페이로드를 DEBUG 레벨로 샘플링해서 남김 (기본 INFO 레벨에서는 아무것도 출력하지 않음)
+    출력 길이는 LOG_PAYLOAD_MAX_CHARS로 제한
+    """
+    if not logger.isEnabledFor(logging.DEBUG) or random.random() >= sample_rate:
+        return
+    text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False, default=str)
+    logger.debug(f"{label} ({len(text)} chars): {truncate(text)}")
+
+
+# ===== 상관관계 ID =====
+
+def propagate_context(fn):
+    """
+    현재 request_id / task_id를 스레드풀 작업에 전달 (ThreadPoolExecutor는 contextvars를 복사하지 않음)
+    예: executor.submit(propagate_context(_write_batch), ...)
+    """
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        # 같은 Context를 여러 스레드에서 동시에 run할 수 없으므로 호출마다 복사본 사용
+        return context.copy().run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def bind_task(task_id: str):
+    """with 블록 안의 로그에 task_id 첨부 (백그라운드 작업용)"""
+    token = task_id_var.set(task_id)
+    try:
+        yield
+    finally:
+        task_id_var.reset(token)
+
+
+def with_task_id(fn):
+    """task_id 인자를 로그 상관관계 ID로 묶는 데코레이터 (백그라운드 작업 함수용, sync/async 모두 지원)"""
+    signature = inspect.signature(fn)
+
+    def task_id_of(args, kwargs):
+        return signature.bind_partial(*args, **kwargs).arguments.get("task_id")
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with bind_task(task_id_of(args, kwargs)):
+                return await fn(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with bind_task(task_id_of(args, kwargs)):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+async def request_id_middleware(request, call_next):
+    """요청마다 request_id 부여 (클라이언트가 X-Request-ID를 보내면 그 값 사용) + 응답 헤더로 반환"""
+    incoming = request.headers.get(REQUEST_ID_HEADER)
+    request_id = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers[REQUEST_ID_HEADER] = request_id
+    return response
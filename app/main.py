@@ -1,19 +1,59 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from app.routers import upload, chat, auth  # ← 추가: auth import
-from app.config import validate_config
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+from app.routers import upload, chat, auth, admin  # ← 추가: auth import
+from app.config import validate_config, METRICS_ENABLED, INGEST_RESUME_ON_STARTUP
+from starlette.concurrency import run_in_threadpool
+from app.ratelimit import rate_limit_middleware, rate_limiter
+from app.token_store import token_store
+from app.ingest_scheduler import ingest_scheduler
+from app.routers.upload import resume_interrupted_uploads
+from app.warmup import run_warmup, get_readiness
+from app.metrics import render_metrics
+from app.logging_setup import setup_logging, shutdown_logging, request_id_middleware
+from contextlib import asynccontextmanager
+import logging
+import asyncio
 import os
 
+logger = logging.getLogger(__name__)
 
-# 환경 변수 검증
-is_config_valid = validate_config()
-if not is_config_valid:
-    print("⚠️  Warning: Some environment variables are missing. Some features may not work correctly.")
 
+# 환경 변수 검증 결과 (lifespan에서 채움 - import 시점에는 아무 작업도 하지 않음)
+is_config_valid = None
 
-app = FastAPI(title="RAG Chatbot API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+
+    # 환경 변수 검증
+    global is_config_valid
+    is_config_valid = validate_config()
+    if not is_config_valid:
+        logger.warning("⚠️  Warning: Some environment variables are missing. Some features may not work correctly.")
+
+    rate_limiter.start_sweeper()
+    token_store.start_sweeper()
+    ingest_scheduler.start()
+    if INGEST_RESUME_ON_STARTUP:
+        try:
+            await run_in_threadpool(resume_interrupted_uploads)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to resume interrupted uploads: {e}")
+
+    # 워밍업은 백그라운드로 - 서버는 바로 뜨고 /api/ready가 완료 시점을 알려줌
+    # (시크릿/토큰 미리 조회, 클라이언트 생성 + 연결, 인덱스/컨테이너 확인, 통계 캐시 채우기)
+    warmup_task = asyncio.create_task(run_in_threadpool(run_warmup))
+    yield
+    if not warmup_task.done():
+        warmup_task.cancel()
+    ingest_scheduler.stop()
+    shutdown_logging()
+
+
+app = FastAPI(title="RAG Chatbot API", lifespan=lifespan)
 
 
 # CORS 미들웨어 설정
@@ -53,6 +93,12 @@ async def add_security_headers(request, call_next):
     
     return response
 
+# ✅ Rate Limiting 미들웨어 (라우트별 슬라이딩 윈도우 제한)
+app.middleware("http")(rate_limit_middleware)
+
+# ✅ 요청 ID 미들웨어 (가장 바깥 - 이 요청에서 남기는 모든 로그에 request_id 첨부, X-Request-ID 응답 헤더)
+app.middleware("http")(request_id_middleware)
+
 # ... 기존 라우터 등록 코드 ...
 
 # Frontend 경로
@@ -68,6 +114,7 @@ def root():
 app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
 app.include_router(chat.router, prefix="/api", tags=["Chat"])
 app.include_router(auth.router)  # ← 추가
+app.include_router(admin.router)
 
 
 # Health check endpoint
@@ -76,6 +123,20 @@ def health_check():
     return {"status": "ok", "config_valid": is_config_valid}
 
 
+# Readiness endpoint - 워밍업이 끝나기 전에는 503 (롤링 배포/Electron에서 대기용)
+@app.get("/api/ready")
+def readiness_check():
+    readiness = get_readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+
+# Prometheus 스크레이프용 (업로드 단계별 히스토그램, admission 상태 등)
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/test")
 def test():
     return {"message": "Backend is working!"}
@@ -0,0 +1,247 @@
+# 메트릭 수집 + Prometheus 텍스트 포맷 출력 (/metrics)
+# 외부 의존성 없이 히스토그램/카운터만 직접 구현 (프로세스 단위 집계 - 워커가 여러 개면 워커별로 수집)
+#
+# 업로드 파이프라인은 단계별로 stage_span()으로 감싸서
+# 소요 시간 / 바이트 / 항목 수를 기록 → task status의 "stages"와 히스토그램에 함께 반영
+#
+# 사용법:
+#   with stage_span(task_id, "extract", bytes=len(file_data)) as span:
+#       text = extract(...)
+#       span["items"] = len(text)
+
+import logging
+import threading
+from contextlib import contextmanager
+from time import perf_counter, time
+
+logger = logging.getLogger(__name__)
+
+# 히스토그램 버킷
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2)
+ITEMS_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: tuple, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self.labelnames = labelnames
+        self._series = {}  # label 값 tuple → [버킷별 개수..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    bucket_labels = _format_labels({**labels, "le": _format_value(float(bound))})
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {round(series[-2], 6)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+# 등록된 메트릭 / 수집 시점에 계산하는 gauge (함수 → 출력 라인 리스트)
+_registry = []
+_collectors = []
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def register_collector(fn):
+    _collectors.append(fn)
+    return fn
+
+
+def gauge_lines(name: str, help_text: str, samples: list) -> list:
+    """samples: [(labels dict, value), ...]"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        try:
+            lines.extend(collector())
+        except Exception as e:
+            logger.warning(f"⚠️ Metrics collector failed: {e}")
+    return "\n".join(lines) + "\n"
+
+
+# ===== 업로드 파이프라인 단계별 span =====
+
+stage_seconds = register(Histogram(
+    "ingest_stage_duration_seconds", "Wall time of each ingestion pipeline stage", SECONDS_BUCKETS, ("stage",)
+))
+stage_bytes = register(Histogram(
+    "ingest_stage_bytes", "Bytes handled by each ingestion pipeline stage", BYTES_BUCKETS, ("stage",)
+))
+stage_items = register(Histogram(
+    "ingest_stage_items", "Items (characters, chunks, documents) produced by each ingestion pipeline stage",
+    ITEMS_BUCKETS, ("stage",)
+))
+stage_failures = register(Counter(
+    "ingest_stage_failures_total", "Ingestion pipeline stages that raised an error", ("stage",)
+))
+
+
+@contextmanager
+def stage_span(task_id: str, stage: str, bytes: int = None, items: int = None):
+    """
+    파이프라인 단계 1개의 소요 시간 측정
+
+    with 블록 안에서 span["bytes"] / span["items"]를 채우면 함께 기록됨.
+    예외가 나면 status="failed"(취소면 "cancelled")로 기록하고 예외는 그대로 전파.
+    task_id가 있으면 task status의 "stages"에 추가.
+    """
+    from app.state import task_manager, TaskCancelled
+
+    span = {"stage": stage, "started_at": time(), "bytes": bytes, "items": items, "status": "ok"}
+    started = perf_counter()
+    try:
+        yield span
+    except TaskCancelled:
+        span["status"] = "cancelled"
+        raise
+    except BaseException as e:
+        span["status"] = "failed"
+        span["error"] = str(e)
+        stage_failures.inc(stage=stage)
+        raise
+    finally:
+        span["seconds"] = round(perf_counter() - started, 3)
+        stage_seconds.observe(span["seconds"], stage=stage)
+        if span["bytes"] is not None:
+            stage_bytes.observe(span["bytes"], stage=stage)
+        if span["items"] is not None:
+            stage_items.observe(span["items"], stage=stage)
+        if task_id:
+            task_manager.add_stage(task_id, {key: value for key, value in span.items() if value is not None})
+
+
+# ===== 수집 시점 gauge =====
+
+@register_collector
+def _admission_gauges() -> list:
+    from app.admission import admission_controllers
+
+    snapshots = [controller.snapshot() for controller in admission_controllers.values()]
+    lines = []
+    lines += gauge_lines("admission_active", "Requests currently running per endpoint",
+                         [({"endpoint": s["name"]}, s["active"]) for s in snapshots])
+    lines += gauge_lines("admission_queue_depth", "Requests waiting for a slot per endpoint",
+                         [({"endpoint": s["name"]}, s["queue_depth"]) for s in snapshots])
+    lines += gauge_lines("admission_max_concurrent", "Configured concurrency limit per endpoint",
+                         [({"endpoint": s["name"]}, s["limits"]["max_concurrent"]) for s in snapshots])
+    lines += gauge_lines("admission_wait_seconds_p95", "p95 queue wait over recent requests",
+                         [({"endpoint": s["name"]}, s["wait_seconds"]["p95"]) for s in snapshots])
+    lines += [
+        "# HELP admission_admitted_total Requests admitted per endpoint",
+        "# TYPE admission_admitted_total counter",
+    ] + [f'admission_admitted_total{_format_labels({"endpoint": s["name"]})} {s["admitted_total"]}' for s in snapshots]
+    lines += [
+        "# HELP admission_rejected_total Requests rejected with 429 per endpoint and reason",
+        "# TYPE admission_rejected_total counter",
+    ]
+    for s in snapshots:
+        for reason, value in (("queue_full", s["rejected_queue_full"]), ("timeout", s["rejected_timeout"])):
+            lines.append(f'admission_rejected_total{_format_labels({"endpoint": s["name"], "reason": reason})} {value}')
+    return lines
+
+
+@register_collector
+def _ingest_gauges() -> list:
+    from app.ingest_scheduler import ingest_scheduler
+
+    snapshot = ingest_scheduler.snapshot()
+    lines = gauge_lines("ingest_queue_depth", "Upload jobs waiting per scheduler lane",
+                        [({"lane": lane}, info["queued"]) for lane, info in snapshot["lanes"].items()])
+    lines += gauge_lines("ingest_workers_busy", "Upload jobs currently running", [({}, snapshot["running"])])
+    return lines
+
+
+@register_collector
+def _logging_counters() -> list:
+    from app.logging_setup import dropped_log_count
+
+    return [
+        "# HELP log_records_dropped_total Log records dropped because the log queue was full",
+        "# TYPE log_records_dropped_total counter",
+        f"log_records_dropped_total {dropped_log_count()}",
+    ]
+
+
+@register_collector
+def _task_gauges() -> list:
+    from app.state import task_manager
+
+    counts = {}
+    for task in list(task_manager.tasks.values()):
+        counts[task["status"]] = counts.get(task["status"], 0) + 1
+    return gauge_lines("ingest_tasks", "Background tasks by status",
+                       [({"status": status}, count) for status, count in sorted(counts.items())])
@@ -0,0 +1,290 @@
+# Rate Limiting - 키(IP/사용자/엔드포인트)별 슬라이딩 윈도우 카운터
+# 요청 타임스탬프 리스트 대신 키마다 (윈도우 번호, 이전 윈도우 카운트, 현재 윈도우 카운트)만 저장 → 키당 O(1) 메모리
+# 추정 요청 수 = 이전 윈도우 카운트 × (현재 윈도우에서 남은 비율) + 현재 윈도우 카운트
+#
+# 백엔드:
+# - memory: 프로세스 내부 dict (기본값). 유휴 키는 백그라운드 스레드가 주기적으로 제거
+# - sqlite: 같은 호스트의 여러 워커 프로세스가 하나의 DB 파일로 카운터 공유
+
+import logging
+import math
+import sqlite3
+import threading
+from time import time, sleep
+
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from app.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_SQLITE_PATH,
+    RATE_LIMIT_SWEEP_INTERVAL,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMIT_CHAT,
+    RATE_LIMIT_ANALYZE,
+    RATE_LIMIT_UPLOAD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_limit(value: str) -> tuple:
+    """'30/60' → (30, 60.0)  (요청 수 / 윈도우 초)"""
+    count, window = value.split("/")
+    return int(count), float(window)
+
+
+def _estimate(prev: int, curr: int, now: float, window: float) -> float:
+    elapsed = (now % window) / window
+    return prev * (1 - elapsed) + curr
+
+
+def _retry_after(now: float, window: float) -> int:
+    """현재 윈도우가 끝날 때까지 남은 시간 (초)"""
+    return max(1, math.ceil(window - (now % window)))
+
+
+class _Counter:
+    __slots__ = ("window_id", "prev", "curr", "last_seen")
+
+    def __init__(self, window_id: int):
+        self.window_id = window_id
+        self.prev = 0
+        self.curr = 0
+        self.last_seen = 0.0
+
+
+class _Sweeper:
+    """유휴 키를 주기적으로 제거하는 데몬 스레드 (요청 경로에서는 정리하지 않음)"""
+
+    def start_sweeper(self):
+        if self._sweeper is not None:
+            return
+
+        def run():
+            while True:
+                sleep(self._sweep_interval)
+                try:
+                    removed = self.sweep()
+                    if removed:
+                        logger.info(f"[RateLimit] Evicted {removed} idle keys")
+                except Exception as e:
+                    logger.warning(f"⚠️ RateLimit sweep failed: {e}")
+
+        self._sweeper = threading.Thread(target=run, name="ratelimit-sweeper", daemon=True)
+        self._sweeper.start()
+
+
+class MemoryRateLimiter(_Sweeper):
+    """프로세스 내부 슬라이딩 윈도우 카운터 (스레드 안전)"""
+
+    blocking = False  # hit()이 I/O 없이 끝남 → 이벤트 루프에서 바로 호출
+
+    def __init__(self, sweep_interval: float = RATE_LIMIT_SWEEP_INTERVAL):
+        self._counters = {}  # {key: _Counter}
+        self._windows = {}  # {key: window_seconds} - 유휴 판정용
+        self._lock = threading.Lock()
+        self._sweep_interval = sweep_interval
+        self._sweeper = None
+
+    def hit(self, key: str, limit: int, window: float) -> tuple:
+        """
+        요청 1회 기록
+
+        Returns:
+            (allowed, remaining, retry_after)
+        """
+        now = time()
+        window_id = int(now // window)
+
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = _Counter(window_id)
+                self._windows[key] = window
+            elif counter.window_id != window_id:
+                # 바로 다음 윈도우면 현재 카운트를 이전으로 넘기고, 그 이상 지났으면 초기화
+                counter.prev = counter.curr if counter.window_id == window_id - 1 else 0
+                counter.curr = 0
+                counter.window_id = window_id
+            counter.last_seen = now
+
+            estimated = _estimate(counter.prev, counter.curr, now, window)
+            if estimated >= limit:
+                return False, 0, _retry_after(now, window)
+
+            counter.curr += 1
+            return True, max(0, int(limit - estimated - 1)), 0
+
+    def sweep(self) -> int:
+        """두 윈도우 이상 요청이 없던 키 제거 (추정치가 0이므로 상태가 필요 없음)"""
+        now = time()
+        with self._lock:
+            idle = [
+                key for key, counter in self._counters.items()
+                if now - counter.last_seen > 2 * self._windows[key]
+            ]
+            for key in idle:
+                del self._counters[key]
+                del self._windows[key]
+        return len(idle)
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class SQLiteRateLimiter(_Sweeper):
+    """여러 워커 프로세스가 공유하는 슬라이딩 윈도우 카운터 (같은 호스트의 SQLite 파일)"""
+
+    blocking = True  # 파일 잠금을 기다릴 수 있음 → 미들웨어에서 스레드풀로 호출
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH, sweep_interval: float = RATE_LIMIT_SWEEP_INTERVAL):
+        self.path = path
+        self._sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._sweeper = None
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " key TEXT PRIMARY KEY, window_id INTEGER, prev INTEGER, curr INTEGER,"
+            " last_seen REAL, window REAL)"
+        )
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, limit: int, window: float) -> tuple:
+        now = time()
+        window_id = int(now // window)
+        conn = self._connect()
+
+        # 다른 프로세스와의 경쟁을 막기 위해 쓰기 잠금을 먼저 잡음
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_id, prev, curr FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                prev, curr = 0, 0
+            elif row[0] == window_id:
+                prev, curr = row[1], row[2]
+            else:
+                prev, curr = (row[2] if row[0] == window_id - 1 else 0), 0
+
+            estimated = _estimate(prev, curr, now, window)
+            allowed = estimated < limit
+            if allowed:
+                curr += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, window_id, prev, curr, last_seen, window)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, window_id, prev, curr, now, window)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if not allowed:
+            return False, 0, _retry_after(now, window)
+        return True, max(0, int(limit - estimated - 1)), 0
+
+    def sweep(self) -> int:
+        conn = self._connect()
+        cursor = conn.execute("DELETE FROM rate_limits WHERE ? - last_seen > 2 * window", (time(),))
+        return cursor.rowcount
+
+
+def create_rate_limiter():
+    if RATE_LIMIT_BACKEND == "sqlite":
+        logger.info(f"✅ RateLimit backend: sqlite ({RATE_LIMIT_SQLITE_PATH})")
+        return SQLiteRateLimiter()
+    return MemoryRateLimiter()
+
+
+# 전역 인스턴스 (sweeper는 main.py에서 시작)
+rate_limiter = create_rate_limiter()
+
+
+# ===== 라우트별 제한 =====
+# (이름, HTTP 메서드, 경로 prefix, "요청 수/윈도우 초", 키 기준)
+# 위에서부터 처음 일치하는 규칙 하나만 적용. 키 기준 "user"는 토큰이 없으면 IP로 대체
+ROUTE_LIMITS = [
+    ("chat", "POST", "/api/chat", RATE_LIMIT_CHAT, "user"),
+    ("analyze", "POST", "/api/analyze", RATE_LIMIT_ANALYZE, "user"),
+    ("upload", "POST", "/api/upload", RATE_LIMIT_UPLOAD, "user"),
+    ("default", None, "/api/", RATE_LIMIT_DEFAULT, "ip"),
+]
+_ROUTE_LIMITS = [
+    (name, method, prefix, *parse_limit(limit), scope)
+    for name, method, prefix, limit, scope in ROUTE_LIMITS
+]
+
+
+def match_route_limit(method: str, path: str):
+    for name, rule_method, prefix, limit, window, scope in _ROUTE_LIMITS:
+        if rule_method and rule_method != method:
+            continue
+        if path.startswith(prefix):
+            return name, limit, window, scope
+    return None
+
+
+def _client_key(request, scope: str) -> str:
+    if scope == "user":
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            from app.auth import verify_access_token
+
+            payload = verify_access_token(authorization[7:])
+            if payload and payload.get("email"):
+                return f"user:{payload['email']}"
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}"
+
+
+async def rate_limit_middleware(request, call_next):
+    """
+    /api/* 요청에 라우트별 제한 적용 (초과 시 Retry-After와 함께 429)
+
+    사용법 (main.py):
+    app.middleware("http")(rate_limit_middleware)
+    """
+    if not RATE_LIMIT_ENABLED or request.method == "OPTIONS":
+        return await call_next(request)
+
+    rule = match_route_limit(request.method, request.url.path)
+    if rule is None:
+        return await call_next(request)
+
+    name, limit, window, scope = rule
+    key = f"{name}:{_client_key(request, scope)}"
+    if rate_limiter.blocking:
+        allowed, remaining, retry_after = await run_in_threadpool(rate_limiter.hit, key, limit, window)
+    else:
+        allowed, remaining, retry_after = rate_limiter.hit(key, limit, window)
+
+    if not allowed:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": f"너무 많은 요청이 발생했습니다. {retry_after}초 후 다시 시도해주세요."},
+            headers={
+                "Retry-After": str(retry_after),
+                "X-RateLimit-Limit": str(limit),
+                "X-RateLimit-Remaining": "0",
+            },
+        )
+
+    response = await call_next(request)
+    response.headers["X-RateLimit-Limit"] = str(limit)
+    response.headers["X-RateLimit-Remaining"] = str(remaining)
+    return response
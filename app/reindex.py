@@ -0,0 +1,43 @@
+# 재색인 CLI
+# 사용법:
+#   python -m app.reindex --source kkuldanji-mvp --target kkuldanji-mvp-v2
+#   python -m app.reindex --source dept-a --target dept-a-small --model text-embedding-3-small --dimensions 1536
+#   python -m app.reindex --source dept-a --target dept-a-v2 --no-resume   # 체크포인트 무시하고 처음부터
+
+import argparse
+import json
+
+from app.config import REINDEX_DOWNLOAD_CONCURRENCY
+from app.logging_setup import setup_logging, shutdown_logging
+from app.services.reindex_service import run_reindex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="처리된 JSON Blob으로 인덱스 재구성 (Gemini 재호출 없음)")
+    parser.add_argument("--source", required=True, help="처리된 JSON이 저장된 인덱스 이름")
+    parser.add_argument("--target", required=True, help="적재할 인덱스 이름 (없으면 생성)")
+    parser.add_argument("--model", default=None, help="임베딩 배포 이름 (기본: AZURE_OPENAI_EMBEDDING_DEPLOYMENT)")
+    parser.add_argument("--dimensions", type=int, default=None, help="임베딩 차원 수")
+    parser.add_argument("--concurrency", type=int, default=REINDEX_DOWNLOAD_CONCURRENCY, help="동시 Blob 다운로드 수")
+    parser.add_argument("--no-resume", action="store_true", help="체크포인트를 무시하고 처음부터 실행")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.dimensions is not None and args.dimensions < 1:
+        parser.error("--dimensions must be at least 1")
+
+    setup_logging()
+    report = run_reindex(
+        args.source,
+        args.target,
+        resume=not args.no_resume,
+        embedding_model=args.model,
+        dimensions=args.dimensions,
+        download_concurrency=args.concurrency
+    )
+    shutdown_logging()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
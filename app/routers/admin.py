@@ -0,0 +1,99 @@
+# app/routers/admin.py - 운영/관리자용 엔드포인트
+
+from fastapi import APIRouter, Depends, BackgroundTasks
+from pydantic import BaseModel, Field
+import logging
+import uuid
+from app.auth import require_role
+from app.admission import admission_controllers
+from app.ingest_scheduler import ingest_scheduler
+from app.services.llm_telemetry import get_llm_telemetry
+from app.state import task_manager
+from app.logging_setup import with_task_id
+from app.services.reindex_service import run_reindex
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+class ReindexRequest(BaseModel):
+    source_index: str
+    target_index: str
+    resume: bool = True
+    embedding_model: str = None
+    dimensions: int = Field(None, ge=1)
+
+
+@with_task_id
+def run_reindex_task(source_index: str, target_index: str, task_id: str, resume: bool,
+                     embedding_model: str, dimensions: int):
+    """백그라운드 재색인 (동기 함수 → 스레드풀에서 실행됨)"""
+    try:
+        run_reindex(
+            source_index,
+            target_index,
+            task_id=task_id,
+            resume=resume,
+            embedding_model=embedding_model,
+            dimensions=dimensions
+        )
+    except Exception as e:
+        logger.exception(f"❌ Reindex failed: {e}")
+        task_manager.update_task(task_id, status="failed", message=f"Reindex failed: {str(e)}")
+
+
+@router.get("/admission")
+async def get_admission_metrics(user: dict = Depends(require_role('admin'))):
+    """엔드포인트별 동시 실행/대기열 상태 및 대기 시간 메트릭 (관리자 전용)"""
+    return {
+        name: controller.snapshot()
+        for name, controller in admission_controllers.items()
+    }
+
+
+@router.get("/llm")
+async def get_llm_metrics(window_seconds: float = None, user: dict = Depends(require_role('admin'))):
+    """
+    LLM/임베딩 호출별 지연 시간, TTFB, 토큰 사용량, 재시도/429 집계 (관리자 전용)
+    총 소요 시간이 큰 호출부터 정렬 - 쿼터 산정 및 지연 원인 파악용
+    """
+    return get_llm_telemetry(window_seconds)
+
+
+@router.get("/ingest")
+async def get_ingest_queue(user: dict = Depends(require_role('admin'))):
+    """업로드 스케줄러 레인별 대기열 / flow(사용자:인덱스)별 대기 작업 수 (관리자 전용)"""
+    return ingest_scheduler.snapshot()
+
+
+@router.post("/reindex")
+async def start_reindex(
+    reindex_request: ReindexRequest,
+    background_tasks: BackgroundTasks,
+    user: dict = Depends(require_role('admin'))
+):
+    """
+    처리된 JSON Blob으로 인덱스 재구성 시작 (관리자 전용)
+    진행 상황/처리량은 /api/upload/status/{task_id}로 조회
+    """
+    task_id = str(uuid.uuid4())
+    task_manager.create_task(task_id)
+    logger.info(f"🔁 [{user['name']}] Reindex 요청: {reindex_request.source_index} → {reindex_request.target_index}")
+
+    background_tasks.add_task(
+        run_reindex_task,
+        reindex_request.source_index,
+        reindex_request.target_index,
+        task_id,
+        reindex_request.resume,
+        reindex_request.embedding_model,
+        reindex_request.dimensions
+    )
+
+    return {
+        "message": "Reindex started",
+        "task_id": task_id,
+        "source_index": reindex_request.source_index,
+        "target_index": reindex_request.target_index
+    }
@@ -2,6 +2,7 @@
 # CSRF Token + Rate Limiting + 보안 헤더
 
 from fastapi import APIRouter, HTTPException, status, Header, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import jwt
 from datetime import datetime, timedelta
@@ -9,8 +10,9 @@ import os
 from dotenv import load_dotenv
 from typing import Optional
 import secrets
-from collections import defaultdict
-from time import time
+from app.config import RATE_LIMIT_LOGIN as RATE_LIMIT_LOGIN_SPEC
+from app.ratelimit import rate_limiter, parse_limit
+from app.token_store import token_store
 
 load_dotenv()
 
@@ -22,13 +24,12 @@ JWT_REFRESH_EXPIRE_HOURS = float(os.getenv('JWT_REFRESH_EXPIRE_HOURS', '24'))
 
 # ===== 보안 설정 =====
 CSRF_TOKEN_EXPIRE_MINUTES = 30
-RATE_LIMIT_LOGIN = 10  # 1분당 10회 요청 제한
-RATE_LIMIT_WINDOW = 60  # 60초
+RATE_LIMIT_LOGIN, RATE_LIMIT_WINDOW = parse_limit(RATE_LIMIT_LOGIN_SPEC)  # 기본: 1분당 10회 요청 제한
 
 # ===== 토큰 저장소 =====
-ISSUED_REFRESH_TOKENS = {}  # {refresh_token: {email, exp, created_at}}
-ISSUED_CSRF_TOKENS = {}  # {csrf_token: {email, exp, used: False}}
-LOGIN_ATTEMPTS = defaultdict(list)  # {ip_address: [timestamp1, timestamp2, ...]}
+# app.token_store (TTL 만료 + 백그라운드 정리, TOKEN_STORE_BACKEND로 워커 간 공유 가능)
+REFRESH_TOKEN_NAMESPACE = "refresh"  # {refresh_token: {email, created_at}}
+CSRF_TOKEN_NAMESPACE = "csrf"  # {csrf_token: {email, created_at}}
 
 # ===== 교육용 사용자 데이터 =====
 MOCK_USERS = {
@@ -88,23 +89,10 @@ class LogoutRequest(BaseModel):
 def check_rate_limit(ip_address: str) -> bool:
     """
     Rate Limiting 체크 (로그인)
-    1분당 10회 이상 요청 시 차단
+    1분당 10회 이상 요청 시 차단 (app.ratelimit 슬라이딩 윈도우 카운터 사용)
     """
-    current_time = time()
-    
-    # 만료된 타임스탬프 제거 (1분 초과)
-    LOGIN_ATTEMPTS[ip_address] = [
-        timestamp for timestamp in LOGIN_ATTEMPTS[ip_address]
-        if current_time - timestamp < RATE_LIMIT_WINDOW
-    ]
-    
-    # 요청 수 확인
-    if len(LOGIN_ATTEMPTS[ip_address]) >= RATE_LIMIT_LOGIN:
-        return False  # 차단!
-    
-    # 새 요청 기록
-    LOGIN_ATTEMPTS[ip_address].append(current_time)
-    return True  # 통과
+    allowed, _, _ = rate_limiter.hit(f"login:ip:{ip_address}", RATE_LIMIT_LOGIN, RATE_LIMIT_WINDOW)
+    return allowed
 
 def get_client_ip(request: Request) -> str:
     """클라이언트 IP 추출"""
@@ -119,38 +107,26 @@ def create_csrf_token(email: str) -> str:
     - 30분 유효
     """
     token = secrets.token_urlsafe(32)
-    expire = datetime.utcnow() + timedelta(minutes=CSRF_TOKEN_EXPIRE_MINUTES)
     
-    ISSUED_CSRF_TOKENS[token] = {
+    token_store.put(CSRF_TOKEN_NAMESPACE, token, {
         'email': email,
-        'exp': expire,
-        'used': False,
-        'created_at': datetime.utcnow()
-    }
+        'created_at': datetime.utcnow().isoformat()
+    }, ttl=CSRF_TOKEN_EXPIRE_MINUTES * 60)
     
     return token
 
 def verify_csrf_token(token: str, email: str) -> bool:
     """
     CSRF Token 검증
-    - 토큰 존재 확인
-    - 만료 확인
+    - 토큰 존재/만료 확인 (만료된 토큰은 저장소가 없는 것으로 취급)
     - 이메일 일치 확인
     """
-    if token not in ISSUED_CSRF_TOKENS:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="유효하지 않은 CSRF Token입니다."
-        )
+    csrf_data = token_store.get(CSRF_TOKEN_NAMESPACE, token)
     
-    csrf_data = ISSUED_CSRF_TOKENS[token]
-    
-    # 만료 확인
-    if datetime.utcnow() > csrf_data['exp']:
-        del ISSUED_CSRF_TOKENS[token]
+    if csrf_data is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="CSRF Token이 만료되었습니다."
+            detail="유효하지 않거나 만료된 CSRF Token입니다."
         )
     
     # 이메일 일치 확인
@@ -164,8 +140,7 @@ def verify_csrf_token(token: str, email: str) -> bool:
 
 def invalidate_csrf_token(token: str):
     """CSRF Token 사용 후 무효화"""
-    if token in ISSUED_CSRF_TOKENS:
-        del ISSUED_CSRF_TOKENS[token]
+    token_store.delete(CSRF_TOKEN_NAMESPACE, token)
 
 # ===== JWT Token Functions =====
 
@@ -191,11 +166,10 @@ def create_refresh_token(email: str) -> str:
     }
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     
-    ISSUED_REFRESH_TOKENS[encoded_jwt] = {
+    token_store.put(REFRESH_TOKEN_NAMESPACE, encoded_jwt, {
         'email': email,
-        'exp': expire,
-        'created_at': datetime.utcnow()
-    }
+        'created_at': datetime.utcnow().isoformat()
+    }, ttl=JWT_REFRESH_EXPIRE_HOURS * 3600)
     
     return encoded_jwt
 
@@ -236,11 +210,11 @@ async def login(request: Request, login_request: LoginRequest):
     # ===== 1️⃣ Rate Limiting 체크 =====
     client_ip = get_client_ip(request)
     
-    if not check_rate_limit(client_ip):
+    if not await run_in_threadpool(check_rate_limit, client_ip):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"너무 많은 요청이 발생했습니다. {RATE_LIMIT_WINDOW}초 후 다시 시도해주세요.",
-            headers={"Retry-After": str(RATE_LIMIT_WINDOW)},
+            detail=f"너무 많은 요청이 발생했습니다. {int(RATE_LIMIT_WINDOW)}초 후 다시 시도해주세요.",
+            headers={"Retry-After": str(int(RATE_LIMIT_WINDOW))},
         )
     
     # ===== 2️⃣ 사용자 검증 =====
@@ -265,10 +239,10 @@ async def login(request: Request, login_request: LoginRequest):
         role=user['role']
     )
     
-    refresh_token = create_refresh_token(login_request.email)
+    refresh_token = await run_in_threadpool(create_refresh_token, login_request.email)
     
     # ===== 4️⃣ CSRF Token 생성 =====
-    csrf_token = create_csrf_token(login_request.email)
+    csrf_token = await run_in_threadpool(create_csrf_token, login_request.email)
     
     # ===== 5️⃣ 응답 반환 =====
     return LoginResponse(
@@ -289,7 +263,7 @@ async def refresh_access_token(request: RefreshTokenRequest):
     """Refresh Token으로 새 Access Token 발급"""
     refresh_token = request.refresh_token
     
-    if refresh_token not in ISSUED_REFRESH_TOKENS:
+    if await run_in_threadpool(token_store.get, REFRESH_TOKEN_NAMESPACE, refresh_token) is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="유효하지 않은 Refresh Token입니다.",
@@ -307,7 +281,7 @@ async def refresh_access_token(request: RefreshTokenRequest):
             )
         
     except jwt.ExpiredSignatureError:
-        del ISSUED_REFRESH_TOKENS[refresh_token]
+        await run_in_threadpool(token_store.delete, REFRESH_TOKEN_NAMESPACE, refresh_token)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh Token이 만료되었습니다. 다시 로그인해주세요.",
@@ -345,8 +319,7 @@ async def logout(request: LogoutRequest):
     """로그아웃 - Refresh Token 무효화"""
     refresh_token = request.refresh_token
     
-    if refresh_token in ISSUED_REFRESH_TOKENS:
-        del ISSUED_REFRESH_TOKENS[refresh_token]
+    await run_in_threadpool(token_store.delete, REFRESH_TOKEN_NAMESPACE, refresh_token)
     
     return {"message": "로그아웃 되었습니다."}
 
@@ -1,14 +1,20 @@
 # app/routers/chat.py
 
 from fastapi import APIRouter, HTTPException, Depends, Request  # ← Request 추가!
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
 from pydantic import BaseModel
-from app.services.search_service import search_documents
+from app.services.search_service import search_documents, search_documents_federated
 from app.services.openai_service import chat_with_context, analyze_files_for_handover
+from app.services.handover_service import iter_handover_sections, empty_handover
 from app.auth import get_current_user  # ← 추가 (한 줄)
+from app.admission import admission_controllers, SlotStreamingResponse
+from app.logging_setup import log_payload
+import logging
 import json
-import traceback
 from app.routers.auth import verify_csrf_token, verify_token
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 class ChatMessage(BaseModel):
@@ -18,9 +24,12 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     messages: list
     index_name: str = None  # RAG 인덱스 선택 (optional)
+    index_names: list = None  # 여러 인덱스 동시 검색 (optional, 지정 시 index_name보다 우선)
 
 class AnalyzeRequest(BaseModel):
     messages: list
+    index_name: str = None  # 인수인계서 자료를 검색할 RAG 인덱스 (optional)
+    force_regenerate: bool = False  # True면 섹션 캐시를 무시하고 전체 재생성
 
 # ===== 변경 1: analyze 함수 =====
 @router.post("/analyze")
@@ -36,13 +45,13 @@ async def analyze(
             status_code=403,
             detail="CSRF Token이 필요합니다."
         )
-    verify_csrf_token(csrf_token, user['email'])
+    await run_in_threadpool(verify_csrf_token, csrf_token, user['email'])
     """
     인수인계서 분석 (로그인 필수)
     """
     try:
         # 사용자 정보 로깅 (감사 추적)
-        print(f"🔍 [{user['name']}] /analyze 요청 - messages: {len(analyze_request.messages)}")
+        logger.info(f"🔍 [{user['name']}] /analyze 요청 - messages: {len(analyze_request.messages)}")
 
         # 프론트엔드에서 보낸 메시지 형식 처리
         messages = analyze_request.messages  # ← analyze_request 사용!
@@ -50,21 +59,28 @@ async def analyze(
         # 사용자 메시지에서 파일 내용 추출
         user_message = next((m["content"] for m in messages if m["role"] == "user"), "")
 
-        print(f"📄 추출된 사용자 메시지 길이: {len(user_message)}")
+        logger.debug(f"📄 추출된 사용자 메시지 길이: {len(user_message)}")
 
         if len(user_message) == 0:
-            print("⚠️ 빈 메시지 - 샘플 데이터로 응답")
-
-        # OpenAI API를 호출하여 인수인계서 JSON 생성
-        print("🤖 OpenAI API 호출 시작...")
-        response = analyze_files_for_handover(user_message)
-
-        print(f"✅ OpenAI 응답 완료 - 타입: {type(response)}")
-        print(f"응답 샘플: {str(response)[:200]}")
+            logger.info("📚 사용자 자료 없음 - 인덱스의 섹션별 검색 결과만 사용")
+
+        # 섹션별 검색 + 병렬 생성 (블로킹 호출이므로 스레드풀에서 실행)
+        logger.info(f"🤖 인수인계서 생성 시작... (index: {analyze_request.index_name or 'default'})")
+        # 동시 실행 제한 (대기열 초과/시간 초과 시 429)
+        async with admission_controllers["analyze"].slot(user['email']):
+            response = await run_in_threadpool(
+                analyze_files_for_handover,
+                user_message,
+                analyze_request.index_name,
+                not analyze_request.force_regenerate
+            )
+
+        logger.info(f"✅ OpenAI 응답 완료 - 타입: {type(response).__name__}")
+        log_payload(logger, "응답 샘플", response)
 
         # 응답 검증
         if not isinstance(response, dict):
-            print(f"⚠️ 응답이 dict가 아님: {type(response)} - 타입 변환 시도")
+            logger.warning(f"⚠️ 응답이 dict가 아님: {type(response)} - 타입 변환 시도")
             if isinstance(response, str):
                 try:
                     response = json.loads(response)
@@ -73,11 +89,10 @@ async def analyze(
 
         # 필수 필드 확인
         if "overview" not in response:
-            print("⚠️ overview 필드 없음 - 기본값 추가")
+            logger.warning("⚠️ overview 필드 없음 - 기본값 추가")
             response["overview"] = {"transferor": {}, "transferee": {}}
 
-        print(f"📤 최종 응답 필드: {list(response.keys())}")
-        print(f"📊 최종 응답 크기: {len(str(response))} 글자")
+        logger.debug(f"📤 최종 응답 필드: {list(response.keys())}")
 
         # 응답에 사용자 정보 포함
         return {
@@ -89,11 +104,63 @@ async def analyze(
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Analyze error: {e}")
-        traceback.print_exc()
+        logger.exception(f"❌ Analyze error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/analyze/stream")
+async def analyze_stream(
+    request: Request,
+    analyze_request: AnalyzeRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    인수인계서 분석 - 섹션 스트리밍 (로그인 필수)
+    섹션이 완성될 때마다 NDJSON 한 줄씩 전송: {"section": "risks", "data": {...}}
+    마지막 줄: {"done": true, "content": {전체 HandoverData}}
+    """
+    csrf_token = request.headers.get("X-CSRF-Token")
+    if not csrf_token:
+        raise HTTPException(
+            status_code=403,
+            detail="CSRF Token이 필요합니다."
+        )
+    await run_in_threadpool(verify_csrf_token, csrf_token, user['email'])
+
+    logger.info(f"🔍 [{user['name']}] /analyze/stream 요청 - index: {analyze_request.index_name or 'default'}")
+
+    user_message = next((m["content"] for m in analyze_request.messages if m["role"] == "user"), "")
+
+    def generate():
+        handover = empty_handover()
+        try:
+            for section, value in iter_handover_sections(
+                user_message,
+                analyze_request.index_name,
+                use_cache=not analyze_request.force_regenerate
+            ):
+                handover[section] = value
+                yield json.dumps({"section": section, "data": value}, ensure_ascii=False) + "\n"
+            yield json.dumps({"done": True, "content": handover}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.exception(f"❌ Analyze stream error: {e}")
+            yield json.dumps({"done": True, "error": str(e), "content": handover}, ensure_ascii=False) + "\n"
+
+    # 스트림이 끝날 때까지 슬롯을 유지해야 하므로 context manager 대신 acquire 후 응답 객체가 반납
+    # (응답 생성 실패 / 스트림 시작 전 연결 종료에도 반납되도록 SlotStreamingResponse 사용)
+    controller = admission_controllers["analyze"]
+    await controller.acquire(user['email'])
+    try:
+        # 동기 제너레이터는 스레드풀에서 순회 (이벤트 루프를 막지 않음)
+        return SlotStreamingResponse(
+            iterate_in_threadpool(generate()), controller, user['email'], media_type="application/x-ndjson"
+        )
+    except BaseException:
+        controller.release(user['email'])
+        raise
+
 # ===== 변경 2: chat 함수 =====
 @router.post("/chat")
 async def chat(
@@ -108,7 +175,7 @@ async def chat(
             status_code=403,
             detail="CSRF Token이 필요합니다."
         )
-    verify_csrf_token(csrf_token, user['email'])  # ← CSRF 검증!
+    await run_in_threadpool(verify_csrf_token, csrf_token, user['email'])  # ← CSRF 검증!
     """
     채팅 (로그인 필수)
     """
@@ -124,33 +191,42 @@ async def chat(
             }
 
         # 사용자 정보 로깅 (감사 추적)
-        print(f"💬 [{user['name']}] /chat 요청 - 메시지: {user_message[:100]}, 인덱스: {chat_request.index_name or 'default'}")
-
-        # 1. 관련 문서 검색 (선택된 인덱스에서)
-        search_results = search_documents(user_message, index_name=chat_request.index_name)
-
-        if not search_results:
-            return {
-                "content": "관련 문서를 찾을 수 없습니다. 먼저 문서를 업로드해주세요.",
-                "response": "관련 문서를 찾을 수 없습니다. 먼저 문서를 업로드해주세요."
-            }
-
-        # 2. 컨텍스트 생성
-        context = "\n\n".join([
-            f"[{doc['file_name']}]\n{doc['content']}"
-            for doc in search_results
-        ])
-
-        # 3. GPT로 답변 생성
-        response = chat_with_context(user_message, context)
-
-        print(f"✅ [{user['name']}] 채팅 응답 완료 - {len(response)} 글자")
+        index_names = chat_request.index_names or ([chat_request.index_name] if chat_request.index_name else None)
+        logger.info(f"💬 [{user['name']}] /chat 요청 - 메시지 {len(user_message)}자, 인덱스: {index_names or 'default'}")
+        log_payload(logger, "💬 /chat 메시지", user_message)
+
+        # 동시 실행 제한 (대기열 초과/시간 초과 시 429)
+        async with admission_controllers["chat"].slot(user['email']):
+            # 1. 관련 문서 검색 (선택된 인덱스에서, 블로킹 호출이므로 스레드풀에서 실행)
+            if index_names and len(index_names) > 1:
+                search_results = await run_in_threadpool(search_documents_federated, user_message, index_names)
+            else:
+                search_results = await run_in_threadpool(
+                    search_documents, user_message, index_name=index_names[0] if index_names else None
+                )
+
+            if not search_results:
+                return {
+                    "content": "관련 문서를 찾을 수 없습니다. 먼저 문서를 업로드해주세요.",
+                    "response": "관련 문서를 찾을 수 없습니다. 먼저 문서를 업로드해주세요."
+                }
+
+            # 2. 컨텍스트 생성
+            context = "\n\n".join([
+                f"[{doc.get('fileName') or 'Unknown'}]\n{doc.get('content') or ''}"
+                for doc in search_results
+            ])
+
+            # 3. GPT로 답변 생성
+            response = await run_in_threadpool(chat_with_context, user_message, context)
+
+        logger.info(f"✅ [{user['name']}] 채팅 응답 완료 - {len(response)} 글자")
 
         # 응답에 사용자 정보 포함
         return {
             "content": response,
             "response": response,
-            "sources": [doc["file_name"] for doc in search_results],
+            "sources": [doc.get("fileName") or "Unknown" for doc in search_results],
             "user_info": {
                 "name": user['name'],
                 "email": user['email'],
@@ -158,7 +234,8 @@ async def chat(
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Chat error: {e}")
-        traceback.print_exc()
+        logger.exception(f"❌ Chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
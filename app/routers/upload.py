@@ -1,16 +1,42 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Form, Depends, Request
-from app.auth import get_current_user
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends, Request
+from app.auth import get_current_user, get_optional_user
 from app.routers.auth import verify_csrf_token
-from app.services.blob_service import upload_to_blob, save_processed_json
+from app.services.blob_service import (
+    upload_to_blob,
+    save_processed_json,
+    delete_blob,
+    download_blob,
+    download_processed_json,
+    get_blob_sas_url
+)
 from app.services.document_service import extract_text_from_url, extract_text_from_docx
-from app.services.search_service import add_document_to_index, get_document_count, get_all_documents
+from app.services.stats_service import get_index_stats, list_indexes_cached
+from app.services.search_service import (
+    add_document_to_index,
+    list_documents_page,
+    iter_documents,
+    get_document_by_id,
+    DocumentListTruncated,
+    LISTING_FIELDS
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 import uuid
-import traceback
-from app.state import task_manager
+import copy
+import hashlib
+import logging
+from app.state import task_manager, TaskCancelled, TERMINAL_STATUSES
+from app.ingest_scheduler import ingest_scheduler, TEXT_EXTENSIONS
+from app.ingest_checkpoint import ingest_checkpoints
+from app.singleflight import ingest_inflight, analysis_flight
+from app.metrics import stage_span
+from app.logging_setup import with_task_id
 from app.services.openai_service import analyze_text_for_search
-from app.services.search_service import index_processed_chunks
+from app.services.search_service import index_processed_chunks, assign_stable_chunk_ids
 import json
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 """
@@ -67,123 +93,302 @@ async def upload_document(file: UploadFile = File(...)):
 
 #창훈 코드 추가
 
-async def process_file_background(task_id: str, file_name: str, file_data: bytes, file_ext: str, index_name: str = None):
+def _discard_partial_outputs(task_id: str, index_name: str, raw_blob: str = None, processed_blob: str = None):
+    """취소된 작업이 남긴 Blob 정리 (인덱스 문서는 index_processed_chunks에서 되돌림)"""
+    for file_name, kind in ((raw_blob, "raw"), (processed_blob, "processed")):
+        if not file_name:
+            continue
+        try:
+            delete_blob(file_name, index_name=index_name, kind=kind)
+            logger.info(f"🗑️ [{task_id}] Removed {kind} blob of cancelled task: {file_name}")
+        except Exception as e:
+            logger.warning(f"⚠️ [{task_id}] Failed to remove {kind} blob {file_name}: {e}")
+
+
+def _fail(task_id: str, message: str):
+    """작업 실패 처리 (체크포인트는 남겨서 POST /status/{task_id}/retry로 재시도 가능)"""
+    task_manager.update_task(task_id, status="failed", message=message)
+    ingest_checkpoints.mark_failed(task_id, message)
+
+
+def _load_processed_chunks(task_id: str, processed_blob: str, index_name: str):
+    """체크포인트의 Gemini 결과 JSON 다시 읽기 (없거나 실패하면 None → 텍스트 추출부터 다시)"""
+    try:
+        with stage_span(task_id, "load_processed") as span:
+            chunks = download_processed_json(processed_blob, index_name=index_name)
+            span["items"] = len(chunks) if chunks else 0
+        return chunks or None
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to load processed json {processed_blob}: {e}")
+        return None
+
+
+@with_task_id
+def process_file_background(task_id: str, file_name: str, file_data: bytes, file_ext: str, index_name: str = None,
+                            source_path: str = None):
     """
-    백그라운드에서 실행될 실제 파이프라인 로직
+    백그라운드에서 실행될 실제 파이프라인 로직 (ingest_scheduler 워커 스레드에서 동기 실행)
     1. Blob 업로드 (Raw)
     2. 텍스트 추출
     3. LLM 전처리 (JSON 생성)
     4. Blob 업로드 (Processed JSON)
-    5. Azure Search 인덱싱
+    5. Azure Search 인덱싱 (임베딩 + 업로드)
+
+    단계별 소요 시간/바이트/항목 수는 stage_span으로 task status의 "stages"와 /metrics에 기록
+    취소 요청(DELETE /status/{task_id})은 단계 경계마다 확인 → 이번 작업이 쓴 Blob/인덱스 문서를 지우고 cancelled
+
+    완료된 단계는 ingest_checkpoints에 기록 → 재시작/재시도 시 이어서 처리
+    (원본 Blob이 있으면 업로드 생략, processed JSON이 있으면 Gemini 호출 생략, 이미 인덱싱된 청크는 임베딩 생략)
 
     Args:
+        file_data: 원본 바이트 (체크포인트에서 재개할 때는 None → 필요하면 원본 Blob에서 다시 읽음)
         index_name: RAG 인덱스 이름 (지정하지 않으면 기본 인덱스 사용)
     """
+    checkpoint = ingest_checkpoints.get(task_id) or {}
+    stage = checkpoint.get("stage") or "received"
+    raw_blob = checkpoint.get("raw_blob")
+    processed_blob = checkpoint.get("processed_blob")
     try:
-        print(f"[Background] Processing task {task_id} for file {file_name}...")
-        task_manager.update_task(task_id, status="processing", progress=10, message=f"Uploading raw file: {file_name}")
-        
+        task_manager.raise_if_cancelled(task_id)
+        ingest_checkpoints.mark_running(task_id)
+        logger.info(f"[Background] Processing task {task_id} for file {file_name} (stage: {stage})...")
+
         # 1. Blob 업로드 (Raw)
         # 중요: 파일명에 한글/특수문자/공백이 있으면 Document Intelligence가 URL 다운로드에 실패함.
         # 따라서 Blob 저장 시에는 안전한 영문 이름(Task ID)을 사용하고, 원본 파일명은 메타데이터로만 관리함.
-        safe_file_name = f"{task_id}.{file_ext}" if file_ext else task_id
-
-        try:
-            # upload_to_blob은 이미 SAS Token이 포함된 URL을 반환함
-            blob_url_with_sas = upload_to_blob(safe_file_name, file_data, index_name=index_name)
-            print(f"[Background] Blob upload success: {blob_url_with_sas}")
-            
-        except Exception as e:
-            print(f"[Background] Blob upload failed: {e}")
-            raise e
-
-        task_manager.update_task(task_id, progress=30, message="Extracting text...")
-        
-        # 2. 텍스트 추출
-        extracted_text = ""
-        if file_ext in ['txt', 'py', 'js', 'java', 'c', 'cpp', 'h', 'cs', 'ts', 'tsx', 'html', 'css', 'json', 'md']:
-            # 텍스트/코드 파일은 직접 디코딩
+        blob_url_with_sas = None
+        if stage == "received":
+            task_manager.update_task(task_id, status="processing", progress=10, message=f"Uploading raw file: {file_name}")
+            safe_file_name = f"{task_id}.{file_ext}" if file_ext else task_id
             try:
-                extracted_text = file_data.decode('utf-8')
-            except UnicodeDecodeError:
-                extracted_text = file_data.decode('cp949', errors='ignore')
-        elif file_ext == 'docx':
-            # DOCX 로컬 추출 (빠르고 무료, URL 에러 없음)
-            print("[Background] File is DOCX. Attempting local extraction...")
-            try:
-                extracted_text = extract_text_from_docx(file_data)
-                print(f"[Background] DOCX extraction success. Length: {len(extracted_text)}")
+                # upload_to_blob은 이미 SAS Token이 포함된 URL을 반환함
+                with stage_span(task_id, "blob_upload", bytes=len(file_data), items=1):
+                    blob_url_with_sas = upload_to_blob(safe_file_name, file_data, index_name=index_name)
+                raw_blob = safe_file_name
+                ingest_checkpoints.advance(task_id, "raw_uploaded", raw_blob=raw_blob)
+                # URL에는 SAS 토큰이 포함되어 있으므로 로그에 남기지 않음
+                logger.info(f"[Background] Blob upload success: {safe_file_name}")
+
             except Exception as e:
-                print(f"[Background] DOCX extraction failed: {e}")
-                task_manager.update_task(task_id, status="failed", message=f"DOCX extraction failed: {str(e)}")
-                return
+                logger.error(f"[Background] Blob upload failed: {e}")
+                raise e
         else:
-            # PDF, 이미지 등은 Document Intelligence 사용 (SAS Token 포함 URL 사용)
-            try:
-                extracted_text = extract_text_from_url(blob_url_with_sas)
-            except Exception as e:
-                task_manager.update_task(task_id, status="failed", message=f"Text extraction failed: {str(e)}")
+            task_manager.update_task(task_id, status="processing", progress=30, message=f"Resuming from checkpoint ({stage})...")
+            logger.info(f"[Background] Reusing raw blob: {raw_blob}")
+
+        # Gemini 결과가 이미 저장되어 있으면 2~4단계 생략
+        chunks = _load_processed_chunks(task_id, processed_blob, index_name) if stage == "processed" else None
+        if chunks:
+            logger.info(f"[Background] Reusing processed json: {processed_blob} ({len(chunks)} chunks)")
+
+        if chunks is None:
+            task_manager.raise_if_cancelled(task_id)
+            task_manager.update_task(task_id, progress=30, message="Extracting text...")
+
+            # 2. 텍스트 추출
+            # (items = 추출된 글자 수)
+            extracted_text = ""
+            if file_ext in TEXT_EXTENSIONS or file_ext == 'docx':
+                if file_data is None:
+                    file_data = download_blob(raw_blob, index_name=index_name)
+            if file_ext in TEXT_EXTENSIONS:
+                # 텍스트/코드 파일은 직접 디코딩
+                with stage_span(task_id, "extract", bytes=len(file_data)) as span:
+                    try:
+                        extracted_text = file_data.decode('utf-8')
+                    except UnicodeDecodeError:
+                        extracted_text = file_data.decode('cp949', errors='ignore')
+                    span["items"] = len(extracted_text)
+            elif file_ext == 'docx':
+                # DOCX 로컬 추출 (빠르고 무료, URL 에러 없음)
+                logger.info("[Background] File is DOCX. Attempting local extraction...")
+                try:
+                    with stage_span(task_id, "extract", bytes=len(file_data)) as span:
+                        extracted_text = extract_text_from_docx(file_data)
+                        span["items"] = len(extracted_text)
+                    logger.info(f"[Background] DOCX extraction success. Length: {len(extracted_text)}")
+                except Exception as e:
+                    logger.warning(f"[Background] DOCX extraction failed: {e}")
+                    _fail(task_id, f"DOCX extraction failed: {str(e)}")
+                    return
+            else:
+                # PDF, 이미지 등은 Document Intelligence 사용 (SAS Token 포함 URL 사용)
+                try:
+                    blob_url_with_sas = blob_url_with_sas or get_blob_sas_url(raw_blob, index_name=index_name)
+                    with stage_span(task_id, "extract", bytes=checkpoint.get("size") or len(file_data or b"")) as span:
+                        extracted_text = extract_text_from_url(blob_url_with_sas)
+                        span["items"] = len(extracted_text or "")
+                except Exception as e:
+                    _fail(task_id, f"Text extraction failed: {str(e)}")
+                    return
+
+            if not extracted_text:
+                _fail(task_id, "No text extracted from file.")
                 return
 
-        if not extracted_text:
-            task_manager.update_task(task_id, status="failed", message="No text extracted from file.")
-            return
-            
-        task_manager.update_task(task_id, progress=50, message="Analyzing with AI (Preprocessing)...")
-        print("[Background] Starting LLM analysis...")
+            task_manager.raise_if_cancelled(task_id)
+            task_manager.update_task(task_id, progress=50, message="Analyzing with AI (Preprocessing)...")
+            logger.info("[Background] Starting LLM analysis...")
 
-        # 3. LLM 전처리
-        # 파일 유형 구분 (code vs doc)
-        file_type = "code" if file_ext in ['py', 'js', 'java', 'cpp', 'ts', 'tsx', 'cs'] else "doc"
-        
-        # print(f"extracted_text : {extracted_text}")
-        chunks = analyze_text_for_search(extracted_text, file_name, file_type=file_type)
-        print(f"[Background] LLM analysis returned {len(chunks) if chunks else 0} chunks.")
-        
-        if not chunks:
-            task_manager.update_task(task_id, status="failed", message="AI preprocessing failed (No chunks generated).")
-            return
+            # 3. LLM 전처리
+            # 파일 유형 구분 (code vs doc)
+            file_type = "code" if file_ext in ['py', 'js', 'java', 'cpp', 'ts', 'tsx', 'cs'] else "doc"
 
-        task_manager.update_task(task_id, progress=70, message="Saving processed data...")
+            # print(f"extracted_text : {extracted_text}")
+            # 같은 텍스트를 다른 작업이 분석 중이면 (예: 같은 파일을 다른 인덱스에 동시 업로드) 그 결과를 함께 사용
+            text_bytes = extracted_text.encode("utf-8")
+            analysis_key = (hashlib.sha256(text_bytes).hexdigest(), file_type, file_name)
+            with stage_span(task_id, "analyze", bytes=len(text_bytes)) as span:
+                chunks, shared = analysis_flight.do(
+                    analysis_key, analyze_text_for_search, extracted_text, file_name, file_type=file_type
+                )
+                if shared:
+                    # 청크에 id 등을 채워 넣으므로 공유 결과는 복사해서 사용
+                    chunks = copy.deepcopy(chunks)
+                    span["shared"] = True
+                span["items"] = len(chunks) if chunks else 0
+            logger.info(f"[Background] LLM analysis returned {len(chunks) if chunks else 0} chunks.")
+            task_manager.raise_if_cancelled(task_id)
 
-        # 4. Processed JSON 저장 (Blob)
-        # JSON 파일명도 안전하게 Task ID 기반으로 저장
-        processed_file_name = f"{task_id}_processed.json"
-        try:
-            json_str = json.dumps(chunks, ensure_ascii=False, indent=2)
-            save_processed_json(processed_file_name, json_str, index_name=index_name)
-        except Exception as e:
-            print(f"⚠️ Failed to save processed json: {e}")
-            # 저장은 실패해도 진행
+            if not chunks:
+                _fail(task_id, "AI preprocessing failed (No chunks generated).")
+                return
+
+            task_manager.update_task(task_id, progress=70, message="Saving processed data...")
 
+            # 청크 id를 (파일, 본문 해시) 기준으로 고정 → 재업로드 시 변경된 청크만 임베딩/인덱싱
+            assign_stable_chunk_ids(chunks, file_name, source_path)
+
+            # 4. Processed JSON 저장 (Blob)
+            # JSON 파일명도 안전하게 Task ID 기반으로 저장
+            processed_file_name = f"{task_id}_processed.json"
+            try:
+                json_str = json.dumps(chunks, ensure_ascii=False, indent=2)
+                with stage_span(task_id, "save_processed", bytes=len(json_str.encode("utf-8")), items=len(chunks)):
+                    save_processed_json(processed_file_name, json_str, index_name=index_name,
+                                        metadata={"parent_id": chunks[0]["parentId"]})
+                processed_blob = processed_file_name
+                ingest_checkpoints.advance(task_id, "processed", processed_blob=processed_blob)
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to save processed json: {e}")
+                # 저장은 실패해도 진행 (재개 시에는 텍스트 추출부터 다시)
+
+        task_manager.raise_if_cancelled(task_id)
         task_manager.update_task(task_id, progress=80, message="Indexing to Search...")
 
-        # 5. Azure Search 인덱싱
-        print(f"[Background] Starting indexing for {len(chunks)} chunks to index '{index_name or 'default'}'...")
+        # 5. Azure Search 인덱싱 (이미 인덱스에 있는 청크는 index_processed_chunks가 임베딩/업로드 생략)
+        logger.info(f"[Background] Starting indexing for {len(chunks)} chunks to index '{index_name or 'default'}'...")
         try:
-            indexed_count = index_processed_chunks(chunks, index_name=index_name)
-            print(f"[Background] Indexing complete. Count: {indexed_count}")
+            indexed_count = index_processed_chunks(chunks, index_name=index_name, task_id=task_id)
+            logger.info(f"[Background] Indexing complete. Count: {indexed_count}")
+        except TaskCancelled:
+            raise
         except Exception as e:
-            print(f"[Background] Indexing failed: {e}")
+            logger.error(f"[Background] Indexing failed: {e}")
             raise e
         
-        if indexed_count > 0:
+        if indexed_count == len(chunks):
             task_manager.update_task(task_id, status="completed", progress=100, message="Upload & Indexing Complete!")
+        elif indexed_count > 0:
+            task_manager.update_task(task_id, status="completed_with_warning", progress=100, message=f"Indexed {indexed_count}/{len(chunks)} chunks. See items for failures.")
         else:
             task_manager.update_task(task_id, status="completed_with_warning", progress=100, message="Finished, but no documents indexed.")
+        ingest_checkpoints.delete(task_id)
+
+    except TaskCancelled:
+        logger.info(f"⏹️ [Background] Task {task_id} cancelled - cleaning up partial outputs")
+        _discard_partial_outputs(task_id, index_name, raw_blob, processed_blob)
+        task_manager.mark_cancelled(task_id)
+        ingest_checkpoints.delete(task_id)
 
     except Exception as e:
-        print(f"❌ Background task failed: {e}")
-        traceback.print_exc()
-        task_manager.update_task(task_id, status="failed", message=f"Internal Server Error: {str(e)}")
+        logger.exception(f"❌ Background task failed: {e}")
+        _fail(task_id, f"Internal Server Error: {str(e)}")
+
+    finally:
+        # 같은 파일로 병합된 task들은 이미 이 작업의 상태를 보고 있음 → 이후 업로드는 새로 실행
+        ingest_inflight.finish(task_id)
+
+
+def resubmit_from_checkpoint(checkpoint: dict) -> dict:
+    """체크포인트가 있는 작업을 스케줄러에 다시 등록 (원본 바이트 없이 - 필요하면 원본 Blob에서 읽음)"""
+    task_id = checkpoint["task_id"]
+    if not task_manager.get_task(task_id):
+        task_manager.create_task(task_id)
+    task_manager.update_task(task_id, status="queued", message=f"Resuming from checkpoint ({checkpoint['stage']})")
+    return ingest_scheduler.submit(
+        task_id,
+        process_file_background,
+        (task_id, checkpoint["file_name"], None, checkpoint["file_ext"], checkpoint["index_name"],
+         checkpoint["source_path"]),
+        user=checkpoint["user"],
+        index_name=checkpoint["index_name"],
+        size=checkpoint["size"] or 0,
+        file_ext=checkpoint["file_ext"],
+        lane=checkpoint["lane"]
+    )
+
+
+def resume_interrupted_uploads() -> int:
+    """
+    시작 시 호출 - 이전 프로세스가 처리하다 멈춘 업로드를 체크포인트 단계부터 재개
+    원본 Blob 저장 전에 멈춘 작업은 원본이 남아 있지 않으므로 failed 처리 (다시 업로드 필요)
+    """
+    resumed = 0
+    for checkpoint in ingest_checkpoints.claim_orphans():
+        task_id = checkpoint["task_id"]
+        if checkpoint["stage"] == "received":
+            if not task_manager.get_task(task_id):
+                task_manager.create_task(task_id)
+            _fail(task_id, "Server restarted before the file was stored. Please upload it again.")
+            continue
+        resubmit_from_checkpoint(checkpoint)
+        resumed += 1
+    if resumed:
+        logger.info(f"🔁 Resumed {resumed} interrupted uploads from checkpoints")
+    return resumed
+
+
+def _enqueue_upload(task_id: str, file_name: str, file_data: bytes, file_ext: str, index_name: str, user_email: str,
+                    priority: str, source_path: str) -> dict:
+    """업로드 작업 생성 + 체크포인트 기록 + 스케줄러 등록 → 대기 정보 ({"lane", "position"})"""
+    try:
+        task_manager.create_task(task_id)
+        ingest_checkpoints.create(task_id, file_name, file_ext, index_name, user_email, priority, len(file_data),
+                                  source_path)
+        queue = ingest_scheduler.submit(
+            task_id,
+            process_file_background,
+            (task_id, file_name, file_data, file_ext, index_name, source_path),
+            user=user_email,
+            index_name=index_name,
+            size=len(file_data),
+            file_ext=file_ext,
+            lane=priority
+        )
+    except Exception as e:
+        # 실행되지 않을 작업에 다음 업로드가 연결되지 않도록 병합 키를 풀고,
+        # 이미 연결된 요청은 실패 상태를 보게 함
+        ingest_inflight.finish(task_id)
+        if task_manager.get_task(task_id):
+            task_manager.update_task(task_id, status="failed", message=f"Upload could not be queued: {e}")
+        try:
+            ingest_checkpoints.delete(task_id)
+        except Exception as cleanup_error:
+            logger.warning(f"⚠️ Checkpoint cleanup failed for {task_id}: {cleanup_error}")
+        raise
+    if queue["position"]:
+        task_manager.update_task(task_id, status="queued", message=f"Queued (position {queue['position']})")
+    return queue
 
 
 @router.post("")
 async def upload_document(
     request: Request,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     index_name: str = Form(None),
+    priority: str = Form(None),
+    source_path: str = Form(None),
     user: dict = Depends(get_current_user)
 ):
     # CSRF 검증 추가
@@ -193,14 +398,18 @@ async def upload_document(
             status_code=403,
             detail="CSRF Token이 필요합니다."
         )
-    verify_csrf_token(csrf_token, user['email'])
+    await run_in_threadpool(verify_csrf_token, csrf_token, user['email'])
     """
     파일 업로드 엔드포인트 (비동기 처리)
-    파일을 받자마자 task_id를 리턴하고, 백그라운드에서 처리 시작.
+    파일을 받자마자 task_id를 리턴하고, 스케줄러 대기열에 등록 (사용자/인덱스별 공정 순서 + 작은 파일 우선)
+    같은 내용/파일명/인덱스의 업로드가 이미 진행 중이면 새로 실행하지 않고 그 작업에 연결 (shared_with)
 
     Args:
         file: 업로드할 파일
         index_name: RAG 인덱스 이름 (선택 사항, 지정하지 않으면 기본 인덱스)
+        priority: "interactive" | "bulk" (선택 사항, 지정하지 않으면 사용자의 대기 작업 수로 판단)
+        source_path: 원본 상대 경로 (선택 사항, 폴더 업로드 등). 있으면 파일 식별자(parentId)를 경로로 정하고,
+            없으면 파일명 기준 - 같은 인덱스에 이름이 같은 다른 파일을 올리면 기존 파일의 새 버전으로 대체됨
     """
     try:
         # 1. 파일 데이터 읽기 (메모리)
@@ -208,118 +417,262 @@ async def upload_document(
         file_name = file.filename
         file_ext = file_name.lower().split('.')[-1] if '.' in file_name else ''
 
-        # 2. Task 생성
+        # 2. Task ID 발급
         task_id = str(uuid.uuid4())
-        task_manager.create_task(task_id)
 
-        # 3. 백그라운드 작업 등록
-        print(f"📋 Upload request: file={file_name}, index={index_name or 'default'}")
-        background_tasks.add_task(process_file_background, task_id, file_name, file_data, file_ext, index_name)
+        # 3. 같은 파일이 이미 처리 중이면 그 작업에 연결 (더블클릭, 공유 폴더 중복 업로드)
+        # 파일 식별자(경로 또는 파일명)도 키에 포함 - 인덱스 문서의 parentId가 이것으로 정해지므로
+        content_hash = (await run_in_threadpool(hashlib.sha256, file_data)).hexdigest()
+        flight_key = (content_hash, index_name or "default", source_path or file_name)
+        leader_task_id = ingest_inflight.join(flight_key, task_id, user['email'])
+        if leader_task_id:
+            task_manager.alias(task_id, leader_task_id)
+            logger.info(f"🔗 Upload {task_id} joined in-flight task {leader_task_id}: file={file_name}")
+            return {
+                "message": "Upload started",
+                "task_id": task_id,
+                "file_name": file_name,
+                "index_name": index_name or "default",
+                "shared_with": leader_task_id,
+                "queue": ingest_scheduler.queue_info(leader_task_id)
+            }
+
+        # 4. Task 생성 + 체크포인트 기록 + 스케줄러 대기열에 등록 (SQLite 쓰기는 이벤트 루프 밖에서)
+        logger.info(f"📋 Upload request: file={file_name}, index={index_name or 'default'}")
+        queue = await run_in_threadpool(
+            _enqueue_upload, task_id, file_name, file_data, file_ext, index_name, user['email'], priority, source_path
+        )
 
         return {
             "message": "Upload started",
             "task_id": task_id,
             "file_name": file_name,
-            "index_name": index_name or "default"
+            "index_name": index_name or "default",
+            "queue": queue
         }
         
     except Exception as e:
-        print(f"❌ Upload request failed: {e}")
-        traceback.print_exc()
+        logger.exception(f"❌ Upload request failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/status/{task_id}")
 async def get_task_status(task_id: str):
-    """백그라운드 작업 상태 조회"""
+    """
+    백그라운드 작업 상태 조회 (대기 중이면 queue.position = 대기 순번)
+    같은 파일 업로드에 병합된 task는 실제로 실행 중인 작업의 상태 + shared_with(실행 중인 task_id)
+    """
     task = task_manager.get_task(task_id)
     if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+        # 재시작 전에 실패한 작업은 메모리에는 없고 체크포인트에만 남아 있음
+        checkpoint = await run_in_threadpool(ingest_checkpoints.get, task_id)
+        if not checkpoint:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return {
+            "status": checkpoint["status"],
+            "progress": 0,
+            "message": checkpoint["error"] or f"Interrupted at stage: {checkpoint['stage']}",
+            "checkpoint_stage": checkpoint["stage"]
+        }
+    job_id = task_manager.resolve(task_id)
+    if job_id != task_id:
+        task = {**task, "shared_with": job_id}
+    queue = ingest_scheduler.queue_info(job_id)
+    if queue:
+        task = {**task, "queue": queue}
     return task
 
 
+@router.delete("/status/{task_id}")
+async def cancel_task(task_id: str, request: Request, user: dict = Depends(get_current_user)):
+    """
+    업로드 작업 취소
+    - 대기 중: 대기열에서 바로 제거 → cancelled
+    - 처리 중: 취소 요청(cancelling) → 다음 단계 경계(임베딩/인덱싱은 청크·배치 단위)에서 멈추고
+      이번 작업이 쓴 Blob / 인덱스 문서를 정리한 뒤 cancelled
+    - 같은 파일 업로드가 병합되어 다른 요청도 기다리는 중이면 이 task만 분리 (작업은 계속)
+    """
+    csrf_token = request.headers.get("X-CSRF-Token")
+    if not csrf_token:
+        raise HTTPException(status_code=403, detail="CSRF Token이 필요합니다.")
+    await run_in_threadpool(verify_csrf_token, csrf_token, user['email'])
+
+    task = task_manager.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task["status"] in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Task already finished ({task['status']})")
+
+    job_id = task_manager.resolve(task_id)
+    owner = ingest_inflight.owner_of(task_id) or ingest_scheduler.owner_of(job_id)
+    if owner and owner != user['email'] and user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="본인이 업로드한 작업만 취소할 수 있습니다.")
+
+    if ingest_inflight.leave(task_id):
+        task_manager.detach(task_id, status="cancelled", message="Cancelled (shared upload continues for other requests)")
+    elif ingest_scheduler.cancel(job_id):
+        task_manager.mark_cancelled(job_id, message="Cancelled before processing started")
+        await run_in_threadpool(ingest_checkpoints.delete, job_id)
+        ingest_inflight.finish(job_id)
+    else:
+        task_manager.request_cancel(job_id)
+    logger.info(f"⏹️ [{user['name']}] Cancel requested for task {task_id}")
+
+    return {"task_id": task_id, "status": task_manager.get_task(task_id)["status"]}
+
+
+@router.post("/status/{task_id}/retry")
+async def retry_task(task_id: str, request: Request, user: dict = Depends(get_current_user)):
+    """
+    실패했거나 중단된 업로드를 마지막 체크포인트 단계부터 다시 실행
+    (원본 Blob / Gemini 결과 재사용, 인덱스에 없는 청크만 임베딩)
+    """
+    csrf_token = request.headers.get("X-CSRF-Token")
+    if not csrf_token:
+        raise HTTPException(status_code=403, detail="CSRF Token이 필요합니다.")
+    await run_in_threadpool(verify_csrf_token, csrf_token, user['email'])
+
+    task_id = task_manager.resolve(task_id)
+    checkpoint = await run_in_threadpool(ingest_checkpoints.get, task_id)
+    if not checkpoint:
+        raise HTTPException(status_code=404, detail="No checkpoint for this task")
+    if checkpoint["user"] != user['email'] and user.get('role') != 'admin':
+        raise HTTPException(status_code=403, detail="본인이 업로드한 작업만 재시도할 수 있습니다.")
+    if checkpoint["stage"] == "received":
+        raise HTTPException(status_code=409, detail="원본 파일이 저장되지 않은 작업입니다. 다시 업로드해주세요.")
+
+    claimed = await run_in_threadpool(ingest_checkpoints.claim, task_id)
+    if not claimed:
+        raise HTTPException(status_code=409, detail="Task is still running")
+
+    logger.info(f"🔁 [{user['name']}] Retrying task {task_id} from stage {claimed['stage']}")
+    queue = await run_in_threadpool(resubmit_from_checkpoint, claimed)
+    return {"task_id": task_id, "resumed_from": claimed["stage"], "queue": queue}
+
+
 
 @router.get("/stats")
-async def get_stats(index_name: str = "documents-index"):
-    """시스템 통계 조회 - 최근 업로드 갯수, 인덱스 문서 갯수"""
+async def get_stats(index_name: str = "documents-index", refresh: bool = False):
+    """시스템 통계 조회 - 인덱스 문서 갯수 + 패싯(paraCategory, fileType, tags, language) / TTL 캐시 사용"""
     try:
-        doc_count = get_document_count(index_name)
-        print(f"📊 시스템 통계: {doc_count}개 문서 인덱싱됨")
-        
+        stats = await run_in_threadpool(get_index_stats, index_name, refresh)
+        doc_count = stats["count"]
+
         return {
             "total_documents": doc_count,
             "recent_uploads": doc_count,  # AI Search에 인덱싱된 모든 문서
             "status": "✅ Active",
-            "index_name": index_name
+            "index_name": index_name,
+            "facets": stats["facets"],
+            "cached": stats["cached"]
         }
     except Exception as e:
-        print(f"❌ Stats error: {e}")
+        logger.error(f"❌ Stats error: {e}")
         return {
             "total_documents": 0,
             "recent_uploads": 0,
             "status": "⚠️ Error",
-            "index_name": index_name
+            "index_name": index_name,
+            "facets": {}
         }
 
 @router.get("/documents")
-async def list_documents():
-    """AI Search 인덱스에 저장된 모든 문서 목록 조회 - 실제 content 포함"""
+async def list_documents(
+    index_name: str = None,
+    cursor: str = None,
+    page_size: int = 50,
+    include_content: bool = False,
+    user: dict = Depends(get_optional_user)
+):
+    """
+    AI Search 인덱스 문서 목록 조회 (cursor 기반 페이지네이션)
+    - 기본은 목록 필드만 반환, 본문은 /documents/{doc_id}로 개별 조회
+    - include_content=true면 현재 페이지 문서의 content 포함 (로그인 필요)
+    - 다음 페이지는 응답의 next_cursor를 cursor로 전달
+    - truncated=true면 id가 sortable이 아닌 인덱스라 skip 한도(100,000건)에서 더 읽을 수 없음
+    """
+    if include_content and user is None:
+        raise HTTPException(
+            status_code=401,
+            detail="include_content requires authentication",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     try:
-        from app.services.search_service import get_search_client
-        
-        search_client = get_search_client()
-        results = search_client.search(search_text="*", include_total_count=True, top=100)
-        
+        select = LISTING_FIELDS + ["content"] if include_content else LISTING_FIELDS
+        page = await run_in_threadpool(list_documents_page, index_name, cursor, page_size, select)
+
         docs = []
-        for result in results:
-            docs.append({
-                "id": result.get("id", ""),
-                "file_name": result.get("file_name", "Unknown"),
-                "content": result.get("content", ""),  # 실제 content 포함!
-                "content_length": len(result.get("content", ""))
-            })
-        
-        print(f"📋 API 응답: {len(docs)}개 문서 (실제 content 포함)")
-        
+        for doc in page["documents"]:
+            item = dict(doc, file_name=doc.get("fileName") or "Unknown")
+            if include_content:
+                item["content_length"] = len(doc.get("content") or "")
+            docs.append(item)
+
+        logger.info(f"📋 API 응답: {len(docs)}개 문서 (next_cursor: {'있음' if page['next_cursor'] else '없음'})")
+
         return {
             "count": len(docs),
+            "total": page["total"],
+            "next_cursor": page["next_cursor"],
+            "truncated": page["truncated"],
             "documents": docs
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"❌ Documents list error: {e}")
-        traceback.print_exc()
+        logger.exception(f"❌ Documents list error: {e}")
         return {
             "count": 0,
+            "total": 0,
+            "next_cursor": None,
+            "truncated": False,
             "documents": []
         }
 
+@router.get("/documents/export")
+async def export_documents(
+    index_name: str = None,
+    include_content: bool = False,
+    user: dict = Depends(get_current_user)
+):
+    """
+    인덱스 전체 문서를 NDJSON으로 스트리밍 (한 줄에 문서 하나, 페이지 단위로 읽어 메모리 일정)
+    skip 한도 때문에 끝까지 읽지 못하면 마지막 줄에 {"truncated": true, "error": ...}
+    """
+    select = LISTING_FIELDS + ["content"] if include_content else LISTING_FIELDS
+    logger.info(f"📤 [{user['name']}] 문서 내보내기 - index: {index_name or 'default'}")
+
+    def generate():
+        try:
+            for doc in iter_documents(index_name=index_name, select=select):
+                yield json.dumps(doc, ensure_ascii=False, default=str) + "\n"
+        except DocumentListTruncated as e:
+            yield json.dumps({"truncated": True, "error": str(e)}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.get("/documents/{doc_id}")
+async def get_document(doc_id: str, index_name: str = None, user: dict = Depends(get_current_user)):
+    """문서 한 건의 전체 내용 조회 (content 포함)"""
+    doc = await run_in_threadpool(get_document_by_id, doc_id, index_name)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return doc
+
 @router.get("/indexes")
-async def list_indexes():
-    """사용 가능한 모든 RAG 인덱스 목록 조회"""
+async def list_indexes(refresh: bool = False):
+    """사용 가능한 모든 RAG 인덱스 목록 조회 (TTL 캐시)"""
     try:
-        from app.services.search_service import get_search_index_client
-        
-        index_client = get_search_index_client()
-        indexes = index_client.list_indexes()
-        
-        index_list = []
-        for index in indexes:
-            index_list.append({
-                "name": index.name,
-                "fields_count": len(index.fields) if index.fields else 0
-            })
-        
-        print(f"📋 사용 가능한 인덱스: {len(index_list)}개")
-        for idx in index_list:
-            print(f"   - {idx['name']}")
-        
+        index_list = await run_in_threadpool(list_indexes_cached, refresh)
+        logger.info(f"📋 사용 가능한 인덱스: {len(index_list)}개")
+
         return {
             "count": len(index_list),
             "indexes": index_list
         }
     except Exception as e:
-        print(f"❌ Index list error: {e}")
-        traceback.print_exc()
+        logger.exception(f"❌ Index list error: {e}")
         return {
             "count": 0,
             "indexes": []
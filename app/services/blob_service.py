@@ -1,9 +1,12 @@
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
+# Azure SDK는 처음 사용하는 함수 안에서 import (앱 시작 시간 단축)
 from datetime import datetime, timedelta
-from app.config import AZURE_STORAGE_ACCOUNT_NAME, AZURE_STORAGE_ACCOUNT_KEY, ENVIRONMENT
-from azure.identity import DefaultAzureCredential
+from app.config import AZURE_STORAGE_ACCOUNT_NAME, AZURE_STORAGE_ACCOUNT_KEY, ENVIRONMENT, get_credential
+import logging
+import json
 import os
 
+logger = logging.getLogger(__name__)
+
 # ===== Blob 클라이언트 초기화 =====
 
 _blob_client = None
@@ -12,19 +15,31 @@ def get_blob_client():
     """Blob Service Client (싱글톤)"""
     global _blob_client
     if _blob_client is None:
+        from azure.storage.blob import BlobServiceClient
+
         if ENVIRONMENT == "development":
             # 로컬: 연결 문자열 사용
             connection_string = f"DefaultEndpointsProtocol=https;AccountName={AZURE_STORAGE_ACCOUNT_NAME};AccountKey={AZURE_STORAGE_ACCOUNT_KEY};EndpointSuffix=core.windows.net"
             _blob_client = BlobServiceClient.from_connection_string(connection_string)
         else:
-            # 프로덕션: Managed Identity 사용
-            credential = DefaultAzureCredential()
+            # 프로덕션: Managed Identity 사용 (config의 캐시된 자격증명 공유)
+            credential = get_credential()
             _blob_client = BlobServiceClient(
                 account_url=f"https://{AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net",
                 credential=credential
             )
     return _blob_client
 
+def get_container_name(index_name: str = None, kind: str = "raw") -> str:
+    """
+    인덱스 이름에 따른 컨테이너명 (kind: "raw" | "processed")
+    인덱스명에서 특수문자 제거 및 소문자 변환 (Azure Blob 컨테이너 명명 규칙)
+    """
+    if index_name:
+        safe_index = index_name.lower().replace('_', '-').replace(' ', '-')
+        return f"{safe_index}-{kind}"
+    return f"kkuldanji-mvp-{kind}"  # 기본값
+
 # ===== 기존 함수들 (유지) =====
 
 def upload_to_blob(file_name: str, file_data: bytes, index_name: str = None):
@@ -38,14 +53,9 @@ def upload_to_blob(file_name: str, file_data: bytes, index_name: str = None):
         index_name: RAG 인덱스 이름 (None이면 기본 컨테이너 사용)
     """
     # 인덱스 이름에 따른 동적 컨테이너명 생성
-    if index_name:
-        # 인덱스명에서 특수문자 제거 및 소문자 변환 (Azure Blob 컨테이너 명명 규칙)
-        safe_index = index_name.lower().replace('_', '-').replace(' ', '-')
-        container_name = f"{safe_index}-raw"
-    else:
-        container_name = "kkuldanji-mvp-raw"  # 기본값
+    container_name = get_container_name(index_name, "raw")
 
-    print(f"📦 Using blob container: {container_name}")
+    logger.debug(f"📦 Using blob container: {container_name}")
     
     try:
         client = get_blob_client()
@@ -57,32 +67,40 @@ def upload_to_blob(file_name: str, file_data: bytes, index_name: str = None):
         # 컨테이너가 없으면 생성
         try:
             if not container_client.exists():
-                print(f"📁 Creating container: {container_name}")
+                logger.info(f"📁 Creating container: {container_name}")
                 container_client.create_container()
         except Exception as e:
-            print(f"⚠️ Container creation check failed: {e}")
+            logger.warning(f"⚠️ Container creation check failed: {e}")
 
         blob_client.upload_blob(file_data, overwrite=True)
-        
-        # SAS Token 생성 (1시간 유효)
-        sas_token = generate_blob_sas(
-            account_name=AZURE_STORAGE_ACCOUNT_NAME,
-            container_name=container_name,
-            blob_name=file_name,
-            account_key=AZURE_STORAGE_ACCOUNT_KEY,
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(hours=1)
-        )
-        
-        blob_url_with_sas = f"https://{AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/{container_name}/{file_name}?{sas_token}"
-        
-        return blob_url_with_sas
+
+        return get_blob_sas_url(file_name, index_name=index_name)
     
     except Exception as e:
-        print(f"❌ Blob upload failed: {e}")
+        logger.error(f"❌ Blob upload failed: {e}")
         raise
 
-def save_processed_json(file_name: str, json_str: str, index_name: str = None):
+def get_blob_sas_url(file_name: str, index_name: str = None, kind: str = "raw") -> str:
+    """이미 올라가 있는 Blob의 읽기 전용 SAS URL (1시간 유효)"""
+    from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+
+    container_name = get_container_name(index_name, kind)
+    sas_token = generate_blob_sas(
+        account_name=AZURE_STORAGE_ACCOUNT_NAME,
+        container_name=container_name,
+        blob_name=file_name,
+        account_key=AZURE_STORAGE_ACCOUNT_KEY,
+        permission=BlobSasPermissions(read=True),
+        expiry=datetime.utcnow() + timedelta(hours=1)
+    )
+    return f"https://{AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/{container_name}/{file_name}?{sas_token}"
+
+def download_blob(file_name: str, index_name: str = None, kind: str = "raw") -> bytes:
+    """Blob 원본 바이트 다운로드 (체크포인트에서 재개할 때 원본 파일 다시 읽기)"""
+    container_client = get_blob_client().get_container_client(get_container_name(index_name, kind))
+    return container_client.get_blob_client(file_name).download_blob().readall()
+
+def save_processed_json(file_name: str, json_str: str, index_name: str = None, metadata: dict = None):
     """
     처리된 JSON을 Blob Storage에 저장
 
@@ -90,15 +108,12 @@ def save_processed_json(file_name: str, json_str: str, index_name: str = None):
         file_name: 저장할 파일명
         json_str: JSON 문자열
         index_name: RAG 인덱스 이름 (None이면 기본 컨테이너 사용)
+        metadata: Blob 메타데이터 (ASCII 값만, 예: {"parent_id": ...} - 재색인 시 내려받지 않고 파일 식별)
     """
     # 인덱스 이름에 따른 동적 컨테이너명 생성
-    if index_name:
-        safe_index = index_name.lower().replace('_', '-').replace(' ', '-')
-        container_name = f"{safe_index}-processed"
-    else:
-        container_name = "kkuldanji-mvp-processed"  # 기본값
+    container_name = get_container_name(index_name, "processed")
 
-    print(f"📦 Using processed container: {container_name}")
+    logger.debug(f"📦 Using processed container: {container_name}")
     
     try:
         client = get_blob_client()
@@ -109,15 +124,54 @@ def save_processed_json(file_name: str, json_str: str, index_name: str = None):
         # 컨테이너가 없으면 생성
         try:
             if not container_client.exists():
-                print(f"📁 Creating container: {container_name}")
+                logger.info(f"📁 Creating container: {container_name}")
                 container_client.create_container()
         except Exception as e:
-            print(f"⚠️ Container creation check failed: {e}")
+            logger.warning(f"⚠️ Container creation check failed: {e}")
 
-        blob_client.upload_blob(json_str.encode('utf-8'), overwrite=True)
+        blob_client.upload_blob(json_str.encode('utf-8'), overwrite=True, metadata=metadata)
         
-        print(f"✅ Processed JSON saved: {file_name}")
+        logger.info(f"✅ Processed JSON saved: {file_name}")
     
     except Exception as e:
-        print(f"⚠️ Failed to save processed JSON: {e}")
+        logger.warning(f"⚠️ Failed to save processed JSON: {e}")
         raise
+
+
+def list_processed_blobs(index_name: str = None) -> list:
+    """
+    처리된 JSON Blob 목록 ({task_id}_processed.json)
+    Returns: [{"name", "last_modified", "parent_id"}, ...] (parent_id는 메타데이터가 없는 예전 Blob이면 None)
+    """
+    container_client = get_blob_client().get_container_client(get_container_name(index_name, "processed"))
+    return [
+        {
+            "name": blob.name,
+            "last_modified": blob.last_modified,
+            "parent_id": (blob.metadata or {}).get("parent_id"),
+        }
+        for blob in container_client.list_blobs(include=["metadata"])
+        if blob.name.endswith("_processed.json")
+    ]
+
+def download_processed_json(file_name: str, index_name: str = None):
+    """처리된 JSON Blob을 내려받아 파싱 (없으면 None)"""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    container_client = get_blob_client().get_container_client(get_container_name(index_name, "processed"))
+    try:
+        data = container_client.get_blob_client(file_name).download_blob().readall()
+    except ResourceNotFoundError:
+        return None
+    return json.loads(data.decode("utf-8"))
+
+def delete_blob(file_name: str, index_name: str = None, kind: str = "raw") -> bool:
+    """Blob 삭제 (취소된 업로드 정리용) - 없으면 False"""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    container_client = get_blob_client().get_container_client(get_container_name(index_name, kind))
+    try:
+        container_client.get_blob_client(file_name).delete_blob()
+    except ResourceNotFoundError:
+        return False
+    return True
@@ -0,0 +1,136 @@
+# 줄 번호 기반 청킹 (LLM은 청크 경계와 메타데이터만 출력, 본문은 원문에서 잘라서 채움)
+# 예전에는 Gemini가 청크마다 content/rawCode에 원문을 그대로 다시 써야 해서
+# 출력 토큰이 입력 이상으로 커지고(= 응답 지연의 대부분), max_tokens에 걸려 긴 문서가 잘리고, 원문이 바뀌는 경우도 있었음.
+#
+# 1. number_lines(): 입력 텍스트를 줄 단위 세그먼트로 나누고 "L번호: 내용" 형태로 번호를 붙임
+#    (너무 긴 줄은 ANALYZE_SEGMENT_MAX_CHARS 기준으로 나눔, 빈 줄은 번호 없이 건너뜀)
+# 2. LLM 응답의 청크마다 startLine / endLine만 받음
+# 3. rebuild_chunks(): 경계를 정리(정렬, 겹침 제거, 빈틈은 앞 청크에 붙임)한 뒤
+#    원문[첫 줄 시작 : 마지막 줄 끝]을 그대로 잘라서 content(문서) / rawCode(코드)에 넣음
+#    → 본문은 항상 원문과 글자 그대로 같고, 모든 줄이 정확히 한 청크에 들어감
+
+import logging
+import re
+
+from app.config import ANALYZE_SEGMENT_MAX_CHARS
+
+logger = logging.getLogger(__name__)
+
+# 문서 전체 공통 필드 (LLM이 응답 최상위에 한 번만 쓰면 모든 청크에 복사)
+DOCUMENT_FIELDS = ("parentSummary", "processedDate", "serviceDomain", "language", "framework")
+
+_BREAK = re.compile(r"(?<=[.!?。])\s+|\s+")
+
+
+def _split_long(text: str, start: int, end: int, max_chars: int) -> list:
+    """긴 줄을 문장/공백 경계에서 max_chars 이하 조각으로 나눔 → [(start, end), ...]"""
+    pieces = []
+    while end - start > max_chars:
+        cut = None
+        for match in _BREAK.finditer(text, start + max_chars // 2, start + max_chars):
+            cut = match.end()
+        cut = cut or start + max_chars
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def number_lines(text: str, max_chars: int = ANALYZE_SEGMENT_MAX_CHARS) -> tuple:
+    """
+    텍스트 → (번호 붙인 입력 문자열, 세그먼트 위치 리스트)
+    세그먼트 n(1부터)은 원문 text[segments[n-1][0]:segments[n-1][1]]
+    """
+    segments = []
+    position = 0
+    for line in text.splitlines(keepends=True):
+        line_start, line_end = position, position + len(line.rstrip("\r\n"))
+        position += len(line)
+        if not text[line_start:line_end].strip():
+            continue
+        segments.extend(_split_long(text, line_start, line_end, max_chars))
+
+    numbered = "\n".join(f"L{i}: {text[start:end]}" for i, (start, end) in enumerate(segments, 1))
+    return numbered, segments
+
+
+def _line_number(value):
+    if isinstance(value, str):
+        value = value.strip().lstrip("Ll")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def rebuild_chunks(chunks: list, text: str, segments: list, file_type: str = "doc", document: dict = None) -> list:
+    """
+    LLM이 준 줄 번호로 청크 본문 채우기
+
+    Args:
+        chunks: LLM 응답 청크 (startLine / endLine + 메타데이터)
+        text: 번호를 붙이기 전 원문
+        segments: number_lines()가 돌려준 세그먼트 위치
+        file_type: "code"면 rawCode에, 그 외는 content에 원문을 넣음
+        document: 응답 최상위의 문서 공통 필드 (DOCUMENT_FIELDS) - 청크에 없으면 복사
+    """
+    total = len(segments)
+    if not total:
+        return []
+
+    spans = []
+    for chunk in chunks:
+        # 최상위에 없으면 chunkMeta 안에 넣은 경우도 허용
+        meta = chunk.get("chunkMeta") if isinstance(chunk.get("chunkMeta"), dict) else {}
+        start = _line_number(chunk.pop("startLine", None) or meta.get("startLine"))
+        end = _line_number(chunk.pop("endLine", None) or meta.get("endLine"))
+        if start is None or end is None:
+            logger.warning(f"⚠️ Chunk without line range dropped: {chunk.get('chunkSummary') or chunk.get('codeExplanation')}")
+            continue
+        start, end = max(1, min(start, end)), min(total, max(start, end))
+        if start <= total:
+            spans.append((start, end, chunk))
+    spans.sort(key=lambda span: (span[0], span[1]))
+
+    # 겹치면 뒤 청크 시작을 밀고, 빈틈은 앞 청크 끝을 늘려서 모든 줄이 정확히 한 청크에 들어가게
+    normalized = []
+    for start, end, chunk in spans:
+        if normalized:
+            start = max(start, normalized[-1][1] + 1)
+            if start > end:
+                continue
+            normalized[-1][1] = start - 1
+        else:
+            start = 1
+        normalized.append([start, end, chunk])
+    if not normalized:
+        return []
+    normalized[-1][1] = total
+
+    document = {key: value for key, value in (document or {}).items() if key in DOCUMENT_FIELDS and value}
+    body_field = "rawCode" if file_type == "code" else "content"
+    rebuilt = []
+    for index, (start, end, chunk) in enumerate(normalized, 1):
+        body_start, body_end = segments[start - 1][0], segments[end - 1][1]
+        body = text[body_start:body_end]
+        chunk[body_field] = body
+        if file_type == "code" and not chunk.get("content"):
+            chunk["content"] = " ".join(
+                str(chunk.get(key) or "") for key in ("codeExplanation", "designIntent")
+            ).strip() or body
+        for key, value in document.items():
+            chunk.setdefault(key, value)
+
+        meta = chunk.get("chunkMeta") if isinstance(chunk.get("chunkMeta"), dict) else {}
+        # startLine / endLine은 원본 파일의 실제 줄 번호 (세그먼트 번호 아님)
+        meta.update(
+            index=index, total=len(normalized), isLast=index == len(normalized),
+            startLine=text.count("\n", 0, body_start) + 1, endLine=text.count("\n", 0, body_end) + 1
+        )
+        chunk["chunkMeta"] = meta
+        rebuilt.append(chunk)
+
+    dropped = len(chunks) - len(rebuilt)
+    if dropped:
+        logger.warning(f"⚠️ {dropped} chunks dropped while rebuilding from line ranges")
+    return rebuilt
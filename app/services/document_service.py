@@ -1,15 +1,25 @@
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
+# Azure SDK / python-docx는 처음 사용하는 함수 안에서 import (앱 시작 시간 단축)
 from app.config import AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT, AZURE_DOCUMENT_INTELLIGENCE_KEY
 
 from io import BytesIO
-from docx import Document
+import logging
+
+logger = logging.getLogger(__name__)
+
+_document_client = None
 
 def get_document_client():
-    return DocumentAnalysisClient(
-        endpoint=AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT,
-        credential=AzureKeyCredential(AZURE_DOCUMENT_INTELLIGENCE_KEY)
-    )
+    """Document Intelligence 클라이언트 (싱글톤)"""
+    global _document_client
+    if _document_client is None:
+        from azure.ai.formrecognizer import DocumentAnalysisClient
+        from azure.core.credentials import AzureKeyCredential
+
+        _document_client = DocumentAnalysisClient(
+            endpoint=AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT,
+            credential=AzureKeyCredential(AZURE_DOCUMENT_INTELLIGENCE_KEY)
+        )
+    return _document_client
 
 def extract_text_from_url(blob_url: str) -> str:
     client = get_document_client()
@@ -29,15 +39,17 @@ def extract_text_from_docx(file_data: bytes) -> str:
     Azure API를 타지 않으므로 빠르고 비용이 들지 않습니다.
     """
     try:
-        print("[DocService] Extracting text locally using python-docx...")
+        from docx import Document
+
+        logger.info("[DocService] Extracting text locally using python-docx...")
         doc = Document(BytesIO(file_data))
         full_text = []
         for para in doc.paragraphs:
             full_text.append(para.text)
         
         extracted_text = '\n'.join(full_text)
-        print(f"[DocService] Local extraction complete. Extracted {len(extracted_text)} characters.")
+        logger.info(f"[DocService] Local extraction complete. Extracted {len(extracted_text)} characters.")
         return extracted_text
     except Exception as e:
-        print(f"[DocService] Error extracting text from docx: {e}")
+        logger.error(f"[DocService] Error extracting text from docx: {e}")
         raise e
\ No newline at end of file
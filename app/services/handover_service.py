@@ -0,0 +1,314 @@
+# 인수인계서 생성 엔진 (Map-Reduce)
+# 1. Map: 섹션별로 relatedSection 필터를 걸어 관련 청크만 검색하고, 섹션 단위로 GPT 호출
+# 2. Reduce: 완성된 섹션들을 프론트엔드 HandoverData 형식으로 병합
+# 섹션 생성은 HANDOVER_MAX_CONCURRENCY 개수만큼 병렬로 실행됨
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import copy
+import hashlib
+import threading
+
+from app.config import (
+    HANDOVER_MAX_CONCURRENCY,
+    HANDOVER_SECTION_TOP_K,
+    HANDOVER_SECTION_CONTEXT_CHARS
+)
+from app.services.search_service import search_chunks_by_section
+from app.services.openai_service import generate_handover_section
+from app.services.model_router import route_model
+from app.logging_setup import propagate_context
+
+logger = logging.getLogger(__name__)
+
+# ===== 섹션 정의 =====
+# related: 검색 시 사용할 relatedSection 값 (None이면 필터 없이 최신 청크 사용)
+# schema: 해당 섹션의 JSON 형식 (프론트엔드 HandoverData 기준)
+# default: 자료가 없을 때 사용할 기본값
+
+HANDOVER_SECTIONS = {
+    "overview": {
+        "related": None,
+        "schema": """{
+    "transferor": {"name": "인계자명", "position": "직급/부서", "contact": "연락처"},
+    "transferee": {"name": "인수자명", "position": "직급/부서", "contact": "연락처", "startDate": "시작일"},
+    "reason": "인수인계 사유",
+    "background": "업무 배경",
+    "period": "근무 기간",
+    "schedule": [{"date": "날짜", "activity": "활동"}]
+}""",
+        "default": {
+            "transferor": {"name": "", "position": "", "contact": ""},
+            "transferee": {"name": "", "position": "", "contact": ""}
+        },
+    },
+    "jobStatus": {
+        "related": ["jobStatus"],
+        "schema": """{
+    "title": "직책",
+    "responsibilities": ["책임내용1", "책임내용2"],
+    "authority": "권한",
+    "reportingLine": "보고체계",
+    "teamMission": "팀 미션",
+    "teamGoals": ["목표1", "목표2"]
+}""",
+        "default": {"title": "", "responsibilities": []},
+    },
+    "priorities": {
+        "related": ["priorities"],
+        "schema": """[
+    {"rank": 1, "title": "우선과제명", "status": "상태", "solution": "해결방안", "deadline": "마감일"}
+]""",
+        "default": [],
+    },
+    "stakeholders": {
+        "related": ["stakeholders"],
+        "schema": """{
+    "manager": "상급자",
+    "internal": [{"name": "이름", "role": "역할"}],
+    "external": [{"name": "이름", "role": "역할"}]
+}""",
+        "default": {"manager": "", "internal": [], "external": []},
+    },
+    "teamMembers": {
+        "related": ["stakeholders", "jobStatus"],
+        "schema": """[
+    {"name": "팀원명", "position": "직급", "role": "역할", "notes": "비고"}
+]""",
+        "default": [],
+    },
+    "ongoingProjects": {
+        "related": ["ongoingProjects"],
+        "schema": """[
+    {"name": "프로젝트명", "owner": "담당자", "status": "상태", "progress": 50, "deadline": "마감일", "description": "설명"}
+]""",
+        "default": [],
+    },
+    "risks": {
+        "related": ["risks"],
+        "schema": """{"issues": "현안", "risks": "위험요소"}""",
+        "default": {"issues": "", "risks": ""},
+    },
+    "roadmap": {
+        "related": ["roadmap"],
+        "schema": """{"shortTerm": "단기계획", "longTerm": "장기계획"}""",
+        "default": {"shortTerm": "", "longTerm": ""},
+    },
+    "resources": {
+        "related": ["resources"],
+        "schema": """{
+    "docs": [{"category": "분류", "name": "문서명", "location": "위치"}],
+    "systems": [{"name": "시스템명", "usage": "사용방법", "contact": "담당자"}],
+    "contacts": [{"category": "분류", "name": "이름", "position": "직급", "contact": "연락처"}]
+}""",
+        "default": {"docs": [], "systems": [], "contacts": []},
+    },
+    "checklist": {
+        "related": ["priorities", "risks", "resources"],
+        "schema": """[{"text": "확인항목", "completed": false}]""",
+        "default": [],
+    },
+}
+
+SAMPLE_CONTEXT = """
+
+[샘플: 프로젝트 현황 보고]
+프로젝트명: 시스템 고도화
+담당자: 김철수 과장 (kim.cs@company.com)
+인수자: 이영희 대리 (lee.yh@company.com)
+인수 예정일: 2025-02-15
+개발현황: 70% 진행 중 (메인 기능 개발 완료, 최적화 진행 중)
+주요 담당 업무: 백엔드 API 개발, 데이터베이스 설계, 보안 구현
+팀원: 박준호(프론트엔드), 최민수(QA)
+위험요소: 일정 지연 가능성 (2주)
+다음 마일스톤: 2025-02-01 알파 테스트"""
+
+
+# ===== 섹션 결과 캐시 =====
+# {(index_name, section): {"input_hash": str, "value": ...}}
+# 섹션에 입력된 청크(id + 버전)와 사용자 자료, 생성할 모델이 같으면 LLM을 다시 호출하지 않음
+_section_cache = {}
+_section_cache_lock = threading.Lock()
+
+
+def section_input_hash(section: str, chunks: list, file_context: str, model: str = "") -> str:
+    """섹션 생성에 사용된 입력의 해시 (청크 id/버전 + 사용자 자료 + 스키마 + 모델)"""
+    h = hashlib.sha256()
+    h.update(section.encode("utf-8"))
+    # 라우팅으로 fast/big 모델이 바뀌면 (자료 증가, 설정 변경) 다른 결과로 취급
+    h.update(f"|{model}|".encode("utf-8"))
+    h.update(HANDOVER_SECTIONS[section]["schema"].encode("utf-8"))
+    for chunk in chunks:
+        # 같은 id라도 재처리되면 processedDate/내용이 바뀌므로 버전으로 함께 사용
+        version = hashlib.sha256(
+            f"{chunk.get('processedDate')}|{chunk.get('chunkSummary')}|{chunk.get('content')}".encode("utf-8")
+        ).hexdigest()
+        h.update(f"{chunk.get('id')}:{version};".encode("utf-8"))
+    h.update(b"|")
+    # 프롬프트에 실제로 들어가는 앞부분만 (그 뒤는 결과에 영향이 없음)
+    h.update((file_context or "")[:HANDOVER_SECTION_CONTEXT_CHARS].encode("utf-8"))
+    return h.hexdigest()
+
+
+def get_cached_section(index_name: str, section: str, input_hash: str):
+    """입력 해시가 같을 때만 캐시된 섹션 값 반환 (없으면 None)"""
+    with _section_cache_lock:
+        entry = _section_cache.get((index_name or "", section))
+    if entry and entry["input_hash"] == input_hash:
+        return copy.deepcopy(entry["value"])
+    return None
+
+
+def set_cached_section(index_name: str, section: str, input_hash: str, value):
+    with _section_cache_lock:
+        _section_cache[(index_name or "", section)] = {
+            "input_hash": input_hash,
+            "value": copy.deepcopy(value),
+        }
+
+
+def clear_section_cache(index_name: str = None):
+    """섹션 캐시 비우기 (index_name 지정 시 해당 인덱스만)"""
+    with _section_cache_lock:
+        if index_name is None:
+            _section_cache.clear()
+        else:
+            for key in [k for k in _section_cache if k[0] == index_name]:
+                del _section_cache[key]
+
+
+def empty_handover() -> dict:
+    """모든 섹션이 기본값으로 채워진 HandoverData"""
+    return {section: copy.deepcopy(spec["default"]) for section, spec in HANDOVER_SECTIONS.items()}
+
+
+def build_section_context(chunks: list, max_chars: int = HANDOVER_SECTION_CONTEXT_CHARS) -> str:
+    """검색된 청크를 섹션 프롬프트용 컨텍스트 문자열로 변환 (max_chars 초과분은 제외)"""
+    parts = []
+    total = 0
+    for chunk in chunks:
+        part = f"[파일: {chunk.get('fileName') or 'Unknown'}]\n"
+        if chunk.get("chunkSummary"):
+            part += f"요약: {chunk['chunkSummary']}\n"
+        part += f"{chunk.get('content') or ''}\n"
+
+        if total + len(part) > max_chars:
+            remaining = max_chars - total
+            if remaining > 200:
+                parts.append(part[:remaining])
+            break
+        parts.append(part)
+        total += len(part)
+    return "\n".join(parts)
+
+
+def retrieve_section_chunks(index_name: str = None) -> dict:
+    """섹션별 관련 청크 검색 ({section: [chunk, ...]})"""
+    # 같은 relatedSection 조합은 한 번만 검색
+    queries = {}
+    for section, spec in HANDOVER_SECTIONS.items():
+        key = tuple(spec["related"]) if spec["related"] else None
+        queries.setdefault(key, []).append(section)
+
+    section_chunks = {}
+    with ThreadPoolExecutor(max_workers=HANDOVER_MAX_CONCURRENCY) as executor:
+        futures = {
+            executor.submit(
+                propagate_context(search_chunks_by_section),
+                list(key) if key else None,
+                index_name,
+                HANDOVER_SECTION_TOP_K
+            ): sections
+            for key, sections in queries.items()
+        }
+        for future in as_completed(futures):
+            chunks = future.result()
+            for section in futures[future]:
+                section_chunks[section] = chunks
+
+    return section_chunks
+
+
+def _generate_section(section: str, chunks: list, file_context: str, index_name: str = None, use_cache: bool = True):
+    """
+    섹션 하나 생성
+    - 자료가 전혀 없으면 LLM 호출 없이 기본값 반환
+    - 입력(청크 id/버전 + 사용자 자료)이 이전과 같으면 캐시된 결과 반환
+    """
+    spec = HANDOVER_SECTIONS[section]
+
+    context = build_section_context(chunks)
+    if file_context:
+        context = file_context[:HANDOVER_SECTION_CONTEXT_CHARS] + ("\n\n---\n\n" + context if context else "")
+
+    if not context.strip():
+        return copy.deepcopy(spec["default"])
+
+    # generate_handover_section과 같은 라우팅 결정 (기록은 실제 호출 때만)
+    model = route_model("generate_handover_section", chars=len(context), record=False)["model"]
+    input_hash = section_input_hash(section, chunks, file_context, model)
+    if use_cache:
+        cached = get_cached_section(index_name, section, input_hash)
+        if cached is not None:
+            logger.info(f"♻️  [{section}] 입력 변경 없음 - 캐시 사용")
+            return cached
+
+    try:
+        value = generate_handover_section(section, spec["schema"], context)
+    except Exception as e:
+        # 실패한 결과는 캐시하지 않음 (다음 요청에서 재시도)
+        logger.exception(f"⚠️ [{section}] 섹션 생성 실패: {e}")
+        return copy.deepcopy(spec["default"])
+
+    if value is None:
+        return copy.deepcopy(spec["default"])
+
+    set_cached_section(index_name, section, input_hash, value)
+    return value
+
+
+def iter_handover_sections(file_context: str = "", index_name: str = None, use_cache: bool = True):
+    """
+    섹션을 병렬로 생성하고, 완료되는 순서대로 (section, value)를 yield
+    입력이 바뀌지 않은 섹션은 캐시에서 바로 반환됨
+
+    Args:
+        file_context: 사용자가 직접 전달한 자료 (모든 섹션에 공통으로 포함)
+        index_name: 검색할 RAG 인덱스 이름 (None이면 기본 인덱스)
+        use_cache: False면 캐시를 무시하고 모든 섹션을 다시 생성
+    """
+    logger.info(f"📄 섹션별 청크 검색 중... (index: {index_name or 'default'})")
+    section_chunks = retrieve_section_chunks(index_name)
+
+    total_chunks = len({c["id"] for chunks in section_chunks.values() for c in chunks})
+    logger.info(f"📋 섹션 검색 완료 - 고유 청크 {total_chunks}개")
+
+    # 인덱스와 사용자 자료가 모두 비어있으면 샘플 데이터 사용 (기존 동작 유지)
+    if total_chunks == 0 and (not file_context or len(file_context.strip()) < 20):
+        logger.info("ℹ️  파일 컨텍스트가 부족함 - 샘플 데이터 추가")
+        file_context = (file_context or "") + SAMPLE_CONTEXT
+
+    with ThreadPoolExecutor(max_workers=HANDOVER_MAX_CONCURRENCY) as executor:
+        futures = {
+            executor.submit(
+                propagate_context(_generate_section),
+                section,
+                section_chunks.get(section, []),
+                file_context,
+                index_name,
+                use_cache
+            ): section
+            for section in HANDOVER_SECTIONS
+        }
+        for future in as_completed(futures):
+            section = futures[future]
+            yield section, future.result()
+
+
+def build_handover(file_context: str = "", index_name: str = None, use_cache: bool = True) -> dict:
+    """모든 섹션을 생성하여 HandoverData 형식으로 병합"""
+    handover = empty_handover()
+    for section, value in iter_handover_sections(file_context, index_name, use_cache=use_cache):
+        handover[section] = value
+        logger.info(f"✅ [{section}] 섹션 생성 완료")
+    return handover
@@ -0,0 +1,212 @@
+# Azure AI Search 인덱싱 Writer
+# - 문서 수와 직렬화 크기(bytes) 기준으로 배치를 나눔 (서비스 요청당 제한: 1000건 / 16MB)
+#   크기는 json.dumps 없이 추정 (3072차원 벡터를 문서마다 직렬화하는 것이 인덱싱 CPU의 대부분이었음)
+# - 배치를 병렬로 업로드
+# - 실패한 문서만 골라서 재시도 (재시도 가능한 상태 코드일 때만)
+# - 문서별 결과를 콜백(on_status)으로 알려줌
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import sleep
+import logging
+import random
+
+from app.config import (
+    INDEX_BATCH_MAX_DOCS,
+    INDEX_BATCH_MAX_BYTES,
+    INDEX_UPLOAD_CONCURRENCY,
+    INDEX_UPLOAD_MAX_RETRIES
+)
+from app.logging_setup import propagate_context
+
+logger = logging.getLogger(__name__)
+
+# 문서 단위 재시도 대상 상태 코드 (충돌, 인덱스 일시 사용 불가, 스로틀링, 서비스 불가)
+RETRYABLE_STATUS_CODES = {409, 422, 429, 503}
+
+
+# 숫자 하나의 JSON 크기 상한 (float repr 최대 자릿수 + 부호/지수 + 구분자)
+NUMBER_BYTES = 25
+# 필드 하나의 키 따옴표 / 콜론 / 구분자
+FIELD_OVERHEAD_BYTES = 4
+
+
+def _value_size(value) -> int:
+    if isinstance(value, str):
+        # SDK는 ensure_ascii로 직렬화할 수 있으므로 비 ASCII 문자는 \uXXXX(6 bytes)로 계산 + 따옴표
+        return len(value.encode("ascii", "backslashreplace")) + 2 + value.count('"') + value.count("\\")
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (int, float)) and not isinstance(value[0], bool):
+            # 벡터: 원소당 고정 크기
+            return 2 + len(value) * (NUMBER_BYTES + 1)
+        return 2 + sum(_value_size(item) + 1 for item in value)
+    if isinstance(value, dict):
+        return document_size(value)
+    if value is None or isinstance(value, bool):
+        return 5
+    if isinstance(value, (int, float)):
+        return NUMBER_BYTES
+    return _value_size(str(value))
+
+
+def document_size(document: dict) -> int:
+    """
+    직렬화 크기 추정 (bytes, 실제보다 크거나 같게)
+    벡터는 원소 수 × 고정 크기, 문자열은 길이로 계산 - 배치 분할용이라 정확한 값은 필요 없음
+    """
+    return 2 + sum(len(key) + FIELD_OVERHEAD_BYTES + _value_size(value) for key, value in document.items())
+
+
+def split_batches(documents: list, max_docs: int = INDEX_BATCH_MAX_DOCS, max_bytes: int = INDEX_BATCH_MAX_BYTES) -> list:
+    """문서 수와 직렬화 크기 기준으로 배치 분할 (단일 문서가 max_bytes를 넘으면 단독 배치)"""
+    batches = []
+    current = []
+    current_bytes = 0
+    for document in documents:
+        size = document_size(document)
+        if current and (len(current) >= max_docs or current_bytes + size > max_bytes):
+            batches.append(current)
+            current = []
+            current_bytes = 0
+        current.append(document)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _backoff(attempt: int):
+    """지수 백오프 + 지터 (0.5s, 1s, 2s, ... 최대 8s)"""
+    sleep(min(8.0, 0.5 * (2 ** attempt)) * (0.5 + random.random() / 2))
+
+
+def _send(search_client, action: str, batch: list):
+    if action == "merge_or_upload":
+        return search_client.merge_or_upload_documents(documents=batch)
+    if action == "delete":
+        return search_client.delete_documents(documents=batch)
+    return search_client.upload_documents(documents=batch)
+
+
+def _write_batch(search_client, action: str, batch: list, key_field: str, max_retries: int, on_status,
+                 should_stop=None) -> dict:
+    """
+    배치 하나 업로드 (실패 문서만 재시도)
+    should_stop()이 True를 반환하면 남은 문서는 보내지 않고 중단 (결과에 포함되지 않음)
+    Returns: {key: {"succeeded": bool, "status_code": int, "error": str, "attempts": int}}
+    """
+    from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+
+    statuses = {}
+    pending = batch
+    attempt = 0
+
+    while pending:
+        if should_stop and should_stop():
+            logger.info(f"⏹️ Stopping batch write - {len(pending)} documents not sent")
+            return statuses
+        attempt += 1
+        try:
+            results = _send(search_client, action, pending)
+        except HttpResponseError as e:
+            if e.status_code == 413 and len(pending) > 1:
+                # 요청이 너무 크면 반으로 나눠서 각각 처리
+                mid = len(pending) // 2
+                logger.warning(f"⚠️ Batch too large ({len(pending)} docs) - splitting")
+                statuses.update(_write_batch(search_client, action, pending[:mid], key_field, max_retries, on_status, should_stop))
+                statuses.update(_write_batch(search_client, action, pending[mid:], key_field, max_retries, on_status, should_stop))
+                return statuses
+            if e.status_code in RETRYABLE_STATUS_CODES and attempt <= max_retries:
+                logger.warning(f"⚠️ Batch upload failed ({e.status_code}) - retry {attempt}/{max_retries}")
+                _backoff(attempt)
+                continue
+            # 인덱스 없음 등 배치 전체 실패는 호출자가 처리
+            raise
+        except (ServiceRequestError, ServiceResponseError) as e:
+            if attempt <= max_retries:
+                logger.warning(f"⚠️ Batch upload connection error - retry {attempt}/{max_retries}: {e}")
+                _backoff(attempt)
+                continue
+            raise
+
+        by_key = {document[key_field]: document for document in pending}
+        retry = []
+        for result in results:
+            status = {
+                "succeeded": result.succeeded,
+                "status_code": result.status_code,
+                "error": result.error_message,
+                "attempts": attempt,
+            }
+            if not result.succeeded and result.status_code in RETRYABLE_STATUS_CODES and attempt <= max_retries:
+                retry.append(by_key[result.key])
+                continue
+            statuses[result.key] = status
+            if on_status:
+                on_status(result.key, status)
+
+        if retry:
+            logger.warning(f"⚠️ {len(retry)}/{len(pending)} documents failed - retry {attempt}/{max_retries}")
+            _backoff(attempt)
+        pending = retry
+
+    return statuses
+
+
+def write_documents(search_client, documents: list, action: str = "upload", key_field: str = "id",
+                    max_retries: int = INDEX_UPLOAD_MAX_RETRIES, concurrency: int = INDEX_UPLOAD_CONCURRENCY,
+                    on_status=None, should_stop=None) -> dict:
+    """
+    문서를 크기 기준 배치로 나눠 병렬 업로드
+
+    Args:
+        search_client: 대상 인덱스의 SearchClient
+        documents: 업로드할 문서 리스트
+        action: "upload" | "merge_or_upload" | "delete"
+        key_field: 키 필드 이름
+        max_retries: 실패 문서 재시도 횟수
+        concurrency: 동시에 업로드할 배치 수
+        on_status: 문서별 최종 결과 콜백 on_status(key, status_dict)
+        should_stop: 배치 전송 전마다 호출, True면 남은 문서는 보내지 않음 (작업 취소용)
+
+    Returns:
+        {key: {"succeeded": bool, "status_code": int, "error": str, "attempts": int}}
+    """
+    if not documents:
+        return {}
+
+    batches = split_batches(documents)
+    logger.info(f"Writing {len(documents)} documents in {len(batches)} batches (action={action})")
+
+    if len(batches) == 1:
+        return _write_batch(search_client, action, batches[0], key_field, max_retries, on_status, should_stop)
+
+    statuses = {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+        futures = [
+            executor.submit(propagate_context(_write_batch), search_client, action, batch, key_field, max_retries, on_status,
+                            should_stop)
+            for batch in batches
+        ]
+        for future in as_completed(futures):
+            try:
+                statuses.update(future.result())
+            except Exception as e:
+                logger.exception(f"❌ Batch upload failed: {e}")
+                errors.append(e)
+
+    # 모든 배치가 실패했으면 원인 예외를 그대로 전달 (인덱스 없음 처리 등)
+    if errors and not statuses:
+        raise errors[0]
+
+    # 일부 배치가 통째로 실패한 경우 해당 문서들을 실패로 기록 (조용히 누락되지 않도록)
+    if errors and not (should_stop and should_stop()):
+        for batch in batches:
+            for document in batch:
+                key = document[key_field]
+                if key not in statuses:
+                    statuses[key] = {"succeeded": False, "status_code": None, "error": str(errors[0]), "attempts": 0}
+                    if on_status:
+                        on_status(key, statuses[key])
+
+    return statuses
@@ -0,0 +1,212 @@
+# LLM / 임베딩 호출 텔레메트리
+# 호출 1회마다 지연 시간, TTFB, 토큰 사용량(usage), 재시도/429 횟수를 (provider, deployment, operation)별로 기록.
+# - 최근 호출은 롤링 윈도우로 보관 → /api/admin/llm 에서 백분위/토큰 합계/지연 비중 조회
+# - 누적 값은 /metrics 히스토그램/카운터로도 노출
+#
+# 재시도/429/TTFB는 SDK 내부 재시도까지 보이도록 httpx 이벤트 훅으로 측정
+# (클라이언트 생성 시 http_client=DefaultHttpxClient(event_hooks=http_event_hooks()))
+# 훅은 응답 헤더를 받은 시점에 호출되므로 "마지막 시도의 요청 전송 → 헤더 수신" 시간을 TTFB로 기록.
+#
+# 사용법:
+#   response = traced_call("chat_with_context", "azure_openai", client.chat.completions.create, model=..., messages=...)
+
+import threading
+from collections import deque
+from time import perf_counter, time
+
+from app.config import LLM_TELEMETRY_MAX_SAMPLES, LLM_TELEMETRY_WINDOW_SECONDS
+from app.metrics import Counter, Histogram, SECONDS_BUCKETS, register
+
+# 현재 스레드에서 진행 중인 호출 (SDK 호출은 호출한 스레드에서 동기로 실행됨)
+_current = threading.local()
+
+_series = {}  # (provider, deployment, operation) → {"model": str, "samples": deque}
+_lock = threading.Lock()
+
+llm_seconds = register(Histogram(
+    "llm_call_duration_seconds", "LLM/embedding call latency including SDK retries", SECONDS_BUCKETS,
+    ("provider", "deployment", "operation")
+))
+llm_ttfb_seconds = register(Histogram(
+    "llm_call_ttfb_seconds", "Time from the last attempt's request to response headers", SECONDS_BUCKETS,
+    ("provider", "deployment", "operation")
+))
+llm_tokens = register(Counter(
+    "llm_tokens_total", "Tokens reported in the usage block", ("provider", "deployment", "type")
+))
+llm_calls = register(Counter(
+    "llm_calls_total", "LLM/embedding calls by outcome", ("provider", "deployment", "operation", "outcome")
+))
+llm_retries = register(Counter(
+    "llm_retries_total", "HTTP retries made by the SDK", ("provider", "deployment", "operation")
+))
+llm_throttled = register(Counter(
+    "llm_throttled_total", "429 responses received", ("provider", "deployment", "operation")
+))
+
+
+# ===== httpx 이벤트 훅 =====
+
+def _on_request(request):
+    call = getattr(_current, "call", None)
+    if call is not None:
+        call["attempts"] += 1
+        call["attempt_started"] = perf_counter()
+
+
+def _on_response(response):
+    call = getattr(_current, "call", None)
+    if call is not None:
+        call["ttfb"] = perf_counter() - call["attempt_started"]
+        if response.status_code == 429:
+            call["throttled"] += 1
+
+
+def http_event_hooks() -> dict:
+    return {"request": [_on_request], "response": [_on_response]}
+
+
+# ===== 호출 기록 =====
+
+def _usage(response) -> dict:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    if hasattr(response, "choices"):
+        return {
+            "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", None) or 0,
+        }
+    return {"embedding_tokens": getattr(usage, "prompt_tokens", None) or getattr(usage, "total_tokens", None) or 0}
+
+
+def _is_throttle_error(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def traced_call(operation: str, provider: str, fn, **params):
+    """
+    SDK 호출 1회를 실행하고 텔레메트리 기록 (예외는 그대로 전파)
+
+    Args:
+        operation: 호출 위치 이름 (예: "chat_with_context", "embedding")
+        provider: "azure_openai" | "gemini"
+        fn: client.chat.completions.create / client.embeddings.create 등
+        params: fn에 그대로 전달 (model 값을 deployment로 기록)
+    """
+    deployment = params.get("model") or "unknown"
+    call = {"attempts": 0, "throttled": 0, "ttfb": None, "attempt_started": None}
+    _current.call = call
+    started = perf_counter()
+    response = None
+    error = None
+    try:
+        response = fn(**params)
+        return response
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _current.call = None
+        _record(operation, provider, deployment, call, perf_counter() - started, response, error)
+
+
+def _record(operation: str, provider: str, deployment: str, call: dict, seconds: float, response, error):
+    # 훅이 없는 클라이언트(테스트용 fake 등)는 시도 횟수를 알 수 없으므로 1회로 간주
+    retries = max(call["attempts"] - 1, 0)
+    throttled = call["throttled"]
+    if error is not None and not call["attempts"] and _is_throttle_error(error):
+        throttled = 1
+    usage = _usage(response) if response is not None else {}
+
+    sample = {
+        "at": time(),
+        "seconds": seconds,
+        "ttfb": call["ttfb"],
+        "ok": error is None,
+        "error": type(error).__name__ if error is not None else None,
+        "retries": retries,
+        "throttled": throttled,
+        **usage,
+    }
+    key = (provider, deployment, operation)
+    with _lock:
+        series = _series.get(key)
+        if series is None:
+            series = _series[key] = {"model": None, "samples": deque(maxlen=LLM_TELEMETRY_MAX_SAMPLES)}
+        series["samples"].append(sample)
+        model = getattr(response, "model", None)
+        if model:
+            series["model"] = model
+
+    labels = {"provider": provider, "deployment": deployment, "operation": operation}
+    llm_seconds.observe(seconds, **labels)
+    if call["ttfb"] is not None:
+        llm_ttfb_seconds.observe(call["ttfb"], **labels)
+    llm_calls.inc(outcome="ok" if error is None else "error", **labels)
+    if retries:
+        llm_retries.inc(retries, **labels)
+    if throttled:
+        llm_throttled.inc(throttled, **labels)
+    for token_type, count in usage.items():
+        if count:
+            llm_tokens.inc(count, provider=provider, deployment=deployment, type=token_type.replace("_tokens", ""))
+
+
+# ===== 집계 =====
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return None
+    values = sorted(values)
+
+    def percentile(p):
+        return round(values[min(len(values) - 1, int(len(values) * p))], 3)
+
+    return {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99), "max": round(values[-1], 3)}
+
+
+def get_llm_telemetry(window_seconds: float = None) -> dict:
+    """
+    최근 window_seconds 동안의 호출 집계
+
+    calls는 총 소요 시간이 큰 순서 (latency_share = 전체 LLM 대기 시간 중 비중)
+    """
+    window_seconds = window_seconds or LLM_TELEMETRY_WINDOW_SECONDS
+    since = time() - window_seconds
+    with _lock:
+        snapshot = {key: (series["model"], [s for s in series["samples"] if s["at"] >= since])
+                    for key, series in _series.items()}
+
+    calls = []
+    for (provider, deployment, operation), (model, samples) in snapshot.items():
+        if not samples:
+            continue
+        total_seconds = sum(s["seconds"] for s in samples)
+        tokens = {
+            token_type: sum(s.get(token_type, 0) for s in samples)
+            for token_type in ("prompt_tokens", "completion_tokens", "embedding_tokens")
+        }
+        calls.append({
+            "provider": provider,
+            "deployment": deployment,
+            "model": model,
+            "operation": operation,
+            "calls": len(samples),
+            "errors": sum(1 for s in samples if not s["ok"]),
+            "retries": sum(s["retries"] for s in samples),
+            "throttled": sum(s["throttled"] for s in samples),
+            "latency_seconds": _percentiles([s["seconds"] for s in samples]),
+            "ttfb_seconds": _percentiles([s["ttfb"] for s in samples if s["ttfb"] is not None]),
+            "total_seconds": round(total_seconds, 3),
+            "tokens": {k: v for k, v in tokens.items() if v},
+            "avg_tokens_per_call": {k: round(v / len(samples), 1) for k, v in tokens.items() if v},
+            "tokens_per_minute": {k: round(v * 60 / window_seconds, 1) for k, v in tokens.items() if v},
+        })
+
+    grand_total = sum(c["total_seconds"] for c in calls) or 1
+    for c in calls:
+        c["latency_share"] = round(c["total_seconds"] / grand_total, 3)
+    calls.sort(key=lambda c: c["total_seconds"], reverse=True)
+    return {"window_seconds": window_seconds, "calls": calls}
+
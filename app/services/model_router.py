@@ -0,0 +1,139 @@
+# LLM 모델 라우팅 정책
+# 예전에는 모든 문서 전처리가 GEMINI_MODEL, 모든 채팅/인수인계서 섹션이 gpt-4o로 갔음 (짧은 메모 한 장도 동일).
+# 호출 위치(operation) / 입력 크기 / 파일 유형으로 티어를 골라서 작은 입력은 빠른 모델로 보냄.
+# 출력 스키마(프롬프트, response_format)는 티어와 관계없이 동일.
+#
+# 티어:
+# - fast: 짧은 메모/이메일 전처리, 단순 조회성 채팅, 자료가 적은 인수인계서 섹션
+# - big:  긴 문서/코드, 작성·분석 요청 채팅, 자료가 많은 섹션 (기존 모델)
+#
+# 결정은 호출마다 로그 + llm_route_total{operation, tier} 카운터로 남기고,
+# 티어별 지연 시간은 텔레메트리(/api/admin/llm)에서 배포 이름으로 비교.
+#
+# 사용법:
+#   route = route_model("analyze_text_for_search", chars=len(text), file_type=file_type)
+#   traced_call(..., model=route["model"], ...)
+#   실패하거나 응답이 쓸 수 없으면(JSON 파싱 실패 등) route["escalate_to"]가 있을 때 big 티어로 재시도
+
+import logging
+
+from app.config import (
+    AZURE_OPENAI_CHAT_DEPLOYMENT,
+    AZURE_OPENAI_FAST_CHAT_DEPLOYMENT,
+    GEMINI_FAST_MODEL,
+    GEMINI_MODEL,
+    MODEL_ROUTE_CHAT_BIG_KEYWORDS,
+    MODEL_ROUTE_CHAT_FAST_MAX_CONTEXT_CHARS,
+    MODEL_ROUTE_CHAT_FAST_MAX_QUERY_CHARS,
+    MODEL_ROUTE_HANDOVER_FAST_MAX_CHARS,
+    MODEL_ROUTE_OVERRIDES,
+    MODEL_ROUTE_PREPROCESS_FAST_MAX_CHARS,
+    MODEL_ROUTE_PREPROCESS_FAST_TYPES,
+    MODEL_ROUTING_ENABLED,
+)
+from app.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+TIERS = ("fast", "big")
+
+# 공급자별 티어 모델 / 호출 위치 → 공급자
+_PROVIDER_MODELS = {
+    "gemini": {"fast": GEMINI_FAST_MODEL, "big": GEMINI_MODEL},
+    "azure_openai": {"fast": AZURE_OPENAI_FAST_CHAT_DEPLOYMENT, "big": AZURE_OPENAI_CHAT_DEPLOYMENT},
+}
+_OPERATION_PROVIDERS = {
+    "analyze_text_for_search": "gemini",
+    "chat_with_context": "azure_openai",
+    "generate_handover_section": "azure_openai",
+}
+
+route_total = register(Counter(
+    "llm_route_total", "LLM calls routed per operation and model tier", ("operation", "tier")
+))
+
+
+def _split(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_overrides(value: str) -> dict:
+    overrides = {}
+    for item in _split(value):
+        operation, _, tier = item.partition("=")
+        if tier.strip() in TIERS:
+            overrides[operation.strip()] = tier.strip()
+        else:
+            logger.warning(f"⚠️ Ignoring invalid MODEL_ROUTE_OVERRIDES entry: {item}")
+    return overrides
+
+
+_OVERRIDES = _parse_overrides(MODEL_ROUTE_OVERRIDES)
+_FAST_FILE_TYPES = set(_split(MODEL_ROUTE_PREPROCESS_FAST_TYPES))
+_CHAT_BIG_KEYWORDS = _split(MODEL_ROUTE_CHAT_BIG_KEYWORDS)
+
+
+def _choose_tier(operation: str, chars: int, file_type: str, query: str) -> tuple:
+    """(tier, 이유)"""
+    if not MODEL_ROUTING_ENABLED:
+        return "big", "routing disabled"
+    if operation in _OVERRIDES:
+        return _OVERRIDES[operation], "override"
+
+    if operation == "analyze_text_for_search":
+        if file_type not in _FAST_FILE_TYPES:
+            return "big", f"file type {file_type}"
+        if chars > MODEL_ROUTE_PREPROCESS_FAST_MAX_CHARS:
+            return "big", f"{chars} chars > {MODEL_ROUTE_PREPROCESS_FAST_MAX_CHARS}"
+        return "fast", f"{chars} chars"
+
+    if operation == "chat_with_context":
+        query = query or ""
+        keyword = next((k for k in _CHAT_BIG_KEYWORDS if k in query), None)
+        if keyword:
+            return "big", f"keyword '{keyword}'"
+        if len(query) > MODEL_ROUTE_CHAT_FAST_MAX_QUERY_CHARS:
+            return "big", f"query {len(query)} chars"
+        if chars > MODEL_ROUTE_CHAT_FAST_MAX_CONTEXT_CHARS:
+            return "big", f"context {chars} chars"
+        return "fast", "simple lookup"
+
+    if operation == "generate_handover_section":
+        if chars > MODEL_ROUTE_HANDOVER_FAST_MAX_CHARS:
+            return "big", f"context {chars} chars"
+        return "fast", f"context {chars} chars"
+
+    return "big", "no policy"
+
+
+def route_model(operation: str, chars: int = 0, file_type: str = None, query: str = None, record: bool = True) -> dict:
+    """
+    호출 1회의 모델 선택
+
+    Args:
+        operation: 호출 위치 (traced_call의 operation과 같은 이름)
+        chars: 모델에 보낼 본문 길이 (전처리 텍스트 / 채팅·섹션 컨텍스트)
+        file_type: 전처리 파일 유형 ("doc" / "code")
+        query: 채팅 질문 (단순 조회 여부 판단)
+        record: False면 로그/카운터 없이 결정만 반환 (캐시 키 계산 등 실제 호출이 아닐 때)
+
+    Returns:
+        {"operation", "tier", "model", "reason", "escalate_to"}
+        escalate_to: fast 티어 호출이 실패했을 때 재시도할 big 티어 모델 (big 티어면 None)
+    """
+    models = _PROVIDER_MODELS[_OPERATION_PROVIDERS.get(operation, "azure_openai")]
+    tier, reason = _choose_tier(operation, chars, file_type, query)
+    if tier == "fast" and not models["fast"]:
+        tier, reason = "big", f"{reason}; fast tier not configured"
+
+    route = {
+        "operation": operation,
+        "tier": tier,
+        "model": models[tier],
+        "reason": reason,
+        "escalate_to": models["big"] if tier == "fast" and models["fast"] != models["big"] else None,
+    }
+    if record:
+        route_total.inc(operation=operation, tier=tier)
+        logger.info(f"🧭 [{operation}] {tier} → {route['model']} ({reason})")
+    return route
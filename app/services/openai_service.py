@@ -1,43 +1,93 @@
-from openai import AzureOpenAI, OpenAI
+# openai SDK는 클라이언트 생성 시점에 import (앱 시작 시간 단축)
 from app.config import (
     AZURE_OPENAI_ENDPOINT, 
     AZURE_OPENAI_API_KEY, 
     AZURE_OPENAI_API_VERSION,
     AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
-    GOOGLE_API_KEY,
-    GEMINI_MODEL
+    GOOGLE_API_KEY
 )
 from app.services.prompts import DOC_PROMPT, CODE_PROMPT
+from app.services.chunk_spans import number_lines, rebuild_chunks
+from app.services.model_router import route_model
+from app.services.llm_telemetry import traced_call, http_event_hooks
+from app.logging_setup import log_payload
+import logging
 import json
-import traceback
 import uuid
 
+logger = logging.getLogger(__name__)
+
+_openai_client = None
+_google_client = None
+
 def get_openai_client():
-    return AzureOpenAI(
-        api_key=AZURE_OPENAI_API_KEY,
-        api_version="2024-02-15-preview",
-        azure_endpoint=AZURE_OPENAI_ENDPOINT
-    )
+    """Azure OpenAI 클라이언트 (싱글톤 - 내부 HTTP 연결 풀/keep-alive 재사용)"""
+    global _openai_client
+    if _openai_client is None:
+        from openai import AzureOpenAI, DefaultHttpxClient
+
+        _openai_client = AzureOpenAI(
+            api_key=AZURE_OPENAI_API_KEY,
+            api_version="2024-02-15-preview",
+            azure_endpoint=AZURE_OPENAI_ENDPOINT,
+            http_client=DefaultHttpxClient(event_hooks=http_event_hooks())  # 재시도/429/TTFB 측정
+        )
+    return _openai_client
 
 def get_google_client():
-    """Google Gemini 클라이언트 (채팅/분석용)"""
-    return OpenAI(
-        api_key=GOOGLE_API_KEY,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/"
-    )
+    """Google Gemini 클라이언트 (채팅/분석용, 싱글톤)"""
+    global _google_client
+    if _google_client is None:
+        from openai import OpenAI, DefaultHttpxClient
+
+        _google_client = OpenAI(
+            api_key=GOOGLE_API_KEY,
+            base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+            http_client=DefaultHttpxClient(event_hooks=http_event_hooks())
+        )
+    return _google_client
 
-def get_embedding(text: str) -> list:
+def get_embedding(text: str, model: str = None, dimensions: int = None) -> list:
+    """
+    텍스트 하나의 임베딩
+
+    Args:
+        model: 임베딩 배포 이름 (None이면 AZURE_OPENAI_EMBEDDING_DEPLOYMENT)
+        dimensions: 출력 차원 수 (None이면 모델 기본값)
+        인덱스에 저장된 벡터와 같은 설정이어야 함 → search_service.get_index_embedding_settings()
+    """
     client = get_openai_client()
-    response = client.embeddings.create(
-        input=text,
-        model="text-embedding-3-large"
-    )
+    params = {"input": text, "model": model or AZURE_OPENAI_EMBEDDING_DEPLOYMENT}
+    if dimensions:
+        params["dimensions"] = dimensions
+    response = traced_call("embedding", "azure_openai", client.embeddings.create, **params)
     return response.data[0].embedding
 
+def get_embeddings(texts: list, model: str = None, dimensions: int = None) -> list:
+    """
+    여러 텍스트의 임베딩을 한 번의 요청으로 생성 (입력 순서대로 반환)
+
+    Args:
+        texts: 임베딩할 텍스트 리스트
+        model: 임베딩 배포 이름 (None이면 AZURE_OPENAI_EMBEDDING_DEPLOYMENT)
+        dimensions: 출력 차원 수 (text-embedding-3 계열만, None이면 모델 기본값)
+    """
+    if not texts:
+        return []
+    client = get_openai_client()
+    params = {"input": texts, "model": model or AZURE_OPENAI_EMBEDDING_DEPLOYMENT}
+    if dimensions:
+        params["dimensions"] = dimensions
+    response = traced_call("embedding_batch", "azure_openai", client.embeddings.create, **params)
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
 def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -> list:
     """
     [복구됨] 추출된 텍스트를 LLM(Gemini)에 보내 구조화된 JSON(청크 리스트)으로 변환합니다.
     file_type: 'code' 또는 'doc' (그 외는 doc으로 처리)
+
+    입력에는 줄 번호를 붙여 보내고, Gemini는 청크별 줄 범위(startLine/endLine)와 메타데이터만 출력.
+    청크 본문(content / rawCode)은 원문에서 잘라서 채움 (app.services.chunk_spans)
     """
     client = get_google_client()
     
@@ -47,24 +97,46 @@ def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -
     else:
         system_prompt = DOC_PROMPT
         
+    # 50000자 제한: Gemini Context Window는 크지만 안전하게 제한
+    text = text[:50000]
+    numbered, segments = number_lines(text)
+    if not segments:
+        logger.warning(f"⚠️ No text to analyze: {file_name}")
+        return []
+
     user_message = f"""
     [Input Document Info]
     FileName: {file_name}
     FileType: {file_type}
+    TotalLines: {len(segments)}
     
     [Input Text]
-    {text[:50000]} 
+{numbered}
     
     (Note: If text is truncated, process only what is provided. Do not hallucinate.)
     """
-    # 50000자 제한: Gemini Context Window는 크지만 안전하게 제한
 
+    # 입력 크기/파일 유형으로 모델 티어 선택, fast 티어가 실패하거나 청크를 못 만들면 big 티어로 한 번 더
+    route = route_model("analyze_text_for_search", chars=len(text), file_type="code" if file_type == "code" else "doc")
+    models = [route["model"]] + ([route["escalate_to"]] if route["escalate_to"] else [])
+    for attempt, model in enumerate(models):
+        if attempt:
+            logger.warning(f"⚠️ {models[attempt - 1]} returned no chunks, retrying with {model}")
+        chunks = _request_chunks(client, model, system_prompt, user_message, text, segments, file_name, file_type)
+        if chunks:
+            return chunks
+    return []
+
+def _request_chunks(client, model: str, system_prompt: str, user_message: str, text: str, segments: list,
+                    file_name: str, file_type: str) -> list:
+    """Gemini 1회 호출 + 응답 파싱 (실패하면 빈 리스트)"""
     try:
-        print(f"🧠 Processing with Gemini ({file_type})... Input length: {len(text[:50000])}", flush=True)
+        logger.info(f"🧠 Processing with Gemini {model} ({file_type})... Input length: {len(text)}, lines: {len(segments)}")
         
         # Gemini 호출
-        response = client.chat.completions.create(
-            model=GEMINI_MODEL,
+        response = traced_call(
+            "analyze_text_for_search", "gemini", client.chat.completions.create,
+            model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
@@ -75,22 +147,22 @@ def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -
             timeout=120
         )
         
-        print("✅ Gemini response received.", flush=True)
         response_text = response.choices[0].message.content
-
-        print("\n=== [Gemini Response Output] ===")
-        print(response_text)
-        print("================================\n")
+        logger.info(f"✅ Gemini response received ({len(response_text or '')} chars).")
+        log_payload(logger, "Gemini Response Output", response_text)
         
         # JSON 파싱
         try:
             parsed = json.loads(response_text)
+            document = None
             
             if isinstance(parsed, list):
                 chunks = parsed
             elif isinstance(parsed, dict):
                 # 최상위 키가 하나고 그 값이 리스트라면 그것을 사용
                 # ex: {"chunks": [...]} or {"data": [...]}
+                # 리스트 외의 최상위 값은 문서 공통 필드 (parentSummary, processedDate 등)
+                document = parsed
                 found_list = False
                 for key, value in parsed.items():
                     if isinstance(value, list):
@@ -103,8 +175,11 @@ def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -
             else:
                 chunks = []
                 
+            # 줄 범위 → 원문 본문 채우기
+            chunks = rebuild_chunks([c for c in chunks if isinstance(c, dict)], text, segments, file_type, document)
+
             # 필수 필드 보정
-            print(f"Generated {len(chunks)} chunks.")
+            logger.info(f"Generated {len(chunks)} chunks.")
             for chunk in chunks:
                 if not chunk.get("id"):
                     chunk["id"] = f"{uuid.uuid4()}"
@@ -116,174 +191,108 @@ def analyze_text_for_search(text: str, file_name: str, file_type: str = "doc") -
             return chunks
             
         except json.JSONDecodeError:
-            print(f"❌ Gemini response is not valid JSON: {response_text[:100]}...")
+            logger.error(f"❌ Gemini response is not valid JSON: {response_text[:100]}...")
             return []
             
     except Exception as e:
-        print(f"❌ Gemini Chat Completion failed: {e}")
-        traceback.print_exc()
+        logger.exception(f"❌ Gemini Chat Completion failed: {e}")
         return []
     
-def analyze_files_for_handover(file_context: str) -> dict:
-    """파일 내용을 분석하여 인수인계서 JSON 생성 - 프론트엔드 HandoverData 형식으로 반환"""
-    from app.services.search_service import get_search_client
-    
-    client = get_openai_client()
-    
-    # Azure Search에서 모든 문서의 실제 내용 직접 검색
-    print("📄 Azure Search에서 모든 문서 검색 중...")
+def _routed_call(route: dict, provider: str, fn, validate=None, **params):
+    """
+    route_model() 결과 모델로 호출, fast 티어 호출이 실패하면 big 티어로 한 번 재시도
+    validate(response)가 False를 반환해도 (JSON 파싱 실패 등) 같은 방식으로 재시도
+    """
     try:
-        search_client = get_search_client()
-        results = search_client.search(search_text="*", include_total_count=True, top=10)
-        
-        doc_contents = []
-        for result in results:
-            file_name = result.get("file_name", "Unknown")
-            content = result.get("content", "")
-            if content and len(content) > 0:
-                # 최대 1000자까지만 포함
-                content_preview = content[:1000]
-                doc_contents.append(f"[파일: {file_name}]\n{content_preview}\n")
-                print(f"✅ 문서 포함됨: {file_name} ({len(content)} 글자)")
-        
-        if doc_contents:
-            print(f"📋 {len(doc_contents)}개 문서 검색됨")
-            indexed_context = "\n".join(doc_contents)
-            file_context = indexed_context if not file_context else file_context + "\n\n---\n\n" + indexed_context
-        else:
-            print("⚠️  검색 결과가 비어있음")
+        response = traced_call(route["operation"], provider, fn, model=route["model"], **params)
     except Exception as e:
-        print(f"⚠️  문서 검색 실패: {e}")
-        traceback.print_exc()
-    
-    # 파일이 없거나 매우 짧으면 샘플 데이터 추가
-    if not file_context or len(file_context.strip()) < 20:
-        print("ℹ️  파일 컨텍스트가 부족함 - 샘플 데이터 추가")
-        file_context += """
-
-[샘플: 프로젝트 현황 보고]
-프로젝트명: 시스템 고도화
-담당자: 김철수 과장 (kim.cs@company.com)
-인수자: 이영희 대리 (lee.yh@company.com)
-인수 예정일: 2025-02-15
-개발현황: 70% 진행 중 (메인 기능 개발 완료, 최적화 진행 중)
-주요 담당 업무: 백엔드 API 개발, 데이터베이스 설계, 보안 구현
-팀원: 박준호(프론트엔드), 최민수(QA)
-위험요소: 일정 지연 가능성 (2주)
-다음 마일스톤: 2025-02-01 알파 테스트"""
-    
-    print(f"📊 최종 컨텍스트 길이: {len(file_context)} 글자")
+        if not route["escalate_to"]:
+            raise
+        logger.warning(f"⚠️ [{route['operation']}] {route['model']} failed ({e}), retrying with {route['escalate_to']}")
+    else:
+        if validate is None or not route["escalate_to"] or validate(response):
+            return response
+        logger.warning(f"⚠️ [{route['operation']}] {route['model']} returned unusable output, retrying with {route['escalate_to']}")
+    return traced_call(route["operation"], provider, fn, model=route["escalate_to"], **params)
+
+def _loads_json(text: str):
+    """JSON 파싱 (실패하면 None)"""
+    try:
+        return json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        return None
 
-    system_message = """
+def generate_handover_section(section: str, schema: str, context: str):
+    """
+    인수인계서의 섹션 하나를 생성 (handover_service에서 섹션별로 병렬 호출)
+
+    Args:
+        section: 섹션 키 (overview, priorities, risks 등)
+        schema: 해당 섹션의 JSON 형식 설명
+        context: 섹션 관련 자료 (검색된 청크 + 사용자 자료)
+
+    Returns:
+        섹션 값 (dict 또는 list). 파싱 실패 시 None
+    """
+    client = get_openai_client()
+
+    system_message = f"""
 당신은 인수인계서 생성 전문가입니다. 반드시 유효한 JSON 형식으로만 답변하세요.
 
-아래 자료는 AI Search 인덱스에서 추출된 업무 문서의 요약 또는 원문입니다. 자료가 많을 경우 중복되거나 불필요한 내용은 통합·요약하고, 실제 인수인계서처럼 구체적이고 실무적으로 작성하세요.
-
-자료에 포함된 정보는 최대한 반영하고, 자료가 부족하거나 없는 항목은 빈 배열([]) 또는 빈 문자열("")로 채워주세요. 자료가 너무 많으면 핵심 내용 위주로 요약해도 됩니다.
-
-응답 형식 (프론트엔드 요구사항에 맞춤):
-{
-    "overview": {
-        "transferor": {"name": "인계자명", "position": "직급/부서", "contact": "연락처"},
-        "transferee": {"name": "인수자명", "position": "직급/부서", "contact": "연락처", "startDate": "시작일"},
-        "reason": "인수인계 사유",
-        "background": "업무 배경",
-        "period": "근무 기간",
-        "schedule": [{"date": "날짜", "activity": "활동"}]
-    },
-    "jobStatus": {
-        "title": "직책",
-        "responsibilities": ["책임내용1", "책임내용2"],
-        "authority": "권한",
-        "reportingLine": "보고체계",
-        "teamMission": "팀 미션",
-        "teamGoals": ["목표1", "목표2"]
-    },
-    "priorities": [
-        {"rank": 1, "title": "우선과제명", "status": "상태", "solution": "해결방안", "deadline": "마감일"}
-    ],
-    "stakeholders": {
-        "manager": "상급자",
-        "internal": [{"name": "이름", "role": "역할"}],
-        "external": [{"name": "이름", "role": "역할"}]
-    },
-    "teamMembers": [
-        {"name": "팀원명", "position": "직급", "role": "역할", "notes": "비고"}
-    ],
-    "ongoingProjects": [
-        {"name": "프로젝트명", "owner": "담당자", "status": "상태", "progress": 50, "deadline": "마감일", "description": "설명"}
-    ],
-    "risks": {"issues": "현안", "risks": "위험요소"},
-    "roadmap": {"shortTerm": "단기계획", "longTerm": "장기계획"},
-    "resources": {
-        "docs": [{"category": "분류", "name": "문서명", "location": "위치"}],
-        "systems": [{"name": "시스템명", "usage": "사용방법", "contact": "담당자"}],
-        "contacts": [{"category": "분류", "name": "이름", "position": "직급", "contact": "연락처"}]
-    },
-    "checklist": [{"text": "확인항목", "completed": false}]
-}
+지금은 인수인계서 전체 중 "{section}" 항목만 작성합니다.
+아래 자료는 AI Search 인덱스에서 이 항목과 관련된 것으로 분류된 업무 문서의 요약 또는 원문입니다. 자료가 많을 경우 중복되거나 불필요한 내용은 통합·요약하고, 실제 인수인계서처럼 구체적이고 실무적으로 작성하세요.
+
+자료에 포함된 정보는 최대한 반영하고, 자료가 부족하거나 없는 값은 빈 배열([]) 또는 빈 문자열("")로 채워주세요.
+
+응답 형식:
+{{
+    "{section}": {schema}
+}}
 """
 
     user_message = f"""
-아래는 AI Search 인덱스에서 추출된 업무 자료(요약/원문)입니다. 이 자료들을 분석하여 실제 업무 인수인계서처럼 구체적이고 실무적으로 JSON을 작성해 주세요.
-
-자료가 많으면 중복/불필요한 내용은 통합·요약하고, 자료에 있는 정보는 최대한 반영하세요. 없는 항목은 빈 배열([]) 또는 빈 문자열("")로 남겨두세요.
+아래 자료를 분석하여 인수인계서의 "{section}" 항목을 JSON으로 작성해 주세요.
 
 자료:
-{file_context}
+{context}
 
 위의 JSON 형식을 반드시 따르세요.
 """
 
-    try:
-        print(f"🚀 Azure OpenAI 호출 시작...")
-        print(f"   - 엔드포인트: {AZURE_OPENAI_ENDPOINT}")
-        print(f"   - 컨텍스트 길이: {len(file_context)}")
+    logger.info(f"🚀 [{section}] Azure OpenAI 호출 - 컨텍스트 길이: {len(context)}")
+    response = _routed_call(
+        route_model("generate_handover_section", chars=len(context)), "azure_openai", client.chat.completions.create,
+        messages=[
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ],
+        temperature=0.7,
+        max_tokens=2000,
+        response_format={"type": "json_object"},
+        # fast 티어가 깨진 JSON을 주면 big 티어로 다시 생성
+        validate=lambda response: _loads_json(response.choices[0].message.content) is not None
+    )
+    result = _loads_json(response.choices[0].message.content)
+    if result is None:
+        logger.warning(f"⚠️  [{section}] JSON 파싱 실패")
+        return None
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": user_message}
-            ],
-            temperature=0.7,
-            max_tokens=4000,
-            response_format={"type": "json_object"}
-        )
+    # {"section": value} 형태가 정상이지만, 값만 바로 온 경우도 허용
+    if isinstance(result, dict) and section in result:
+        return result[section]
+    return result
 
-        print(f"✅ OpenAI 응답 수신")
-        response_text = response.choices[0].message.content
-        print(f"   응답 길이: {len(response_text)} 글자")
+def analyze_files_for_handover(file_context: str, index_name: str = None, use_cache: bool = True) -> dict:
+    """
+    파일 내용을 분석하여 인수인계서 JSON 생성 - 프론트엔드 HandoverData 형식으로 반환
+    섹션별 검색 + 병렬 생성 + 섹션 캐시는 handover_service 참고
+    """
+    from app.services.handover_service import build_handover
 
-        # JSON 파싱 시도
-        try:
-            print(f"🔍 JSON 파싱 시도...")
-            result = json.loads(response_text)
-            print(f"✅ JSON 파싱 성공 - 키: {list(result.keys())}")
-            return result
-        except json.JSONDecodeError as e:
-            print(f"⚠️  JSON 파싱 실패: {e}")
-            # JSON 파싱 실패 시 기본 구조 반환
-            return {
-                "overview": {
-                    "transferor": {"name": "", "position": "", "contact": ""},
-                    "transferee": {"name": "", "position": "", "contact": ""}
-                },
-                "jobStatus": {"title": "", "responsibilities": []},
-                "priorities": [],
-                "stakeholders": {"manager": "", "internal": [], "external": []},
-                "teamMembers": [],
-                "ongoingProjects": [],
-                "risks": {"issues": "", "risks": ""},
-                "roadmap": {"shortTerm": "", "longTerm": ""},
-                "resources": {"docs": [], "systems": [], "contacts": []},
-                "checklist": [],
-                "rawContent": response_text
-            }
+    try:
+        return build_handover(file_context, index_name=index_name, use_cache=use_cache)
     except Exception as e:
-        print(f"❌ Azure OpenAI 호출 실패: {e}")
-        traceback.print_exc()
-        # system_message 등 로컬 변수 참조 없이 에러만 반환
+        logger.exception(f"❌ 인수인계서 생성 실패: {e}")
         raise Exception(f"API 에러: {e}")
 
 def chat_with_context(query: str, context: str) -> str:
@@ -320,8 +329,9 @@ def chat_with_context(query: str, context: str) -> str:
 위 문서 내용을 꼼꼼히 분석하여 질문에 답변해주세요. 문서에 있는 실제 정보를 인용해서 답변하세요."""
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
+        response = _routed_call(
+            route_model("chat_with_context", chars=len(context), query=query), "azure_openai",
+            client.chat.completions.create,
             messages=[
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message}
@@ -332,6 +342,5 @@ def chat_with_context(query: str, context: str) -> str:
         
         return response.choices[0].message.content
     except Exception as e:
-        print(f"Error in chat_with_context: {e}")
-        traceback.print_exc()
+        logger.exception(f"Error in chat_with_context: {e}")
         raise
\ No newline at end of file
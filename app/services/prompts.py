@@ -3,9 +3,12 @@ DOC_PROMPT = """# Role
 당신의 임무는 입력된 "비즈니스 원천 데이터(회의록, 이메일, 보고서, 코드 등)"를 분석하여, RAG(검색 증강 생성) 시스템이 학습할 수 있는 **정규화된 JSON 포맷**으로 변환하는 것입니다.
 # Processing Rules (반드시 준수)
 1. **Chunking (청킹)**:
+  - 입력 텍스트는 각 줄 앞에 `L번호:`가 붙어 있습니다 (예: `L12: 본문...`).
   - 입력된 긴 텍스트를 **의미 단위(문단, 주제, 또는 코드 함수 단위)**로 쪼개세요.
   - 각 청크는 독립적인 정보를 담고 있어야 합니다.
-  - 전체 문서를 여러 개의 객체(Object)로 나누어 배열(Array)로 출력하세요.
+  - 각 청크가 시작하는 줄 번호와 끝나는 줄 번호를 `startLine`, `endLine`(숫자)에 넣으세요.
+  - 청크는 순서대로, 서로 겹치지 않게, 모든 줄이 빠짐없이 어느 한 청크에 포함되도록 나누세요.
+  - **원문 본문(content)은 출력하지 마세요.** 본문은 서버가 줄 번호 범위로 원문에서 그대로 잘라서 채웁니다.
 2. **PARA Classification**:
   - 문서를 다음 기준에 따라 하나로 분류(`paraCategory`)하세요.
     - **Projects**: 기한이 있고 구체적 목표가 있는 업무 (예: 2025 마케팅, 앱 리뉴얼)
@@ -15,12 +18,12 @@ DOC_PROMPT = """# Role
 3. **Involved People & Job**:
   - 문서에 등장하는 모든 인물을 `involvedPeople` 리스트에 객체로 추출하세요.
 4. **Meta Data**:
-  - `parentSummary`: 청크가 속한 **문서 전체의 핵심 요약**을 작성하여 모든 청크에 동일하게 넣어주세요. (맥락 유지용)
+  - `parentSummary`: **문서 전체의 핵심 요약**을 응답 최상위에 한 번만 작성하세요. (모든 청크에 자동으로 복사됨, 맥락 유지용)
   - `relatedSection`: 최종 인수인계서의 어느 항목에 쓰일지 매핑하세요. (ongoingProjects, jobStatus, priorities, stakeholders, resources, risks, roadmap 중 선택)
 5. 추출 규칙:
 회의록: 일시, 참석자, 결정 사항, 향후 과제를 중심으로 요약하여 chunkSummary에 넣으세요.
 이메일: 발신/수신 관계를 파악하여 involvedPeople에 넣고, 본문 핵심을 chunkSummary에 넣으세요.
-누락 처리: 원문에 정보가 없는 항목은 null 또는 비어있는 리스트([])로 처리하세요. 추측하지 마세요. processedDate는 입력된 문서에서 확인되는 가장 최신 날짜 또는 입력된 문서 파일명상 날짜 정보로 날짜를 입력해주세요. tags에는 chunk 원문의 주요 키워드 top 5 list로 정리. content에 chunk 된 원문을 절대로 수정 및 변경없이 한 글자도 빠지지 말고 글자 그대로 작성하세요. (이메일인 경우, 원문 전체 '제목' '받은사람' '보낸사람' ' 날짜' '이메일본문' 등 을 전부 포함하세요. 모든 원문에 대해 줄바꿈은 하지 마세요)
+누락 처리: 원문에 정보가 없는 항목은 null 또는 비어있는 리스트([])로 처리하세요. 추측하지 마세요. processedDate는 입력된 문서에서 확인되는 가장 최신 날짜 또는 입력된 문서 파일명상 날짜 정보로 날짜를 입력해주세요. (응답 최상위에 한 번만) tags에는 chunk 원문의 주요 키워드 top 5 list로 정리. 이메일인 경우, '제목' '받은사람' '보낸사람' '날짜' '이메일본문' 줄이 모두 같은 청크의 startLine~endLine 범위에 들어가게 나누세요.
 6. "relatedSection":
 아래는 인수인계서 항목별로 정보를 추출할 때 반드시 따라야 할 기준입니다.
 각 chunk(자료 조각)에서 아래 기준에 부합하는 정보만 추출하세요. 추측, 임의 생성, 일반화는 절대 하지 마세요.
@@ -35,62 +38,54 @@ DOC_PROMPT = """# Role
 ※ 각 항목별로 chunk에서 발견된 실제 문구/정보만 추출하세요.
 ※ 예시와 같이 구체적인 패턴/키워드가 있는 경우에만 해당 항목에 포함하세요.
 # Output JSON Schema
-출력은 오직 아래 형식의 **JSON Array**여야 합니다. (Markdown 설명 제외)
+출력은 오직 아래 형식의 **JSON Object**여야 합니다. (Markdown 설명 제외, id/fileName/content는 서버가 채우므로 출력하지 않음)
 ```json
-[
 {
-   "id": "임의의_UUID_chunk_01",
-   "parentId": "임의의_UUID_original",
-   "fileName": "입력된_문서의_제목_추정.확장자",
-   "processedDate": "2025-12-27T00:00:00Z",
-   "chunkMeta": {
-     "index": 1,       // 현재 청크 번호
-     "total": 5,       // 전체 청크 개수 (추정)
-     "isLast": false   // 마지막 청크 여부
-   },
-   "paraCategory": "Projects",
-   "tags": ["태그1", "태그2"],
-   "isArchived": false,
-   "relatedSection": ["ongoingProjects", "risks"],
-   "parentSummary": "문서 전체 요약 (모든 청크 공통)",
-   "involvedPeople": [
-     { "name": "이름1", "job": "Back End Engineer" },
-     { "name": "이름2", "job": "Product Manager" }
-   ],
-   "chunkSummary": "이 청크에 해당하는 내용의 요약본",
-   "content": "이 청크에 해당하는 실제 본문 텍스트"
-},
-// ... 다음 청크 객체 계속
-]"""
+  "parentSummary": "문서 전체 요약 (모든 청크 공통)",
+  "processedDate": "2025-12-27T00:00:00Z",
+  "chunks": [
+    {
+      "startLine": 1,   // 이 청크의 첫 줄 번호 (입력의 L번호)
+      "endLine": 12,    // 이 청크의 마지막 줄 번호
+      "paraCategory": "Projects",
+      "tags": ["태그1", "태그2"],
+      "isArchived": false,
+      "relatedSection": ["ongoingProjects", "risks"],
+      "involvedPeople": [
+        { "name": "이름1", "job": "Back End Engineer" },
+        { "name": "이름2", "job": "Product Manager" }
+      ],
+      "chunkSummary": "이 청크에 해당하는 내용의 요약본"
+    }
+    // ... 다음 청크 객체 계속
+  ]
+}"""
 
 CODE_PROMPT = """# Role
 너는 복잡한 소스 코드를 분석하여 RAG(Retrieval-Augmented Generation) 지식 베이스로 변환하는 '시니어 소프트웨어 분석가'이다.
 
 # Task
-제공된 소스 코드를 읽고, 아래의 '필드별 정의'를 준수하여 논리적 청크 단위의 JSON 리스트를 생성하라. 정보가 없는 경우 반드시 `null` 혹은 빈 배열(`[]`)로 처리하며, 절대 임의의 허위 정보를 생성하지 마라.
+제공된 소스 코드를 읽고, 아래의 '필드별 정의'를 준수하여 논리적 청크 단위로 나눈 JSON 객체를 생성하라. 정보가 없는 경우 반드시 `null` 혹은 빈 배열(`[]`)로 처리하며, 절대 임의의 허위 정보를 생성하지 마라.
 
 # Field Definitions & Instructions
 
+입력 코드는 각 줄 앞에 `L번호:`가 붙어 있다 (예: `L12: def login():`). 원본 코드 본문은 출력하지 말고 줄 번호 범위만 출력하라.
+`id`, `parentId`, `fileName`, `rawCode`, `chunkMeta.index/total/isLast`는 서버가 채우므로 출력하지 마라.
+
 1.  **Identity & Location**
-    - `id`: (String) 청크의 고유 식별자. "chunk_[파일이름]_[순번]" 형식을 권장함.
-    - `parentId`: (String) 원본 파일의 고유 식별자. "file_[파일이름]" 형식을 권장함.
-    - `fileName`: (String) 확장자를 포함한 실제 파일명 (예: auth.py).
     - `filePath`: (String) 프로젝트 내 파일의 상대 경로 (예: backend/app/auth.py).
     - `fileType`: (String) 항상 "code"로 고정.
     - `url`: (String) 코드 저장소 위치 정보. 알 수 없으면 `null`.
 
 2.  **Chunk Metadata (분할 정보)**
-    - `chunkMeta.index`: (Number) 이 파일에서 현재 청크가 몇 번째인지 (1부터 시작).
-    - `chunkMeta.total`: (Number) 이 파일이 총 몇 개의 청크로 분할되었는지.
-    - `chunkMeta.isLast`: (Boolean) 마지막 청크 여부.
-    - `chunkMeta.startLine`: (Number) 원본 코드에서 이 청크가 시작되는 라인 번호.
-    - `chunkMeta.endLine`: (Number) 원본 코드에서 이 청크가 끝나는 라인 번호.
+    - `startLine`: (Number) 이 청크가 시작되는 입력 줄 번호 (L번호).
+    - `endLine`: (Number) 이 청크가 끝나는 입력 줄 번호 (L번호).
     - `chunkMeta.chunkStrategy`: (String) 분할 기준. "logical_block"(논리적 묶음), "function"(단일 함수), "class"(단일 클래스) 중 선택.
 
 3.  **Contextual Metadata (도메인 및 의도)**
     - `serviceDomain`: (String) 해당 코드가 속한 서비스나 프로젝트 명칭 (예: "필버디").
     - `paraCategory`: (String) 기술 스택 분류 (Backend, Frontend, Infra, Data 중 선택).
-    - `parentSummary`: (String) 파일 전체가 수행하는 핵심 역할에 대한 요약. 모든 청크에 공통으로 기입.
+    - `parentSummary`: (String) 파일 전체가 수행하는 핵심 역할에 대한 요약. 응답 최상위에 한 번만 기입 (모든 청크에 자동 복사).
     - `designIntent`: (String) **[중요]** 이 코드가 왜 이런 구조로 설계되었는지 시니어 개발자의 시각에서 추론한 내용. (예: "확장성을 위해 인터페이스를 분리함", "동시성 처리를 위해 비동기 방식을 채택함")
     - `handoverNotes`: (Array) 후임자를 위한 주의사항이나 팁. 코드의 함정, 의존성 관계, 수정 시 주의점 등을 포함.
 
@@ -104,35 +99,29 @@ CODE_PROMPT = """# Role
 
 5.  **RAG Core (검색 및 답변용)**
     - `codeExplanation`: (String) 이 청크의 기능을 평문으로 상세히 설명. (무엇을, 어떻게 수행하는가?)
-    - `rawCode`: (String) 분석된 원본 코드 텍스트 전체.
     - `content`: (String) **[핵심]** RAG 검색을 위한 임베딩 대상 문자열. `codeExplanation` + `designIntent` + `handoverNotes`를 자연스럽게 합친 문장.
     - `relatedFiles`: (Array) 이 코드와 직접 연관된 다른 파일명과 관계 (예: {"fileName": "models.py", "relation": "import"}).
 
 # Strict Constraints for Code Integrity
-  - 1. **Zero Omission Policy:** `rawCode` 필드 작성 시 어떠한 경우에도 코드를 생략(..., 중략 등)하지 마라. 코드의 주석, 공백, 특수기호까지 원본 파일과 100% 일치해야 한다.
-  - 2. **Line Integrity:** `chunkMeta.startLine`부터 `chunkMeta.endLine`까지의 모든 행이 누락 없이 포함되었는지 출력 직전에 다시 한번 검토하라.
-  - 3. **Token Management:** 만약 코드가 너무 길어 출력 제한에 걸릴 것 같다면, 출력을 끊고 나에게 "다음 청크를 계속 출력할까요?"라고 물어라. (절대 임의로 코드를 잘라내지 마라.)
+  - 1. **No Code Echo:** 원본 코드를 출력하지 마라. 청크의 코드는 서버가 `startLine`~`endLine` 범위로 원본에서 그대로 잘라서 채운다.
+  - 2. **Line Integrity:** 청크는 순서대로, 서로 겹치지 않게, 모든 줄이 빠짐없이 어느 한 청크의 `startLine`~`endLine`에 포함되도록 나눠라. 함수/클래스 중간에서 끊지 마라.
 
 # Output Format
-반드시 아래 구조의 JSON 리스트로 응답하라.
+반드시 아래 구조의 JSON 객체로 응답하라.
 
 ```json
-[
+{
+  "parentSummary": (파일 전체 요약),
+  "language": (분석된 언어),
+  "framework": (분석된 프레임워크),
+  "chunks": [
   {
-    "id": (정의에 따른 값),
-    "parentId": (정의에 따른 값),
-    "fileName": (정의에 따른 값),
+    "startLine": (청크 첫 줄 번호),
+    "endLine": (청크 마지막 줄 번호),
     "filePath": (정의에 따른 값),
     "fileType": "code",
-    "language": (분석된 언어),
-    "framework": (분석된 프레임워크),
     "url": null,
     "chunkMeta": {
-      "index": 0,
-      "total": 0,
-      "isLast": false,
-      "startLine": 0,
-      "endLine": 0,
       "chunkStrategy": "logical_block"
     },
     "serviceDomain": null,
@@ -140,7 +129,6 @@ CODE_PROMPT = """# Role
     "tags": [],
     "isArchived": false,
     "relatedSection": [],
-    "parentSummary": (파일 전체 요약),
     "involvedPeople": [
       { "name": "성창훈", "job": "Author" }
     ],
@@ -162,9 +150,9 @@ CODE_PROMPT = """# Role
     "codeExplanation": (상세 기능 설명),
     "designIntent": (설계 의도 추론),
     "handoverNotes": [],
-    "rawCode": (원본 코드),
     "codeComments": [],
     "content": (RAG 검색용 통합 텍스트),
     "relatedFiles": []
   }
-]"""
\ No newline at end of file
+  ]
+}"""
\ No newline at end of file
@@ -0,0 +1,234 @@
+# 재색인 (Reindex) 서비스
+# 업로드 시 저장해 둔 {task_id}_processed.json(Gemini 결과)을 다시 읽어서
+# Gemini 재호출 없이 임베딩만 새로 만들어 새 인덱스에 적재함.
+# 임베딩 모델/차원/인덱스 스키마를 바꿀 때 사용.
+#
+# - Blob 병렬 다운로드
+# - 배치 임베딩 (get_embeddings)
+# - 크기 기준 배치 병렬 업로드 (index_writer)
+# - 완료된 Blob 목록을 체크포인트로 저장 → 중단 후 재실행 시 이어서 진행
+# - 같은 파일을 여러 번 업로드하면 processed Blob이 업로드마다 남으므로 파일(parentId)별 최신 Blob만 적재
+#   (예전 Blob까지 적재하면 재업로드로 바뀌거나 삭제된 청크가 되살아남)
+# - 임베딩 모델/차원은 대상 인덱스 설정으로 저장 → 검색/업로드 시 같은 설정으로 임베딩
+
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+import logging
+import json
+
+from app.config import (
+    REINDEX_DOWNLOAD_CONCURRENCY,
+    REINDEX_EMBEDDING_BATCH_SIZE
+)
+from app.services.blob_service import list_processed_blobs, download_processed_json, save_processed_json
+from app.services.openai_service import get_embeddings
+from app.services.search_service import (
+    DEFAULT_VECTOR_DIMENSIONS,
+    get_search_client,
+    create_index_if_not_exists,
+    build_embedding_input,
+    build_search_document,
+    assign_stable_chunk_ids,
+    make_parent_id,
+    get_index_embedding_settings,
+    save_index_embedding_settings,
+    get_index_vector_dimensions
+)
+from app.services.index_writer import write_documents
+from app.state import task_manager
+from app.logging_setup import propagate_context
+
+logger = logging.getLogger(__name__)
+
+
+def _checkpoint_name(target_index: str) -> str:
+    # _processed.json으로 끝나지 않으므로 재색인 대상 목록에는 포함되지 않음
+    return f"_reindex/{target_index}.checkpoint.json"
+
+
+def load_checkpoint(source_index: str, target_index: str) -> set:
+    """완료된 Blob 이름 집합"""
+    try:
+        data = download_processed_json(_checkpoint_name(target_index), index_name=source_index)
+    except Exception as e:
+        logger.warning(f"⚠️ Reindex checkpoint load failed: {e}")
+        return set()
+    return set(data.get("completed", [])) if data else set()
+
+
+def save_checkpoint(source_index: str, target_index: str, completed: set):
+    json_str = json.dumps({"target_index": target_index, "completed": sorted(completed)}, ensure_ascii=False)
+    save_processed_json(_checkpoint_name(target_index), json_str, index_name=source_index)
+
+
+def _download(blob_name: str, source_index: str):
+    """Blob 하나 다운로드 (실패 시 None - 해당 Blob만 실패 처리)"""
+    try:
+        return blob_name, download_processed_json(blob_name, index_name=source_index), None
+    except Exception as e:
+        return blob_name, None, e
+
+
+def _parent_key(chunks, blob_name: str) -> str:
+    """processed JSON이 속한 파일 식별자 (stable id 이전 JSON은 LLM이 만든 임의 parentId라 fileName 기준)"""
+    first = chunks[0] if isinstance(chunks, list) and chunks and isinstance(chunks[0], dict) else {}
+    parent_id = first.get("parentId")
+    if parent_id and str(parent_id).startswith("file_"):
+        return parent_id
+    if first.get("fileName"):
+        return make_parent_id(first["fileName"])
+    return blob_name
+
+
+def latest_blobs_per_file(blobs: list, source_index: str, executor) -> tuple:
+    """
+    파일별로 가장 최근에 저장된 processed Blob만 남김
+
+    메타데이터(parent_id)가 있는 Blob은 목록만으로 판단하고, 예전 Blob만 내려받아 청크의 parentId/fileName으로 판단.
+    Returns: (남길 Blob 이름 리스트 - 저장 순서, 더 새 Blob에 밀린 Blob 이름 리스트)
+    """
+    unknown = [blob["name"] for blob in blobs if not blob["parent_id"]]
+    keys = {blob["name"]: blob["parent_id"] for blob in blobs if blob["parent_id"]}
+    for blob_name, chunks, error in executor.map(propagate_context(lambda name: _download(name, source_index)), unknown):
+        # 내려받지 못한 Blob은 단독으로 두고 본 처리에서 실패로 기록
+        keys[blob_name] = blob_name if error else _parent_key(chunks, blob_name)
+
+    latest = {}
+    for blob in sorted(blobs, key=lambda b: (b["last_modified"] is not None, b["last_modified"] or 0, b["name"])):
+        latest[keys[blob["name"]]] = blob["name"]
+    keep = set(latest.values())
+    ordered = [blob["name"] for blob in blobs if blob["name"] in keep]
+    superseded = [blob["name"] for blob in blobs if blob["name"] not in keep]
+    return ordered, superseded
+
+
+def _embed_chunks(chunks: list, model: str = None, dimensions: int = None) -> list:
+    """청크를 배치 단위로 임베딩하여 검색 문서로 변환"""
+    documents = []
+    for start in range(0, len(chunks), REINDEX_EMBEDDING_BATCH_SIZE):
+        batch = chunks[start:start + REINDEX_EMBEDDING_BATCH_SIZE]
+        vectors = get_embeddings([build_embedding_input(item) for item in batch], model=model, dimensions=dimensions)
+        for item, vector in zip(batch, vectors):
+            documents.append(build_search_document(item, vector))
+    return documents
+
+
+def run_reindex(source_index: str, target_index: str, task_id: str = None, resume: bool = True,
+                embedding_model: str = None, dimensions: int = None,
+                download_concurrency: int = REINDEX_DOWNLOAD_CONCURRENCY) -> dict:
+    """
+    source_index의 처리된 JSON Blob으로 target_index를 (재)구성
+
+    Args:
+        source_index: 처리된 JSON이 저장된 인덱스 이름 ({source_index}-processed 컨테이너)
+        target_index: 적재할 인덱스 이름 (없으면 생성)
+        task_id: 진행 상황을 기록할 task ID (optional)
+        resume: True면 체크포인트에 기록된 Blob은 건너뜀
+        embedding_model: 임베딩 배포 이름 (None이면 기본값)
+        dimensions: 임베딩 차원 수 (None이면 모델 기본값, 인덱스 생성 시 3072)
+        download_concurrency: 동시에 내려받을 Blob 수 (1 이상)
+        대상 인덱스가 이미 다른 차원/임베딩 설정으로 만들어져 있으면 ValueError
+
+    Returns:
+        처리 결과 리포트 (blobs/chunks 수, 실패 수, 처리량)
+    """
+    if download_concurrency < 1:
+        raise ValueError(f"download_concurrency must be at least 1 (got {download_concurrency})")
+    started = time()
+
+    def progress(message: str, percent: int = None):
+        logger.info(f"[Reindex] {message}")
+        if task_id:
+            task_manager.update_task(task_id, status="processing", progress=percent, message=message)
+
+    # 대상 인덱스가 이미 있으면 벡터 차원 / 저장된 임베딩 설정이 요청과 같아야 함
+    requested = {"model": embedding_model, "dimensions": dimensions}
+    create_index_if_not_exists(target_index, vector_dimensions=dimensions or DEFAULT_VECTOR_DIMENSIONS)
+    index_dimensions = get_index_vector_dimensions(target_index)
+    if index_dimensions and index_dimensions != (dimensions or DEFAULT_VECTOR_DIMENSIONS):
+        raise ValueError(f"Index '{target_index}' has {index_dimensions}-dimensional vectors, "
+                         f"requested {dimensions or DEFAULT_VECTOR_DIMENSIONS}")
+    current = get_index_embedding_settings(target_index)
+    if any(current.values()) and current != requested:
+        raise ValueError(f"Index '{target_index}' uses embedding settings {current}, requested {requested}")
+    save_index_embedding_settings(target_index, embedding_model, dimensions)
+    search_client = get_search_client(index_name=target_index)
+
+    completed = load_checkpoint(source_index, target_index) if resume else set()
+    blob_list = list_processed_blobs(source_index)
+
+    with ThreadPoolExecutor(max_workers=download_concurrency) as executor:
+        blobs, superseded = latest_blobs_per_file(blob_list, source_index, executor)
+    pending = [name for name in blobs if name not in completed]
+    progress(f"{len(pending)}/{len(blobs)} blobs to process ({len(blobs) - len(pending)} already done, "
+             f"{len(superseded)} superseded by newer uploads)", 0)
+
+    report = {
+        "source_index": source_index,
+        "target_index": target_index,
+        "blobs_total": len(blob_list),
+        "blobs_superseded": len(superseded),
+        "blobs_skipped": len(blobs) - len(pending),
+        "blobs_processed": 0,
+        "blobs_failed": 0,
+        "chunks_indexed": 0,
+        "chunks_failed": 0,
+    }
+
+    # download_concurrency개씩 묶어서 병렬 다운로드 → 임베딩 → 업로드 → 체크포인트 저장
+    with ThreadPoolExecutor(max_workers=download_concurrency) as executor:
+        for start in range(0, len(pending), download_concurrency):
+            window = pending[start:start + download_concurrency]
+            downloads = executor.map(propagate_context(lambda name: _download(name, source_index)), window)
+
+            for blob_name, chunks, download_error in downloads:
+                try:
+                    if download_error:
+                        raise download_error
+                    if not isinstance(chunks, list) or not chunks:
+                        logger.warning(f"⚠️ [Reindex] Empty or invalid blob: {blob_name}")
+                        completed.add(blob_name)
+                        continue
+
+                    # 안정적 청크 id 도입 이전에 저장된 JSON은 id가 없으므로 여기서 부여
+                    if any(not item.get("id") for item in chunks):
+                        file_name = chunks[0].get("fileName") or blob_name.replace("_processed.json", "")
+                        assign_stable_chunk_ids(chunks, file_name)
+
+                    documents = _embed_chunks(chunks, model=embedding_model, dimensions=dimensions)
+                    statuses = write_documents(search_client, documents)
+                    failed = sum(1 for status in statuses.values() if not status["succeeded"])
+
+                    report["chunks_indexed"] += len(statuses) - failed
+                    report["chunks_failed"] += failed
+                    report["blobs_processed"] += 1
+                    if failed == 0:
+                        completed.add(blob_name)
+                    else:
+                        report["blobs_failed"] += 1
+                except Exception as e:
+                    logger.exception(f"❌ [Reindex] {blob_name} failed: {e}")
+                    report["blobs_failed"] += 1
+
+            save_checkpoint(source_index, target_index, completed)
+
+            elapsed = time() - started
+            done = start + len(window)
+            progress(
+                f"{done}/{len(pending)} blobs, {report['chunks_indexed']} chunks "
+                f"({report['chunks_indexed'] / elapsed:.1f} chunks/s)",
+                int(done * 100 / len(pending))
+            )
+
+    elapsed = time() - started
+    report["elapsed_seconds"] = round(elapsed, 2)
+    report["chunks_per_second"] = round(report["chunks_indexed"] / elapsed, 2) if elapsed else 0.0
+    report["blobs_per_second"] = round(report["blobs_processed"] / elapsed, 2) if elapsed else 0.0
+
+    if task_id:
+        status = "completed" if report["blobs_failed"] == 0 else "completed_with_warning"
+        task_manager.update_task(task_id, status=status, progress=100, message="Reindex complete")
+        task_manager.tasks[task_id]["report"] = report
+
+    logger.info(f"✅ [Reindex] Done: {report}")
+    return report
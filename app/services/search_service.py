@@ -1,31 +1,27 @@
-from azure.search.documents import SearchClient
-from azure.search.documents.indexes import SearchIndexClient
-from azure.search.documents.indexes.models import (
-    SearchIndex,
-    SimpleField,
-    SearchableField,
-    SearchFieldDataType,
-    VectorSearch,
-    HnswAlgorithmConfiguration,
-    VectorSearchProfile,
-    SearchField,
-    SemanticConfiguration,
-    SemanticPrioritizedFields,
-    SemanticField,
-    SemanticSearch
-)
-from azure.core.credentials import AzureKeyCredential
+# Azure SDK는 처음 사용하는 함수 안에서 import (앱 시작 시간 단축)
 from app.config import (
     AZURE_SEARCH_ENDPOINT,
     AZURE_SEARCH_KEY,
     AZURE_SEARCH_INDEX_NAME,
     AZURE_SEARCH_ADMIN_KEY,
-    AZURE_SEARCH_SERVICE_ENDPOINT
+    AZURE_SEARCH_SERVICE_ENDPOINT,
+    FEDERATED_SEARCH_TIMEOUT,
+    FEDERATED_SEARCH_MAX_INDEXES,
+    FEDERATED_RRF_K
 )
 from app.services.openai_service import get_embedding
-import traceback
+from app.logging_setup import propagate_context
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from time import time
+import logging
+import base64
+import hashlib
+import json
+
+logger = logging.getLogger(__name__)
 
 INDEX_NAME = AZURE_SEARCH_INDEX_NAME
+DEFAULT_VECTOR_DIMENSIONS = 3072  # text-embedding-3-large 기본 차원
 
 """
 def get_search_index_client():
@@ -44,25 +40,64 @@ def get_search_client(index_name: str = None):
     )
 """
 
+_search_clients = {}  # {index_name: SearchClient} - 인덱스별 싱글톤 (HTTP 연결 풀 재사용)
+_search_index_client = None
+
 def get_search_client(index_name: str = None):
-    return SearchClient(
-        endpoint=AZURE_SEARCH_ENDPOINT,
-        index_name=index_name or AZURE_SEARCH_INDEX_NAME,
-        credential=AzureKeyCredential(AZURE_SEARCH_KEY)
-    )
+    index_name = index_name or AZURE_SEARCH_INDEX_NAME
+    client = _search_clients.get(index_name)
+    if client is None:
+        from azure.search.documents import SearchClient
+        from azure.core.credentials import AzureKeyCredential
+
+        client = _search_clients.setdefault(index_name, SearchClient(
+            endpoint=AZURE_SEARCH_ENDPOINT,
+            index_name=index_name,
+            credential=AzureKeyCredential(AZURE_SEARCH_KEY)
+        ))
+    return client
 
 def get_search_index_client():
-    return SearchIndexClient(
-        endpoint=AZURE_SEARCH_SERVICE_ENDPOINT,
-        credential=AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY)
-    )
+    global _search_index_client
+    if _search_index_client is None:
+        from azure.search.documents.indexes import SearchIndexClient
+        from azure.core.credentials import AzureKeyCredential
+
+        _search_index_client = SearchIndexClient(
+            endpoint=AZURE_SEARCH_SERVICE_ENDPOINT,
+            credential=AzureKeyCredential(AZURE_SEARCH_ADMIN_KEY)
+        )
+    return _search_index_client
+
 
+def create_index_if_not_exists(index_name: str = None, vector_dimensions: int = DEFAULT_VECTOR_DIMENSIONS):
+    """
+    인덱스가 없으면 생성
+
+    Args:
+        index_name: 인덱스 이름 (None이면 기본 인덱스)
+        vector_dimensions: content_vector 차원 수 (임베딩 모델에 맞춰야 함)
+    """
+    from azure.search.documents.indexes.models import (
+        SearchIndex,
+        SimpleField,
+        SearchableField,
+        SearchFieldDataType,
+        VectorSearch,
+        HnswAlgorithmConfiguration,
+        VectorSearchProfile,
+        SearchField,
+        SemanticConfiguration,
+        SemanticPrioritizedFields,
+        SemanticField,
+        SemanticSearch
+    )
 
-def create_index_if_not_exists():
     index_client = get_search_index_client()
+    target_index = index_name or INDEX_NAME
     
     try:
-        index_client.get_index(INDEX_NAME)
+        index_client.get_index(target_index)
         return
     except:
         pass
@@ -73,7 +108,7 @@ def create_index_if_not_exists():
             name="content_vector",
             type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
             searchable=True,
-            vector_search_dimensions=3072,
+            vector_search_dimensions=vector_dimensions,
             vector_search_profile_name="my-vector-profile"
         ),
         SearchableField(name="content", type=SearchFieldDataType.String, analyzer_name="ko.lucene"),
@@ -96,7 +131,7 @@ def create_index_if_not_exists():
         SearchField(name="relatedSection", type=SearchFieldDataType.Collection(SearchFieldDataType.String), searchable=True, filterable=True, analyzer_name="standard.lucene"),
 
         # 3. Identifiers & Location
-        SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True),
+        SimpleField(name="id", type=SearchFieldDataType.String, key=True, filterable=True, sortable=True),
         SimpleField(name="parentId", type=SearchFieldDataType.String, filterable=True),
         SearchableField(name="fileName", type=SearchFieldDataType.String, filterable=True, analyzer_name="standard.lucene"),
         SearchableField(name="filePath", type=SearchFieldDataType.String, filterable=True, analyzer_name="standard.lucene"),
@@ -140,7 +175,7 @@ def create_index_if_not_exists():
     
     semantic_search = SemanticSearch(configurations=[semantic_config])
     
-    index = SearchIndex(name=INDEX_NAME, fields=fields, vector_search=vector_search, semantic_search=semantic_search)
+    index = SearchIndex(name=target_index, fields=fields, vector_search=vector_search, semantic_search=semantic_search)
     index_client.create_index(index)
 
 def add_document_to_index(doc_id: str, content: str, file_name: str):
@@ -162,161 +197,353 @@ def add_document_to_index(doc_id: str, content: str, file_name: str):
     
     search_client.upload_documents([document])
 
-def index_processed_chunks(chunks: list, index_name: str = None):
+def _ensure_list_str(value):
+    """Ensure the value is a list of strings."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    if isinstance(value, str):
+        if not value.strip():
+            return []
+        if ',' in value:
+            return [v.strip() for v in value.split(',')]
+        return [value]
+    return [str(value)]
+
+def _ensure_string(value):
+    """Ensure the value is a string."""
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return ""
+    return str(value)
+
+def build_embedding_input(item: dict) -> str:
+    """청크의 임베딩 입력 텍스트 (ingest_data.py와 동일 로직)"""
+    return f"파일 전체 요약: {item.get('parentSummary', '')}\n\n 상세 본문: {item.get('content', '')}"
+
+def build_search_document(item: dict, vector: list) -> dict:
+    """LLM 전처리 청크 + 임베딩 → Azure Search 문서 필드 매핑"""
+    return {
+        # Core Vector & Content
+        "content_vector": vector,
+        "content": _ensure_string(item.get("content", "")),
+        "parentSummary": _ensure_string(item.get("parentSummary", "")),
+        "chunkSummary": _ensure_string(item.get("chunkSummary")),
+        "codeExplanation": _ensure_string(item.get("codeExplanation")),
+        "designIntent": _ensure_string(item.get("designIntent")),
+        "handoverNotes": _ensure_string(item.get("handoverNotes")),
+        "codeComments": _ensure_list_str(item.get("codeComments")),
+
+        # Filtering & Metadata
+        "processedDate": item.get("processedDate"),
+        "paraCategory": _ensure_string(item.get("paraCategory")),
+        "fileType": _ensure_string(item.get("fileType")),
+        "language": _ensure_string(item.get("language")),
+        "framework": _ensure_string(item.get("framework")),
+        "serviceDomain": _ensure_string(item.get("serviceDomain")),
+        "isArchived": item.get("isArchived", False),
+        "tags": _ensure_list_str(item.get("tags")),
+        "relatedSection": _ensure_list_str(item.get("relatedSection")),
+
+        # Identifiers
+        "id": item.get("id"),
+        "parentId": _ensure_string(item.get("parentId")),
+        "fileName": _ensure_string(item.get("fileName")),
+        "filePath": _ensure_string(item.get("filePath")),
+        "url": _ensure_string(item.get("url")),
+
+        # Payload (Stringified JSON)
+        "chunkMeta": _ensure_string(item.get("chunkMeta")) if isinstance(item.get("chunkMeta"), str) else str(item.get("chunkMeta", {})),
+        "codeMetadata": _ensure_string(item.get("codeMetadata")) if isinstance(item.get("codeMetadata"), str) else str(item.get("codeMetadata", {})),
+        "involvedPeople": _ensure_string(item.get("involvedPeople")) if isinstance(item.get("involvedPeople"), str) else str(item.get("involvedPeople", [])),
+        "rawCode": _ensure_string(item.get("rawCode")),
+        "relatedFiles": _ensure_list_str(item.get("relatedFiles"))
+    }
+
+def _create_index_with_script():
+    """인덱스가 없을 때 create_index.py를 실행해서 생성 (없으면 False)"""
+    import subprocess
+    import sys
+    import os
+
+    # create_index.py 위치 찾기 (루트 디렉토리 가정)
+    root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) # app -> Proto -> proto -> project_root
+    script_path = os.path.join(root_dir, "create_index.py")
+
+    if not os.path.exists(script_path):
+        # 경로가 다를 경우 상대 경로 시도
+        script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../create_index.py"))
+
+    if not os.path.exists(script_path):
+        logger.error(f"❌ Could not find create_index.py at {script_path}")
+        return False
+
+    logger.info(f"   Running index creation script: {script_path}")
+    subprocess.run([sys.executable, script_path], check=True)
+    logger.info("✅ Index created. Retrying upload...")
+    return True
+
+# ===== 인덱스별 임베딩 설정 =====
+# 재색인(--model / --dimensions)으로 만든 인덱스는 기본 배포와 다른 임베딩을 저장함.
+# 검색 쿼리 / 새 업로드도 같은 모델·차원으로 임베딩해야 벡터가 맞으므로 설정을 인덱스별로 저장해 두고 사용.
+# 저장 위치: 해당 인덱스의 processed 컨테이너 (_index/embedding.json - 재색인 대상 목록에는 포함되지 않음)
+
+EMBEDDING_SETTINGS_BLOB = "_index/embedding.json"
+EMBEDDING_SETTINGS_TTL = 300  # 초 (다른 워커가 저장한 설정도 이 시간 안에 반영)
+
+_embedding_settings = {}  # 인덱스 이름 → (조회 시각, {"model", "dimensions"})
+
+
+def get_index_embedding_settings(index_name: str = None) -> dict:
+    """인덱스 임베딩 설정 {"model", "dimensions"} (저장된 설정이 없으면 둘 다 None = 기본 배포/차원)"""
+    from app.services.blob_service import download_processed_json
+
+    target_index = index_name or AZURE_SEARCH_INDEX_NAME
+    cached = _embedding_settings.get(target_index)
+    if cached and time() - cached[0] < EMBEDDING_SETTINGS_TTL:
+        return cached[1]
+
+    try:
+        data = download_processed_json(EMBEDDING_SETTINGS_BLOB, index_name=index_name) or {}
+    except Exception as e:
+        # 컨테이너가 없는 새 인덱스 등 - 캐시하지 않고 기본값
+        logger.debug(f"Embedding settings not loaded for {target_index}: {e}")
+        return {"model": None, "dimensions": None}
+
+    settings = {"model": data.get("model"), "dimensions": data.get("dimensions")}
+    _embedding_settings[target_index] = (time(), settings)
+    return settings
+
+
+def save_index_embedding_settings(index_name: str, model: str = None, dimensions: int = None):
+    from app.services.blob_service import save_processed_json
+
+    settings = {"model": model, "dimensions": dimensions}
+    save_processed_json(EMBEDDING_SETTINGS_BLOB, json.dumps(settings), index_name=index_name)
+    _embedding_settings[index_name or AZURE_SEARCH_INDEX_NAME] = (time(), settings)
+
+
+def get_index_vector_dimensions(index_name: str = None):
+    """인덱스 content_vector 필드의 차원 수 (인덱스가 없으면 None)"""
+    try:
+        index = get_search_index_client().get_index(index_name or INDEX_NAME)
+    except Exception:
+        return None
+    for field in index.fields:
+        if field.name == "content_vector":
+            return field.vector_search_dimensions
+    return None
+
+
+def embed_for_index(text: str, index_name: str = None) -> list:
+    """인덱스에 저장된 벡터와 같은 모델/차원으로 임베딩"""
+    return get_embedding(text, **get_index_embedding_settings(index_name))
+
+# ===== 청크 식별자 (재업로드 시 변경분만 처리) =====
+
+def make_parent_id(file_name: str, source_path: str = None) -> str:
+    """
+    파일 식별자 - 원본 경로(source_path)가 있으면 경로, 없으면 파일명 기준
+    경로 없이 올린 파일은 파일명만으로 구분하므로, 같은 인덱스에 이름이 같은 다른 파일을 올리면
+    같은 파일의 새 버전으로 취급되어 기존 청크를 대체함 (폴더 업로드는 상대 경로를 보내서 구분)
+    """
+    identity = source_path or file_name
+    return "file_" + hashlib.sha256(identity.encode("utf-8")).hexdigest()[:32]
+
+def assign_stable_chunk_ids(chunks: list, file_name: str, source_path: str = None) -> list:
+    """
+    청크 id를 (파일 식별자, 청크 본문 해시)로 결정적으로 부여
+    - 같은 파일을 다시 올려도 내용이 같은 청크는 같은 id → 임베딩/업로드 생략 가능
+    - 코드 청크는 LLM이 쓰는 content 대신 원본 rawCode 기준
+    - 한 파일 안에 본문이 같은 청크가 여러 개면 순번을 붙여 구분
+    """
+    parent_id = make_parent_id(file_name, source_path)
+    seen = {}
+    for chunk in chunks:
+        source = chunk.get("rawCode") or chunk.get("content") or ""
+        digest = hashlib.sha256(_ensure_string(source).encode("utf-8")).hexdigest()[:32]
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+
+        chunk["id"] = f"{parent_id}_{digest}" + (f"_{occurrence}" if occurrence else "")
+        chunk["parentId"] = parent_id
+        chunk["fileName"] = file_name
+    return chunks
+
+def get_existing_chunks(parent_id: str, file_name: str = None, index_name: str = None) -> list:
+    """
+    인덱스에 이미 있는 같은 파일의 청크 (id + 통계용 패싯 필드)
+
+    file_name: stable id 이전에 올라간 청크(LLM이 만든 임의 parentId)도 같은 파일로 보고 찾음.
+    파일명 기준 식별자일 때만 사용 - 경로 기준 식별자면 같은 이름의 다른 파일 청크를 지우게 되므로 무시.
+    파일명으로 찾은 청크 중 다른 stable parentId("file_...")를 가진 것은 다른 파일이므로 제외.
+    """
+    from azure.core.exceptions import ResourceNotFoundError
+
+    conditions = [f"parentId eq '{parent_id}'"]
+    if file_name and make_parent_id(file_name) == parent_id:
+        conditions.append(f"fileName eq '{file_name.replace(chr(39), chr(39) * 2)}'")
+
+    search_client = get_search_client(index_name=index_name)
+    try:
+        results = search_client.search(
+            search_text="*",
+            filter=" or ".join(conditions),
+            select=["id", "parentId", "paraCategory", "fileType", "tags", "language"]
+        )
+        return [
+            dict(result) for result in results
+            if result.get("parentId") == parent_id or not str(result.get("parentId") or "").startswith("file_")
+        ]
+    except ResourceNotFoundError:
+        # 인덱스가 아직 없음 - 업로드 단계에서 생성
+        return []
+
+def index_processed_chunks(chunks: list, index_name: str = None, task_id: str = None, sync_file: bool = True):
     """
     LLM 전처리가 완료된 청크 리스트(메모리 상의 객체)를 받아 Azure Search에 업로드합니다.
     인덱스가 없으면 자동으로 생성합니다.
 
+    - sync_file=True면 같은 파일(parentId/fileName)의 기존 청크와 비교해서
+      바뀌지 않은 청크는 임베딩/업로드를 생략하고, 새/변경 청크만 merge_or_upload,
+      더 이상 없는 청크는 일괄 삭제
+    - 문서 수/크기 기준으로 배치를 나눠 병렬 업로드 (index_writer)
+    - 실패한 문서만 재시도하고, 최종 결과는 문서별로 task_manager에 기록
+    - task_id 작업이 취소되면 청크/배치 사이에서 멈추고, 이번에 새로 올린 문서는 삭제한 뒤 TaskCancelled 발생
+      (기존 청크 삭제 전에 멈추므로 인덱스는 업로드 전 상태로 남음)
+
     Args:
-        chunks: 인덱싱할 청크 리스트
+        chunks: 인덱싱할 청크 리스트 (assign_stable_chunk_ids로 id가 부여된 상태 권장)
         index_name: RAG 인덱스 이름 (None이면 기본 인덱스 사용)
+        task_id: 결과를 기록할 업로드 작업 ID (optional)
+        sync_file: 기존 청크와 비교하여 변경분만 반영할지 여부
+
+    Returns:
+        인덱스에 반영된(업로드 성공 + 변경 없음) 청크 수
     """
+    from app.services.index_writer import write_documents
+    from app.services.stats_service import record_indexed, record_deleted
+    from app.state import task_manager, TaskCancelled
+    from app.metrics import stage_span
+
     if not chunks:
-        print("[Warning] No chunks to index.")
+        logger.warning("No chunks to index.")
         return 0
 
     target_index = index_name or AZURE_SEARCH_INDEX_NAME
-    print(f"🔍 Target index: {target_index}")
+    logger.debug(f"🔍 Target index: {target_index}")
 
     search_client = get_search_client(index_name=index_name)
-    documents_batch = []
-    count = 0
 
-    print(f"[Info] Indexing {len(chunks)} chunks to '{target_index}'...")
+    def cancelled():
+        return bool(task_id) and task_manager.is_cancel_requested(task_id)
 
-    # Helper functions for type safety
-    def ensure_list_str(value):
-        """Ensure the value is a list of strings."""
-        if value is None:
-            return []
-        if isinstance(value, list):
-            return [str(v) for v in value]
-        if isinstance(value, str):
-            if not value.strip():
-                return []
-            if ',' in value:
-                return [v.strip() for v in value.split(',')]
-            return [value]
-        return [str(value)]
-
-    def ensure_string(value):
-        """Ensure the value is a string."""
-        if isinstance(value, str):
-            return value
-        if value is None:
-            return ""
-        return str(value)
-
-    for item in chunks:
-        # ... (기존 임베딩 생성 및 문서 매핑 로직 유지) ...
-        try:
-            # 1. 임베딩 생성 (ingest_data.py와 동일 로직)
-            parent_summary = item.get("parentSummary", "")
-            content = item.get("content", "")
-            
-            # 임베딩 입력 텍스트 조합
-            embedding_input = f"파일 전체 요약: {parent_summary}\n\n 상세 본문: {content}"
-            
-            # 임베딩 생성
-            vector = get_embedding(embedding_input)
-            
-            if not vector:
-                print(f"[Warning] Skipping chunk {item.get('id')}: Embedding failed.")
-                continue
-
-            # 2. 필드 매핑
-            document = {
-                # Core Vector & Content
-                "content_vector": vector,
-                "content": ensure_string(content),
-                "parentSummary": ensure_string(parent_summary),
-                "chunkSummary": ensure_string(item.get("chunkSummary")),
-                "codeExplanation": ensure_string(item.get("codeExplanation")),
-                "designIntent": ensure_string(item.get("designIntent")),
-                "handoverNotes": ensure_string(item.get("handoverNotes")),
-                "codeComments": ensure_list_str(item.get("codeComments")),
-
-                # Filtering & Metadata
-                "processedDate": item.get("processedDate"),
-                "paraCategory": ensure_string(item.get("paraCategory")),
-                "fileType": ensure_string(item.get("fileType")),
-                "language": ensure_string(item.get("language")),
-                "framework": ensure_string(item.get("framework")),
-                "serviceDomain": ensure_string(item.get("serviceDomain")),
-                "isArchived": item.get("isArchived", False),
-                "tags": ensure_list_str(item.get("tags")),
-                "relatedSection": ensure_list_str(item.get("relatedSection")),
-
-                # Identifiers
-                "id": item.get("id"),
-                "parentId": ensure_string(item.get("parentId")),
-                "fileName": ensure_string(item.get("fileName")),
-                "filePath": ensure_string(item.get("filePath")),
-                "url": ensure_string(item.get("url")),
-
-                # Payload (Stringified JSON)
-                "chunkMeta": ensure_string(item.get("chunkMeta")) if isinstance(item.get("chunkMeta"), str) else str(item.get("chunkMeta", {})),
-                "codeMetadata": ensure_string(item.get("codeMetadata")) if isinstance(item.get("codeMetadata"), str) else str(item.get("codeMetadata", {})),
-                "involvedPeople": ensure_string(item.get("involvedPeople")) if isinstance(item.get("involvedPeople"), str) else str(item.get("involvedPeople", [])),
-                "rawCode": ensure_string(item.get("rawCode")),
-                "relatedFiles": ensure_list_str(item.get("relatedFiles"))
-            }
-
-            documents_batch.append(document)
-            count += 1
+    def report(key, status):
+        if task_id:
+            task_manager.set_item_status(
+                task_id, key,
+                "indexed" if status["succeeded"] else "failed",
+                status.get("error")
+            )
 
-        except Exception as e:
-            print(f"❌ Error preparing chunk {item.get('id')}: {e}")
-            traceback.print_exc()
- 
-    # 3. 배치 업로드 (자동 인덱스 생성 로직 추가)
+    # 1. 기존 청크와 비교 (같은 파일의 청크가 한 parentId로 묶여 있을 때만)
+    existing = {}
+    parent_ids = {chunk.get("parentId") for chunk in chunks}
+    compared = sync_file and len(parent_ids) == 1 and None not in parent_ids
+    if compared:
+        file_names = {chunk.get("fileName") for chunk in chunks}
+        file_name = file_names.pop() if len(file_names) == 1 else None
+        existing = {doc["id"]: doc for doc in get_existing_chunks(parent_ids.pop(), file_name, index_name)}
+
+    new_ids = {chunk.get("id") for chunk in chunks}
+    unchanged = [chunk for chunk in chunks if chunk.get("id") in existing]
+    changed = [chunk for chunk in chunks if chunk.get("id") not in existing]
+    removed = [doc for doc_id, doc in existing.items() if doc_id not in new_ids]
+
+    logger.info(f"Indexing to '{target_index}': {len(changed)} new/changed, {len(unchanged)} unchanged, {len(removed)} removed")
+    for chunk in unchanged:
+        if task_id:
+            task_manager.set_item_status(task_id, chunk["id"], "unchanged")
+
+    # 2. 새/변경 청크만 임베딩 + 필드 매핑
+    documents_batch = []
+    with stage_span(task_id, "embed", items=len(changed)):
+        for item in changed:
+            if cancelled():
+                raise TaskCancelled(task_id)
+            try:
+                vector = embed_for_index(build_embedding_input(item), index_name)
+
+                if not vector:
+                    logger.warning(f"Skipping chunk {item.get('id')}: Embedding failed.")
+                    report(item.get("id"), {"succeeded": False, "error": "Embedding failed"})
+                    continue
+
+                documents_batch.append(build_search_document(item, vector))
+
+            except Exception as e:
+                logger.exception(f"❌ Error preparing chunk {item.get('id')}: {e}")
+                report(item.get("id"), {"succeeded": False, "error": f"Preparation failed: {e}"})
+
+    # 3. 배치 업로드 (자동 인덱스 생성 로직 포함)
+    statuses = {}
     if documents_batch:
-        try:
-            result = search_client.upload_documents(documents=documents_batch)
-            if not all(r.succeeded for r in result):
-                print("[Warning] Some documents failed to upload.")
-            else:
-                print(f"[Success] Successfully indexed {len(documents_batch)} documents.")
-        except Exception as e:
-            # 인덱스가 없어서 실패한 경우 (ResourceNotFoundError)
-            if "The index" in str(e) and "was not found" in str(e):
-                print(f"⚠️ Index not found. Attempting to create index '{AZURE_SEARCH_INDEX_NAME}'...")
-                try:
-                    # create_index.py 로직을 subprocess로 실행
-                    import subprocess
-                    import sys
-                    import os
-                    
-                    # create_index.py 위치 찾기 (루트 디렉토리 가정)
-                    root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))) # app -> Proto -> proto -> project_root
-                    script_path = os.path.join(root_dir, "create_index.py")
-                    
-                    if not os.path.exists(script_path):
-                        # 경로가 다를 경우 상대 경로 시도
-                        script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../create_index.py"))
-                    
-                    if os.path.exists(script_path):
-                        print(f"   Running index creation script: {script_path}")
-                        subprocess.run([sys.executable, script_path], check=True)
-                        print("✅ Index created. Retrying upload...")
-                        
-                        # 인덱스 생성 후 다시 업로드 시도
-                        result = search_client.upload_documents(documents=documents_batch)
-                        print(f"[Success] Successfully indexed {len(documents_batch)} documents (after creation).")
-                    else:
-                        print(f"❌ Could not find create_index.py at {script_path}")
+        with stage_span(task_id, "index", items=len(documents_batch)):
+            try:
+                statuses = write_documents(search_client, documents_batch, action="merge_or_upload",
+                                           on_status=report, should_stop=cancelled)
+            except Exception as e:
+                # 인덱스가 없어서 실패한 경우 (ResourceNotFoundError)
+                if "The index" in str(e) and "was not found" in str(e):
+                    logger.warning(f"⚠️ Index not found. Attempting to create index '{AZURE_SEARCH_INDEX_NAME}'...")
+                    try:
+                        created = _create_index_with_script()
+                    except Exception as create_error:
+                        logger.error(f"❌ Failed to create index automatically: {create_error}")
+                        raise e
+                    if not created:
                         raise e
-                except Exception as create_error:
-                    print(f"❌ Failed to create index automatically: {create_error}")
+                    # 인덱스 생성 후 다시 업로드 시도
+                    statuses = write_documents(search_client, documents_batch, action="merge_or_upload",
+                                               on_status=report, should_stop=cancelled)
+                else:
+                    logger.exception(f"Error uploading batch to Search: {e}")
                     raise e
-            else:
-                print(f"[Error] Error uploading batch to Search: {e}")
-                traceback.print_exc()
-                raise e
-            
-    return count
-
-def search_documents(query: str, filters: dict = None, top_k: int = 5, index_name: str = None):
+
+    # 취소됨 → 이번 작업이 새로 올린 문서 되돌리기 (변경 없는 청크/기존 청크는 그대로)
+    if cancelled():
+        written = [{"id": key} for key, status in statuses.items() if status["succeeded"]]
+        if written:
+            rollback = write_documents(search_client, written, action="delete")
+            removed_count = sum(1 for status in rollback.values() if status["succeeded"])
+            logger.info(f"⏹️ Cancelled - removed {removed_count}/{len(written)} documents written by this task.")
+        raise TaskCancelled(task_id)
+
+    # 4. 파일에서 사라진 청크 일괄 삭제
+    if removed:
+        delete_statuses = write_documents(search_client, [{"id": doc["id"]} for doc in removed], action="delete")
+        deleted = [doc for doc in removed if delete_statuses.get(doc["id"], {}).get("succeeded")]
+        logger.info(f"Deleted {len(deleted)}/{len(removed)} stale chunks.")
+        if deleted:
+            record_deleted(target_index, deleted)
+
+    uploaded_keys = {key for key, status in statuses.items() if status["succeeded"]}
+    indexed = len(uploaded_keys) + len(unchanged)
+    if indexed < len(chunks):
+        logger.warning(f"{len(chunks) - indexed}/{len(chunks)} chunks were not indexed.")
+    else:
+        logger.info(f"Indexed {len(uploaded_keys)} documents ({len(unchanged)} unchanged).")
+
+    # 5. 통계 캐시 증분 반영 (대시보드가 검색 쿼리를 다시 보내지 않도록)
+    # 기존 청크와 비교했으면 올린 문서는 모두 새 id, 아니면 덮어쓴 문서가 섞여 있을 수 있어 캐시 무효화
+    if uploaded_keys:
+        record_indexed(target_index, [doc for doc in documents_batch if doc["id"] in uploaded_keys], all_new=compared)
+
+    return indexed
+
+def search_documents(query: str, filters: dict = None, top_k: int = 5, index_name: str = None, query_embedding: list = None):
     """
     하이브리드 검색 수행 (Vector + Semantic + Keyword)
 
@@ -325,14 +552,16 @@ def search_documents(query: str, filters: dict = None, top_k: int = 5, index_nam
         filters: 필터 조건
         top_k: 반환할 최대 결과 수
         index_name: 검색할 RAG 인덱스 이름 (None이면 기본 인덱스)
+        query_embedding: 미리 계산된 쿼리 임베딩 (None이면 새로 생성)
     """
     from azure.search.documents.models import VectorizedQuery
 
     target_index = index_name or AZURE_SEARCH_INDEX_NAME
-    print(f"🔍 Searching in index: {target_index}")
+    logger.debug(f"🔍 Searching in index: {target_index}")
 
     search_client = get_search_client(index_name=index_name)
-    query_embedding = get_embedding(query)
+    if query_embedding is None:
+        query_embedding = embed_for_index(query, index_name)
 
     vector_query = VectorizedQuery(
         vector=query_embedding,
@@ -373,10 +602,155 @@ def search_documents(query: str, filters: dict = None, top_k: int = 5, index_nam
         return docs
 
     except Exception as e:
-        print(f"[Error] Search failed: {e}")
-        traceback.print_exc()
+        logger.exception(f"Search failed: {e}")
         return []
     
+def _fusion_key(doc: dict, index_name: str):
+    """
+    RRF 병합 키 - 같은 청크가 여러 인덱스에 있으면 하나로 합쳐야 함
+    stable id("file_...")는 (파일 식별자, 본문 해시)로 정해지므로 인덱스가 달라도 같은 청크면 같은 id.
+    그 이전에 LLM이 만든 id는 인덱스마다 의미가 다르므로 인덱스 이름까지 포함
+    """
+    doc_id = doc.get("id")
+    if doc_id and str(doc_id).startswith("file_"):
+        return doc_id
+    return (index_name, doc_id)
+
+def fuse_ranked_results(results_by_index: dict, index_names: list, top_k: int) -> list:
+    """
+    Reciprocal Rank Fusion: score = Σ 1 / (k + rank)
+
+    Args:
+        results_by_index: {index_name: 순위순 결과 리스트} (결과가 없는 인덱스는 빠져 있어도 됨)
+        index_names: 요청한 인덱스 순서 - 점수가 같으면 앞 인덱스, 같은 인덱스면 높은 순위가 먼저
+        top_k: 반환할 최대 결과 수
+
+    Returns:
+        결과 + index_name(가장 앞 인덱스), index_names(결과가 나온 인덱스들), fused_score
+    """
+    fused = {}
+    order = {}
+    for position, index_name in enumerate(index_names):
+        for rank, doc in enumerate(results_by_index.get(index_name) or [], start=1):
+            key = _fusion_key(doc, index_name)
+            if key not in fused:
+                fused[key] = dict(doc, index_name=index_name, index_names=[], fused_score=0.0)
+                order[key] = (position, rank)
+            if index_name not in fused[key]["index_names"]:
+                fused[key]["index_names"].append(index_name)
+            fused[key]["fused_score"] += 1.0 / (FEDERATED_RRF_K + rank)
+
+    ranked = sorted(fused, key=lambda key: (-fused[key]["fused_score"], order[key]))
+    return [fused[key] for key in ranked[:top_k]]
+
+def search_documents_federated(query: str, index_names: list, top_k: int = 5, timeout: float = FEDERATED_SEARCH_TIMEOUT):
+    """
+    여러 RAG 인덱스를 동시에 검색하고 Reciprocal Rank Fusion으로 결과 병합
+
+    - 쿼리 임베딩은 임베딩 설정이 같은 인덱스끼리 한 번만 생성해서 재사용
+      (임베딩도 병렬 - 설정이 다른 인덱스의 임베딩을 기다리지 않음)
+    - 인덱스마다 자기 작업을 시작한 시점부터 timeout 안에 끝나지 않으면 결과에서 제외
+      (전체 지연 시간 = 가장 느린 인덱스, 최대 timeout)
+    - 같은 청크가 여러 인덱스에서 나오면 하나로 합쳐서 점수를 더함 (_fusion_key)
+
+    Args:
+        query: 검색 쿼리
+        index_names: 검색할 인덱스 이름 리스트
+        top_k: 병합 후 반환할 최대 결과 수
+        timeout: 인덱스별 검색 제한 시간(초, 쿼리 임베딩 포함)
+
+    Returns:
+        search_documents와 같은 형식 + index_name, index_names, fused_score 필드
+    """
+    # 중복 제거 (순서 유지)
+    index_names = list(dict.fromkeys(index_names))[:FEDERATED_SEARCH_MAX_INDEXES]
+    if len(index_names) == 1:
+        docs = search_documents(query, top_k=top_k, index_name=index_names[0])
+        for doc in docs:
+            doc["index_name"] = index_names[0]
+        return docs
+
+    logger.info(f"🔍 Federated search in {len(index_names)} indexes: {index_names}")
+    # 임베딩 설정(모델, 차원)별로 한 번씩만 생성 (재색인으로 설정이 다른 인덱스가 섞일 수 있음)
+    settings_by_index = {index_name: get_index_embedding_settings(index_name) for index_name in index_names}
+    groups = {(settings["model"], settings["dimensions"]): settings for settings in settings_by_index.values()}
+
+    # 느린 인덱스를 기다리지 않도록 executor는 wait=False로 종료
+    executor = ThreadPoolExecutor(max_workers=len(index_names) + len(groups))
+    started = time()
+    try:
+        embedding_futures = {
+            key: executor.submit(propagate_context(get_embedding), query, **settings)
+            for key, settings in groups.items()
+        }
+
+        def search_one(index_name):
+            settings = settings_by_index[index_name]
+            embedding = embedding_futures[(settings["model"], settings["dimensions"])].result()
+            return search_documents(query, None, top_k, index_name, embedding)
+
+        deadlines = {}
+        futures = {}
+        for index_name in index_names:
+            futures[index_name] = executor.submit(propagate_context(search_one), index_name)
+            deadlines[index_name] = time() + timeout
+    finally:
+        executor.shutdown(wait=False)
+
+    results_by_index = {}
+    for index_name, future in futures.items():
+        try:
+            results_by_index[index_name] = future.result(timeout=max(0.0, deadlines[index_name] - time()))
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning(f"⚠️ Federated search timeout ({timeout}s): {index_name}")
+        except Exception as e:
+            logger.warning(f"⚠️ Federated search failed in {index_name}: {e}")
+
+    merged = fuse_ranked_results(results_by_index, index_names, top_k)
+    logger.info(f"✅ Federated search merged {len(merged)} results from {len(results_by_index)}/{len(index_names)} indexes in {time() - started:.2f}s")
+    return merged
+
+def search_chunks_by_section(sections: list = None, index_name: str = None, top: int = 20) -> list:
+    """
+    인수인계서 섹션(relatedSection) 기준으로 청크 조회
+
+    Args:
+        sections: relatedSection 값 리스트 (None이면 필터 없이 최신 청크 조회)
+        index_name: RAG 인덱스 이름 (None이면 기본 인덱스)
+        top: 반환할 최대 청크 수
+    """
+    search_client = get_search_client(index_name=index_name)
+
+    filter_expression = None
+    if sections:
+        filter_expression = f"relatedSection/any(s: search.in(s, '{','.join(sections)}', ','))"
+
+    try:
+        results = search_client.search(
+            search_text="*",
+            filter=filter_expression,
+            top=top,
+            order_by=["processedDate desc"],
+            select=["id", "fileName", "parentSummary", "chunkSummary", "content", "relatedSection", "processedDate"]
+        )
+
+        docs = []
+        for result in results:
+            docs.append({
+                "id": result.get("id"),
+                "fileName": result.get("fileName"),
+                "parentSummary": result.get("parentSummary"),
+                "chunkSummary": result.get("chunkSummary"),
+                "content": result.get("content"),
+                "processedDate": result.get("processedDate")
+            })
+        return docs
+
+    except Exception as e:
+        logger.exception(f"Section search failed ({sections}): {e}")
+        return []
+
 def get_document_count(index_name: str = None) -> int:
     """AI Search 인덱스의 총 문서 개수 조회"""
     try:
@@ -387,34 +761,141 @@ def get_document_count(index_name: str = None) -> int:
             top=1
         )
         count = results.get_count()
-        print(f"📊 인덱스 '{index_name or INDEX_NAME}' 문서 개수: {count}")
+        logger.info(f"📊 인덱스 '{index_name or INDEX_NAME}' 문서 개수: {count}")
         return count if count else 0
     except Exception as e:
-        print(f"⚠️  문서 개수 조회 실패: {e}")
-        traceback.print_exc()
+        logger.exception(f"⚠️  문서 개수 조회 실패: {e}")
         return 0
 
-def get_all_documents() -> list:
-    """AI Search 인덱스의 모든 문서 목록 조회"""
+# ===== 문서 목록 (페이지네이션) =====
+
+# 목록 조회 시 가져올 필드 (content/content_vector 제외 - 본문은 get_document_by_id로 개별 조회)
+LISTING_FIELDS = ["id", "parentId", "fileName", "fileType", "paraCategory", "processedDate", "chunkSummary"]
+MAX_SKIP = 100000  # Azure AI Search의 skip 최대값
+
+_id_sortable_cache = {}  # {index_name: bool}
+
+
+class DocumentListTruncated(Exception):
+    """skip 방식 목록이 Azure skip 한도(MAX_SKIP)에 걸려 나머지 문서를 읽을 수 없음"""
+
+def _encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state).encode("utf-8")).decode("ascii")
+
+def _decode_cursor(cursor: str) -> dict:
     try:
-        search_client = get_search_client()
-        results = search_client.search(
-            search_text="*",
-            include_total_count=True,
-            top=1000
-        )
-        docs = []
-        for result in results:
-            docs.append({
-                "id": result["id"],
-                "file_name": result.get("file_name", "Unknown"),
-                "content_length": len(result.get("content", ""))
-            })
-        print(f"📋 인덱싱된 문서 목록: {len(docs)}개")
-        for doc in docs:
-            print(f"   - {doc['file_name']} (ID: {doc['id']}, 길이: {doc['content_length']})")
-        return docs
-    except Exception as e:
-        print(f"⚠️  문서 목록 조회 실패: {e}")
-        traceback.print_exc()
-        return []
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("잘못된 cursor 값입니다.")
+
+def _is_id_sortable(index_name: str = None) -> bool:
+    """인덱스의 id 필드가 sortable인지 확인 (keyset 페이지네이션 가능 여부, 인덱스별 캐시)"""
+    target_index = index_name or AZURE_SEARCH_INDEX_NAME
+    if target_index not in _id_sortable_cache:
+        try:
+            index = get_search_index_client().get_index(target_index)
+            id_field = next((f for f in index.fields if f.name == "id"), None)
+            _id_sortable_cache[target_index] = bool(id_field and id_field.sortable)
+        except Exception as e:
+            logger.warning(f"⚠️ 인덱스 스키마 조회 실패 ({target_index}): {e}")
+            return False
+    return _id_sortable_cache[target_index]
+
+def list_documents_page(index_name: str = None, cursor: str = None, page_size: int = 50, select: list = None) -> dict:
+    """
+    인덱스 문서를 페이지 단위로 조회 (cursor 기반)
+
+    - id 필드가 sortable이면 keyset 방식 (id > 마지막 id) → 인덱스 크기와 무관하게 일정한 비용
+    - 아니면 skip 방식으로 대체 (Azure 제한으로 최대 100,000건까지 - 넘으면 truncated=True, next_cursor=None)
+
+    Args:
+        index_name: RAG 인덱스 이름 (None이면 기본 인덱스)
+        cursor: 이전 페이지 응답의 next_cursor (None이면 첫 페이지)
+        page_size: 페이지 크기 (최대 1000)
+        select: 가져올 필드 (None이면 LISTING_FIELDS)
+
+    Returns:
+        {"documents": [...], "next_cursor": str | None, "total": int | None(첫 페이지만),
+         "truncated": bool (skip 한도 때문에 더 읽을 수 없으면 True)}
+    """
+    page_size = max(1, min(page_size, 1000))
+    select = select or LISTING_FIELDS
+    if "id" not in select:
+        select = ["id"] + list(select)
+
+    state = _decode_cursor(cursor) if cursor else {}
+    search_client = get_search_client(index_name=index_name)
+
+    params = {
+        "search_text": "*",
+        "select": select,
+        "top": page_size,
+        "include_total_count": cursor is None,
+    }
+
+    keyset = state.get("mode", "keyset" if _is_id_sortable(index_name) else "skip") == "keyset"
+    if keyset:
+        params["order_by"] = ["id asc"]
+        if state.get("after") is not None:
+            after = state["after"].replace("'", "''")
+            params["filter"] = f"id gt '{after}'"
+    else:
+        skip = state.get("skip", 0)
+        if skip > MAX_SKIP:
+            return {"documents": [], "next_cursor": None, "total": None, "truncated": True}
+        params["skip"] = skip
+
+    results = search_client.search(**params)
+    documents = [dict(result) for result in results]
+    for doc in documents:
+        # 검색 메타 필드(@search.score 등)는 목록에 필요 없음
+        for key in [k for k in doc if k.startswith("@search")]:
+            del doc[key]
+
+    next_cursor = None
+    truncated = False
+    if len(documents) == page_size:
+        if keyset:
+            next_cursor = _encode_cursor({"mode": "keyset", "after": documents[-1]["id"]})
+        elif state.get("skip", 0) + page_size > MAX_SKIP:
+            # 다음 페이지는 skip 한도를 넘음 - 조용히 끝내지 않고 잘렸다고 알림
+            truncated = True
+            logger.warning(f"⚠️ 문서 목록이 skip 한도({MAX_SKIP})에서 잘림 - id 필드가 sortable이 아닌 인덱스 ({index_name or INDEX_NAME})")
+        else:
+            next_cursor = _encode_cursor({"mode": "skip", "skip": state.get("skip", 0) + page_size})
+
+    return {
+        "documents": documents,
+        "next_cursor": next_cursor,
+        "total": results.get_count() if cursor is None else None,
+        "truncated": truncated,
+    }
+
+def iter_documents(index_name: str = None, select: list = None, page_size: int = 1000):
+    """
+    인덱스 전체 문서를 페이지 단위로 순회하는 제너레이터 (메모리에는 한 페이지만 유지)
+    skip 한도 때문에 끝까지 읽을 수 없으면 읽은 데까지 yield한 뒤 DocumentListTruncated
+    """
+    cursor = None
+    while True:
+        page = list_documents_page(index_name=index_name, cursor=cursor, page_size=page_size, select=select)
+        for doc in page["documents"]:
+            yield doc
+        if page["truncated"]:
+            raise DocumentListTruncated(f"Listing stopped at the {MAX_SKIP}-document skip limit")
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+def get_document_by_id(doc_id: str, index_name: str = None, select: list = None) -> dict:
+    """문서 한 건 조회 (content 포함, content_vector 제외, 없으면 None)"""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    search_client = get_search_client(index_name=index_name)
+    try:
+        doc = search_client.get_document(key=doc_id, selected_fields=select)
+    except ResourceNotFoundError:
+        return None
+    doc = dict(doc)
+    doc.pop("content_vector", None)
+    return doc
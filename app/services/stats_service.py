@@ -0,0 +1,145 @@
+# 인덱스 통계 서비스
+# 대시보드 새로고침마다 Azure AI Search에 쿼리하지 않도록 인덱스별 문서 수/패싯을 TTL 캐시로 유지하고,
+# index_processed_chunks가 문서를 쓸 때마다 캐시를 증분 갱신함
+
+from time import time
+import logging
+import threading
+
+from app.config import AZURE_SEARCH_INDEX_NAME, STATS_CACHE_TTL, INDEX_LIST_CACHE_TTL
+from app.services.search_service import get_search_client, get_search_index_client
+
+logger = logging.getLogger(__name__)
+
+FACET_FIELDS = ["paraCategory", "fileType", "tags", "language"]
+FACET_SIZE = 50  # 필드별 상위 패싯 값 개수
+
+_stats_cache = {}  # {index_name: {"count": int, "facets": {field: {value: count}}, "fetched_at": float}}
+_index_list_cache = {"indexes": None, "fetched_at": 0.0}
+_lock = threading.Lock()
+
+
+def _fetch_index_stats(index_name: str) -> dict:
+    """문서 수 + 모든 패싯을 한 번의 쿼리로 조회"""
+    search_client = get_search_client(index_name=index_name)
+    results = search_client.search(
+        search_text="*",
+        include_total_count=True,
+        facets=[f"{field},count:{FACET_SIZE}" for field in FACET_FIELDS],
+        top=0
+    )
+
+    facets = {}
+    for field, buckets in (results.get_facets() or {}).items():
+        facets[field] = {str(b["value"]): b["count"] for b in buckets}
+
+    return {
+        "count": results.get_count() or 0,
+        "facets": {field: facets.get(field, {}) for field in FACET_FIELDS},
+        "fetched_at": time(),
+    }
+
+
+def get_index_stats(index_name: str = None, force: bool = False) -> dict:
+    """
+    인덱스 통계 조회 (TTL 캐시)
+
+    Args:
+        index_name: RAG 인덱스 이름 (None이면 기본 인덱스)
+        force: True면 캐시를 무시하고 다시 조회
+
+    Returns:
+        {"count": int, "facets": {...}, "fetched_at": float, "cached": bool}
+    """
+    target_index = index_name or AZURE_SEARCH_INDEX_NAME
+
+    with _lock:
+        entry = _stats_cache.get(target_index)
+        if entry and not force and time() - entry["fetched_at"] < STATS_CACHE_TTL:
+            return dict(entry, facets={f: dict(v) for f, v in entry["facets"].items()}, cached=True)
+
+    entry = _fetch_index_stats(target_index)
+    with _lock:
+        _stats_cache[target_index] = entry
+    logger.info(f"📊 인덱스 '{target_index}' 통계 갱신: {entry['count']}개 문서")
+    return dict(entry, cached=False)
+
+
+def record_indexed(index_name: str, documents: list, all_new: bool = True):
+    """
+    인덱싱된 문서를 통계 캐시에 반영
+    (캐시가 없는 인덱스는 다음 조회 때 전체 계산하므로 무시)
+
+    Args:
+        all_new: documents가 모두 인덱스에 없던 id인지 (기존 청크와 비교한 경우).
+            False면 merge_or_upload가 기존 문서를 덮어썼을 수 있어 증분을 알 수 없으므로 캐시 무효화
+    """
+    target_index = index_name or AZURE_SEARCH_INDEX_NAME
+    if all_new:
+        _apply_delta(target_index, documents, +1)
+    else:
+        invalidate_stats(target_index)
+
+    # 처음 보는 인덱스면 인덱스 목록 캐시 무효화 (새 인덱스가 생성되었을 수 있음)
+    with _lock:
+        indexes = _index_list_cache["indexes"]
+        if indexes is not None and target_index not in {idx["name"] for idx in indexes}:
+            _index_list_cache["indexes"] = None
+
+
+def record_deleted(index_name: str, documents: list):
+    """삭제된 문서를 통계 캐시에 증분 반영 (documents에는 패싯 필드가 포함되어 있어야 함)"""
+    _apply_delta(index_name or AZURE_SEARCH_INDEX_NAME, documents, -1)
+
+
+def _apply_delta(target_index: str, documents: list, sign: int):
+    with _lock:
+        entry = _stats_cache.get(target_index)
+        if not entry:
+            return
+        entry["count"] = max(0, entry["count"] + sign * len(documents))
+        for doc in documents:
+            for field in FACET_FIELDS:
+                values = doc.get(field)
+                if values is None or values == "":
+                    continue
+                if not isinstance(values, list):
+                    values = [values]
+                buckets = entry["facets"].setdefault(field, {})
+                for value in values:
+                    value = str(value)
+                    buckets[value] = max(0, buckets.get(value, 0) + sign)
+                    if buckets[value] == 0:
+                        del buckets[value]
+
+
+def invalidate_stats(index_name: str = None):
+    """통계 캐시 무효화 (index_name이 None이면 전체)"""
+    with _lock:
+        if index_name is None:
+            _stats_cache.clear()
+        else:
+            _stats_cache.pop(index_name, None)
+
+
+def list_indexes_cached(force: bool = False) -> list:
+    """사용 가능한 인덱스 목록 (TTL 캐시) - [{"name": str, "fields_count": int}, ...]"""
+    with _lock:
+        indexes = _index_list_cache["indexes"]
+        if indexes is not None and not force and time() - _index_list_cache["fetched_at"] < INDEX_LIST_CACHE_TTL:
+            return list(indexes)
+
+    try:
+        index_client = get_search_index_client()
+        indexes = [
+            {"name": index.name, "fields_count": len(index.fields) if index.fields else 0}
+            for index in index_client.list_indexes()
+        ]
+    except Exception as e:
+        logger.exception(f"❌ Index list error: {e}")
+        raise
+
+    with _lock:
+        _index_list_cache["indexes"] = indexes
+        _index_list_cache["fetched_at"] = time()
+    return list(indexes)
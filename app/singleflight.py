@@ -0,0 +1,127 @@
+# 단일 실행(single-flight) 병합
+# 같은 키의 작업이 동시에 여러 번 요청되면 하나만 실행하고, 나머지는 그 실행에 붙어서 결과를 함께 받음.
+# 결과를 캐시하지는 않음 - 실행 중인 동안만 합치고, 끝나면 다음 요청은 새로 실행.
+#
+# - SingleFlight:  동기 함수 호출 병합 (예: 같은 텍스트에 대한 Gemini 분석)
+# - InflightTasks: 백그라운드 작업 병합 (예: 더블클릭/공유 폴더로 같은 파일이 연달아 업로드됨
+#                  → 나중 task_id를 먼저 시작한 작업에 연결해서 같은 진행 상황을 보여줌)
+
+import logging
+import threading
+
+from app.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+coalesced_total = register(Counter(
+    "singleflight_coalesced_total", "Requests that joined an identical in-flight execution", ("flight",)
+))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    사용법:
+    result, shared = analysis_flight.do(key, analyze_text_for_search, text, file_name)
+    shared=True면 다른 호출과 같은 객체를 받은 것 → 수정하려면 복사해서 사용
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs) -> tuple:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            coalesced_total.inc(flight=self.name)
+            logger.info(f"🔗 [{self.name}] Joined in-flight call")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class InflightTasks:
+    """
+    실행 중인 백그라운드 작업 (키 → 먼저 시작한 task_id)
+    같은 키로 들어온 task는 새로 실행하지 않고 먼저 시작한 작업(leader)의 구성원으로 붙음.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._leaders = {}  # key → leader task_id
+        self._keys = {}  # leader task_id → key
+        self._members = {}  # leader task_id → {task_id: user}
+        self._lock = threading.Lock()
+
+    def join(self, key, task_id: str, user: str):
+        """진행 중인 같은 작업이 있으면 그 leader task_id 반환, 없으면 task_id를 leader로 등록하고 None"""
+        with self._lock:
+            leader = self._leaders.get(key)
+            if leader is None:
+                self._leaders[key] = task_id
+                self._keys[task_id] = key
+                self._members[task_id] = {task_id: user}
+                return None
+            self._members[leader][task_id] = user
+        coalesced_total.inc(flight=self.name)
+        return leader
+
+    def owner_of(self, task_id: str):
+        with self._lock:
+            for members in self._members.values():
+                if task_id in members:
+                    return members[task_id]
+        return None
+
+    def leave(self, task_id: str) -> bool:
+        """
+        task 하나만 작업에서 분리 (같은 작업을 기다리는 다른 task가 남아 있으면 True)
+        마지막 구성원이면 분리하지 않고 False → 호출자가 실제 작업을 취소
+        """
+        with self._lock:
+            for members in self._members.values():
+                if task_id in members:
+                    if len(members) == 1:
+                        return False
+                    del members[task_id]
+                    return True
+        return False
+
+    def finish(self, leader_task_id: str):
+        """작업 종료 (완료/실패/취소) - 이후 같은 키는 새로 실행"""
+        with self._lock:
+            key = self._keys.pop(leader_task_id, None)
+            if key is not None:
+                self._leaders.pop(key, None)
+            self._members.pop(leader_task_id, None)
+
+
+# 전역 인스턴스
+ingest_inflight = InflightTasks("upload")
+analysis_flight = SingleFlight("analyze_text_for_search")
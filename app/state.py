@@ -1,16 +1,28 @@
 # 간단한 인메모리 상태 저장소
 # 실무에서는 Redis 등을 사용하지만 MVP에서는 메모리로 충분함
 
+# 더 이상 바뀌지 않는 작업 상태
+TERMINAL_STATUSES = {"completed", "completed_with_warning", "failed", "cancelled"}
+
+
+class TaskCancelled(Exception):
+    """사용자가 취소를 요청한 작업 - 파이프라인 단계 경계에서 raise_if_cancelled()가 발생시킴"""
+
+
 class TaskManager:
     def __init__(self):
         self.tasks = {}
+        self.cancel_requested = set()
+        self.aliases = {}  # task_id → 실제로 실행 중인 task_id (같은 파일 중복 업로드 병합)
+        self.detached = {}  # 병합된 작업에서 분리된 task의 마지막 상태 (작업 자체는 계속 진행)
 
     def create_task(self, task_id: str):
         self.tasks[task_id] = {
             "status": "pending",
             "progress": 0,
             "message": "Initializing...",
-            "details": []
+            "details": [],
+            "stages": []
         }
 
     def update_task(self, task_id: str, status: str = None, progress: int = None, message: str = None):
@@ -22,12 +34,62 @@ class TaskManager:
             if message:
                 self.tasks[task_id]["message"] = message
 
+    def set_item_status(self, task_id: str, item_id: str, status: str, error: str = None):
+        """청크(문서) 단위 처리 결과 기록 - status: indexed | failed"""
+        if task_id in self.tasks:
+            item = {"status": status}
+            if error:
+                item["error"] = error
+            self.tasks[task_id].setdefault("items", {})[item_id] = item
+
+    def add_stage(self, task_id: str, span: dict):
+        """파이프라인 단계별 소요 시간 기록 (app.metrics.stage_span에서 호출)"""
+        if task_id in self.tasks:
+            self.tasks[task_id].setdefault("stages", []).append(span)
+
     def add_detail(self, task_id: str, detail: str):
         if task_id in self.tasks:
             self.tasks[task_id]["details"].append(detail)
 
     def get_task(self, task_id: str):
-        return self.tasks.get(task_id, None)
+        if task_id in self.detached:
+            return self.detached[task_id]
+        return self.tasks.get(self.resolve(task_id), None)
+
+    # ===== 병합 (app.singleflight) =====
+
+    def alias(self, task_id: str, target_task_id: str):
+        """task_id를 이미 실행 중인 target_task_id 작업에 연결 (같은 상태/진행률을 보여줌)"""
+        self.aliases[task_id] = target_task_id
+
+    def resolve(self, task_id: str) -> str:
+        return self.aliases.get(task_id, task_id)
+
+    def detach(self, task_id: str, status: str, message: str):
+        """병합된 작업에서 task_id만 분리 (현재 상태를 복사해서 고정, 실제 작업은 계속)"""
+        snapshot = dict(self.get_task(task_id) or {})
+        snapshot.update(status=status, message=message)
+        self.detached[task_id] = snapshot
+        self.aliases.pop(task_id, None)
+
+    # ===== 취소 =====
+
+    def request_cancel(self, task_id: str):
+        """실행 중인 작업에 취소 요청 (작업이 다음 단계 경계에서 정리 후 cancelled로 변경)"""
+        if task_id in self.tasks:
+            self.cancel_requested.add(task_id)
+            self.update_task(task_id, status="cancelling", message="Cancellation requested...")
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        return task_id in self.cancel_requested
+
+    def raise_if_cancelled(self, task_id: str):
+        if task_id in self.cancel_requested:
+            raise TaskCancelled(task_id)
+
+    def mark_cancelled(self, task_id: str, message: str = "Cancelled by user"):
+        self.cancel_requested.discard(task_id)
+        self.update_task(task_id, status="cancelled", message=message)
 
 # 전역 인스턴스
 task_manager = TaskManager()
\ No newline at end of file
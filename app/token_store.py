@@ -0,0 +1,278 @@
+# 토큰 저장소 - 발급한 CSRF / Refresh Token을 만료 시간(TTL)과 함께 보관
+# 모듈 전역 dict 대신 사용. 만료된 토큰은 조회 시점이 아니라 백그라운드에서 정리됨.
+#
+# 백엔드 (TOKEN_STORE_BACKEND):
+# - memory: 프로세스 내부 dict + 만료 시간 힙 (단일 워커용, 기본값). 최대 개수 초과 시 만료가 가장 가까운 토큰부터 제거
+# - sqlite: 같은 호스트의 여러 uvicorn 워커가 하나의 DB 파일로 공유
+# - redis:  여러 호스트에서 공유 (redis 패키지 필요, 만료는 Redis TTL 사용)
+#
+# 토큰 원문 대신 SHA-256 해시를 키로 저장 (DB/메모리 덤프에 토큰이 그대로 남지 않도록)
+
+import logging
+import hashlib
+from abc import ABC, abstractmethod
+import heapq
+import json
+import sqlite3
+import threading
+from time import time, sleep
+
+from app.config import (
+    TOKEN_STORE_BACKEND,
+    TOKEN_STORE_SQLITE_PATH,
+    TOKEN_STORE_REDIS_URL,
+    TOKEN_STORE_MAX_ENTRIES,
+    TOKEN_STORE_SWEEP_INTERVAL,
+)
+from app.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+evicted_total = register(Counter(
+    "token_store_evicted_total", "Tokens evicted before expiry because the store reached max entries", ("backend",)
+))
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenStore(ABC):
+    """
+    토큰 저장소 공통 인터페이스 (put / get / delete는 백엔드마다 구현 필수)
+
+    사용법:
+    token_store.put("csrf", token, {"email": email}, ttl=1800)
+    data = token_store.get("csrf", token)  # 없거나 만료되면 None
+    token_store.delete("csrf", token)
+    """
+
+    backend = ""
+    sweep_interval = TOKEN_STORE_SWEEP_INTERVAL
+    _sweeper = None
+    _full = False  # 가득 찬 상태 경고를 이미 남겼는지 (제한 아래로 내려가면 다시 경고)
+
+    @abstractmethod
+    def put(self, namespace: str, token: str, data: dict, ttl: float):
+        ...
+
+    @abstractmethod
+    def get(self, namespace: str, token: str):
+        ...
+
+    @abstractmethod
+    def delete(self, namespace: str, token: str):
+        ...
+
+    def sweep(self) -> int:
+        """만료된 토큰 제거 (제거한 개수 반환)"""
+        return 0
+
+    def _record_eviction(self, count: int):
+        # 가득 찬 동안은 put마다 제거가 일어나므로 경고는 가득 찬 시점에 한 번만, 나머지는 DEBUG + 카운터
+        evicted_total.inc(count, backend=self.backend)
+        if not self._full:
+            self._full = True
+            logger.warning(f"⚠️ TokenStore full ({self.max_entries}) - evicting tokens closest to expiry")
+        logger.debug(f"[TokenStore] Evicted {count} tokens")
+
+    def _record_size(self, size: int):
+        if self._full and size < self.max_entries:
+            self._full = False
+            logger.info(f"[TokenStore] Below limit again ({size}/{self.max_entries})")
+
+    def start_sweeper(self):
+        if self._sweeper is not None:
+            return
+
+        def run():
+            while True:
+                sleep(self.sweep_interval)
+                try:
+                    removed = self.sweep()
+                    if removed:
+                        logger.info(f"[TokenStore] Swept {removed} expired tokens")
+                except Exception as e:
+                    logger.warning(f"⚠️ TokenStore sweep failed: {e}")
+
+        self._sweeper = threading.Thread(target=run, name="token-store-sweeper", daemon=True)
+        self._sweeper.start()
+
+
+class MemoryTokenStore(TokenStore):
+    """프로세스 내부 저장소 (만료 시간 힙으로 만료 토큰만 골라서 정리)"""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = TOKEN_STORE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}  # {(namespace, key): (expires_at, data)}
+        self._heap = []  # [(expires_at, namespace, key)] - 삭제/덮어쓴 항목은 정리 시 건너뜀
+        self._lock = threading.Lock()
+
+    def put(self, namespace: str, token: str, data: dict, ttl: float):
+        expires_at = time() + ttl
+        entry_key = (namespace, _token_key(token))
+        with self._lock:
+            self._entries[entry_key] = (expires_at, data)
+            heapq.heappush(self._heap, (expires_at, *entry_key))
+            if len(self._entries) > self.max_entries:
+                self._evict(len(self._entries) - self.max_entries)
+            elif len(self._heap) > 2 * len(self._entries) + 1024:
+                self._compact()
+
+    def get(self, namespace: str, token: str):
+        entry = self._entries.get((namespace, _token_key(token)))
+        if entry is None or entry[0] <= time():
+            return None
+        return entry[1]
+
+    def delete(self, namespace: str, token: str):
+        with self._lock:
+            self._entries.pop((namespace, _token_key(token)), None)
+
+    def _pop_heap(self):
+        """힙에서 유효한(삭제/덮어쓰지 않은) 가장 이른 만료 항목 하나 꺼냄"""
+        while self._heap:
+            expires_at, namespace, key = heapq.heappop(self._heap)
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] == expires_at:
+                return expires_at, (namespace, key)
+        return None
+
+    def _evict(self, count: int):
+        # 크기 제한 초과: 만료가 가장 가까운 토큰부터 제거
+        for _ in range(count):
+            popped = self._pop_heap()
+            if popped is None:
+                break
+            del self._entries[popped[1]]
+        self._record_eviction(count)
+
+    def _compact(self):
+        self._heap = [(expires_at, *entry_key) for entry_key, (expires_at, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def sweep(self) -> int:
+        now = time()
+        removed = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, namespace, key = heapq.heappop(self._heap)
+                entry = self._entries.get((namespace, key))
+                if entry is not None and entry[0] == expires_at:
+                    del self._entries[(namespace, key)]
+                    removed += 1
+            self._record_size(len(self._entries))
+        return removed
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteTokenStore(TokenStore):
+    """여러 워커 프로세스가 공유하는 저장소 (같은 호스트의 SQLite 파일)"""
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = TOKEN_STORE_SQLITE_PATH, max_entries: int = TOKEN_STORE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            " namespace TEXT, key TEXT, data TEXT, expires_at REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tokens_expires_at ON tokens (expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, namespace: str, token: str, data: dict, ttl: float):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO tokens (namespace, key, data, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, _token_key(token), json.dumps(data, ensure_ascii=False, default=str), time() + ttl)
+        )
+
+    def get(self, namespace: str, token: str):
+        row = self._connect().execute(
+            "SELECT data FROM tokens WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, _token_key(token), time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, namespace: str, token: str):
+        self._connect().execute(
+            "DELETE FROM tokens WHERE namespace = ? AND key = ?", (namespace, _token_key(token))
+        )
+
+    def sweep(self) -> int:
+        conn = self._connect()
+        removed = conn.execute("DELETE FROM tokens WHERE expires_at <= ?", (time(),)).rowcount
+
+        # 크기 제한 초과: 만료가 가장 가까운 토큰부터 제거
+        count = conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+        if count > self.max_entries:
+            overflow = count - self.max_entries
+            conn.execute(
+                "DELETE FROM tokens WHERE rowid IN (SELECT rowid FROM tokens ORDER BY expires_at LIMIT ?)",
+                (overflow,)
+            )
+            self._record_eviction(overflow)
+            removed += overflow
+        else:
+            self._record_size(count)
+        return removed
+
+
+class RedisTokenStore(TokenStore):
+    """Redis 호환 서버 공유 저장소 (만료는 서버 TTL이 처리하므로 sweep 불필요)"""
+
+    backend = "redis"
+
+    def __init__(self, url: str = TOKEN_STORE_REDIS_URL):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def _key(self, namespace: str, token: str) -> str:
+        return f"token:{namespace}:{_token_key(token)}"
+
+    def put(self, namespace: str, token: str, data: dict, ttl: float):
+        self._client.set(
+            self._key(namespace, token),
+            json.dumps(data, ensure_ascii=False, default=str),
+            px=max(1, int(ttl * 1000))
+        )
+
+    def get(self, namespace: str, token: str):
+        value = self._client.get(self._key(namespace, token))
+        return json.loads(value) if value else None
+
+    def delete(self, namespace: str, token: str):
+        self._client.delete(self._key(namespace, token))
+
+    def start_sweeper(self):
+        pass
+
+
+def create_token_store() -> TokenStore:
+    if TOKEN_STORE_BACKEND == "sqlite":
+        logger.info(f"✅ TokenStore backend: sqlite ({TOKEN_STORE_SQLITE_PATH})")
+        return SQLiteTokenStore()
+    if TOKEN_STORE_BACKEND == "redis":
+        logger.info(f"✅ TokenStore backend: redis")
+        return RedisTokenStore()
+    return MemoryTokenStore()
+
+
+# 전역 인스턴스 (sweeper는 main.py에서 시작)
+token_store = create_token_store()
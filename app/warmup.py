@@ -0,0 +1,137 @@
+# 시작 시 워밍업 (lifespan에서 백그라운드로 실행)
+# 첫 요청이 클라이언트 생성 / TLS 핸드셰이크 / 인덱스 확인 / 시크릿 조회 비용을 떠안지 않도록
+# 미리 클라이언트를 만들고 keep-alive 연결을 열어 두고 캐시를 채움.
+# 진행 상태는 /api/ready로 노출 (/api/health는 프로세스 생존 여부만)
+
+from concurrent.futures import ThreadPoolExecutor
+from time import time
+import logging
+import threading
+
+from app.config import (
+    AZURE_SEARCH_INDEX_NAME,
+    ENVIRONMENT,
+    WARMUP_ENABLED,
+    WARMUP_LLM,
+    preload_secrets,
+)
+
+logger = logging.getLogger(__name__)
+
+# 준비 상태 (checks: {이름: {"ok": bool, "seconds": float, "error": str}})
+readiness = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "checks": {},
+}
+_lock = threading.Lock()
+
+
+def _check(name: str, fn):
+    started = time()
+    try:
+        fn()
+        result = {"ok": True, "seconds": round(time() - started, 3)}
+    except Exception as e:
+        result = {"ok": False, "seconds": round(time() - started, 3), "error": str(e)}
+        logger.warning(f"⚠️ Warm-up [{name}] failed: {e}")
+    with _lock:
+        readiness["checks"][name] = result
+    return result
+
+
+def _warm_search():
+    from app.services.search_service import get_search_client, get_search_index_client
+
+    # 인덱스 존재 확인 (관리 클라이언트 연결) + 쿼리 클라이언트 연결
+    get_search_index_client().get_index(AZURE_SEARCH_INDEX_NAME)
+    get_search_client(index_name=AZURE_SEARCH_INDEX_NAME)
+
+
+def _warm_stats():
+    from app.services.stats_service import get_index_stats, list_indexes_cached
+
+    get_index_stats(AZURE_SEARCH_INDEX_NAME)
+    list_indexes_cached()
+
+
+def _warm_blob():
+    from app.services.blob_service import get_blob_client, get_container_name
+
+    blob_client = get_blob_client()
+    for kind in ("raw", "processed"):
+        container_name = get_container_name(None, kind)
+        if not blob_client.get_container_client(container_name).exists():
+            raise RuntimeError(f"Container not found: {container_name}")
+
+
+def _warm_openai():
+    from app.services.openai_service import get_embedding
+
+    # 가장 작은 임베딩 요청으로 TLS 연결을 열어둠
+    get_embedding("warm-up")
+
+
+def _warm_gemini():
+    from app.services.openai_service import get_google_client
+
+    get_google_client().models.list()
+
+
+def _warm_document_intelligence():
+    from app.services.document_service import get_document_client
+
+    get_document_client()
+
+
+def run_warmup() -> dict:
+    """모든 워밍업 작업을 병렬 실행 (동기 함수 - 스레드에서 호출)"""
+    with _lock:
+        readiness["ready"] = False
+        readiness["started_at"] = time()
+        readiness["finished_at"] = None
+        readiness["checks"] = {}
+
+    if not WARMUP_ENABLED:
+        logger.info("[Warm-up] Disabled")
+    else:
+        # 자격증명 토큰 / 시크릿을 먼저 (다른 클라이언트가 사용)
+        if ENVIRONMENT != "development":
+            _check("secrets", preload_secrets)
+
+        jobs = {
+            "search": _warm_search,
+            "stats": _warm_stats,
+            "blob": _warm_blob,
+            "document_intelligence": _warm_document_intelligence,
+        }
+        if WARMUP_LLM:
+            jobs["openai"] = _warm_openai
+            jobs["gemini"] = _warm_gemini
+
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            list(executor.map(lambda item: _check(*item), jobs.items()))
+
+    with _lock:
+        readiness["ready"] = True
+        readiness["finished_at"] = time()
+    failed = [name for name, check in readiness["checks"].items() if not check["ok"]]
+    elapsed = readiness["finished_at"] - readiness["started_at"]
+    if failed:
+        logger.warning(f"⚠️ Warm-up finished in {elapsed:.2f}s with failures: {', '.join(failed)}")
+    else:
+        logger.info(f"✅ Warm-up finished in {elapsed:.2f}s")
+    return readiness
+
+
+def get_readiness() -> dict:
+    with _lock:
+        return {
+            "ready": readiness["ready"],
+            # 실패한 워밍업이 있어도 ready=True (해당 기능은 첫 요청 시 다시 연결 시도) - ok로 구분
+            "ok": readiness["ready"] and all(check["ok"] for check in readiness["checks"].values()),
+            "started_at": readiness["started_at"],
+            "finished_at": readiness["finished_at"],
+            "checks": dict(readiness["checks"]),
+        }
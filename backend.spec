@@ -35,12 +35,29 @@ a = Analysis(
         'app.routers.upload',
         'app.routers.chat',
         'app.routers.auth',
+        'app.routers.admin',
+        'app.admission',
+        'app.ratelimit',
+        'app.token_store',
+        'app.warmup',
+        'app.metrics',
+        'app.logging_setup',
+        'app.ingest_scheduler',
+        'app.ingest_checkpoint',
+        'app.singleflight',
         'app.services',
         'app.services.search_service',
         'app.services.document_service',
         'app.services.openai_service',
         'app.services.blob_service',
         'app.services.prompts',
+        'app.services.chunk_spans',
+        'app.services.handover_service',
+        'app.services.stats_service',
+        'app.services.index_writer',
+        'app.services.reindex_service',
+        'app.services.llm_telemetry',
+        'app.services.model_router',
         'passlib',
         'passlib.context',
         'jose',
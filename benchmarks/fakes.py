@@ -0,0 +1,594 @@
+# 외부 의존성 대체용 in-process fake (Blob / AI Search / Document Intelligence / Azure OpenAI / Gemini)
+# 네트워크 없이 서비스 코드를 그대로 실행하기 위해 각 서비스 모듈의 싱글톤 클라이언트 자리에 fake를 넣음.
+# fake마다 지연(latency), 오류율(error_rate), 스로틀링(throttle_rate → 429)을 설정할 수 있음.
+#
+# 사용법:
+#   from benchmarks import fakes          # app 모듈보다 먼저 import (가짜 환경 변수 설정)
+#   env = fakes.install_fakes(fakes.FakeProfile(latency=0.02, throttle_rate=0.05))
+#   ...
+#   env.search.calls  # 호출 횟수 등
+
+import base64
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from time import sleep
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+# app.config는 import 시점에 환경 변수를 읽으므로 app보다 먼저 설정해야 함
+_FAKE_ENV = {
+    "ENVIRONMENT": "development",
+    "AZURE_STORAGE_ACCOUNT_NAME": "fakeaccount",
+    "AZURE_STORAGE_ACCOUNT_KEY": base64.b64encode(b"fake-storage-key").decode(),
+    "AZURE_OPENAI_ENDPOINT": "https://fake-openai.local",
+    "AZURE_OPENAI_API_KEY": "fake",
+    "AZURE_SEARCH_ENDPOINT": "https://fake-search.local",
+    "AZURE_SEARCH_SERVICE_ENDPOINT": "https://fake-search.local",
+    "AZURE_SEARCH_KEY": "fake",
+    "AZURE_SEARCH_ADMIN_KEY": "fake",
+    "AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT": "https://fake-di.local",
+    "AZURE_DOCUMENT_INTELLIGENCE_KEY": "fake",
+    "GOOGLE_API_KEY": "fake",
+    "WARMUP_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    "LOG_LEVEL": "WARNING",
+    "INGEST_CHECKPOINT_PATH": os.path.join(tempfile.gettempdir(), f"bench_ingest_checkpoints_{os.getpid()}.db"),
+}
+for _key, _value in _FAKE_ENV.items():
+    os.environ.setdefault(_key, _value)
+
+EMBEDDING_DIMENSIONS = 3072
+
+
+@dataclass
+class FakeProfile:
+    """fake 서비스 동작 설정 (지연은 초 단위, 비율은 0~1)"""
+    latency: float = 0.0  # 호출당 기본 지연
+    jitter: float = 0.0  # 지연에 더할 최대 무작위 값
+    error_rate: float = 0.0  # 500 오류 비율
+    throttle_rate: float = 0.0  # 429 오류 비율
+    seed: int = None
+
+
+@dataclass
+class FakeProfiles:
+    """서비스별 설정 (지정하지 않은 서비스는 default 사용)"""
+    default: FakeProfile = field(default_factory=FakeProfile)
+    blob: FakeProfile = None
+    search: FakeProfile = None
+    document_intelligence: FakeProfile = None
+    openai: FakeProfile = None
+    gemini: FakeProfile = None
+
+    def get(self, name: str) -> FakeProfile:
+        return getattr(self, name) or self.default
+
+
+class FakeService:
+    """지연/오류/429 주입 공통 로직 + 호출 횟수 집계"""
+
+    def __init__(self, name: str, profile: FakeProfile):
+        self.name = name
+        self.profile = profile
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self._random = random.Random(profile.seed)
+        self._lock = threading.Lock()
+
+    def _rpc(self, operation: str):
+        """원격 호출 1회 흉내 (지연 후 확률적으로 429/500 발생)"""
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            delay = self.profile.latency + self._random.random() * self.profile.jitter
+        if delay:
+            sleep(delay)
+        if roll < self.profile.throttle_rate:
+            with self._lock:
+                self.throttled += 1
+            raise self._error(429, f"[fake {self.name}] {operation} throttled")
+        if roll < self.profile.throttle_rate + self.profile.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise self._error(500, f"[fake {self.name}] {operation} failed")
+
+    def _error(self, status_code: int, message: str) -> Exception:
+        from azure.core.exceptions import HttpResponseError
+
+        error = HttpResponseError(message=message)
+        error.status_code = status_code
+        return error
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "errors": self.errors, "throttled": self.throttled}
+
+
+def _not_found(message: str):
+    from azure.core.exceptions import ResourceNotFoundError
+
+    return ResourceNotFoundError(message=message)
+
+
+# ===== Blob Storage =====
+
+class _FakeBlob:
+    def __init__(self, service, container, name):
+        self._service = service
+        self._container = container
+        self.name = name
+        self.url = f"https://fakeaccount.blob.core.windows.net/{container.name}/{name}"
+
+    def upload_blob(self, data, overwrite=False, metadata=None):
+        self._service._rpc("upload_blob")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._container.blobs[self.name] = bytes(data)
+        self._container.properties[self.name] = {
+            "metadata": dict(metadata or {}), "last_modified": next(self._service.clock)
+        }
+
+    def download_blob(self):
+        self._service._rpc("download_blob")
+        if self.name not in self._container.blobs:
+            raise _not_found(f"Blob not found: {self.name}")
+        data = self._container.blobs[self.name]
+        return SimpleNamespace(readall=lambda: data)
+
+    def delete_blob(self):
+        self._service._rpc("delete_blob")
+        self._container.properties.pop(self.name, None)
+        if self._container.blobs.pop(self.name, None) is None:
+            raise _not_found(f"Blob not found: {self.name}")
+
+
+class _FakeContainer:
+    def __init__(self, service, name):
+        self._service = service
+        self.name = name
+        self.created = False
+        self.blobs = {}
+        self.properties = {}  # Blob 이름 → {"metadata", "last_modified"}
+
+    def exists(self):
+        self._service._rpc("exists")
+        return self.created
+
+    def create_container(self):
+        self._service._rpc("create_container")
+        self.created = True
+
+    def get_blob_client(self, name):
+        return _FakeBlob(self._service, self, name)
+
+    def list_blobs(self, name_starts_with=None, include=None):
+        self._service._rpc("list_blobs")
+        return [
+            SimpleNamespace(
+                name=name, size=len(data),
+                last_modified=self.properties.get(name, {}).get("last_modified"),
+                metadata=self.properties.get(name, {}).get("metadata") if include and "metadata" in include else None,
+            )
+            for name, data in sorted(self.blobs.items())
+            if not name_starts_with or name.startswith(name_starts_with)
+        ]
+
+
+class FakeBlobService(FakeService):
+    """BlobServiceClient 대체"""
+
+    def __init__(self, profile: FakeProfile):
+        super().__init__("blob", profile)
+        self.containers = {}
+        self.clock = itertools.count(1)  # last_modified 대신 쓰는 증가 값 (업로드 순서)
+
+    def get_container_client(self, name):
+        with self._lock:
+            if name not in self.containers:
+                self.containers[name] = _FakeContainer(self, name)
+            return self.containers[name]
+
+    def read_url(self, url: str) -> bytes:
+        """SAS URL → 저장된 Blob 내용 (Document Intelligence fake가 사용)"""
+        path = urlparse(url).path.lstrip("/")
+        container_name, blob_name = path.split("/", 1)
+        return self.get_container_client(container_name).blobs[blob_name]
+
+
+# ===== AI Search =====
+
+class FakeSearchResults(list):
+    def __init__(self, items, count, facets):
+        super().__init__(items)
+        self._count = count
+        self._facets = facets
+
+    def get_count(self):
+        return self._count
+
+    def get_facets(self):
+        return self._facets
+
+
+def _literal(value: str) -> str:
+    return value.replace("''", "'")
+
+
+_COMPARISON = re.compile(r"^(\w+) (eq|gt|ge|lt|le|ne) '((?:[^']|'')*)'$")
+_ANY_IN = re.compile(r"^(\w+)/any\(\w+: search\.in\(\w+, '((?:[^']|'')*)', '(.)'\)\)$")
+
+
+def _compile_filter(expression: str):
+    """OData 필터 중 서비스 코드가 쓰는 형태만 지원 (eq/gt/... , collection/any(search.in), and/or)"""
+    if not expression:
+        return lambda doc: True
+
+    def clause(text):
+        text = text.strip()
+        match = _COMPARISON.match(text)
+        if match:
+            name, op, value = match.group(1), match.group(2), _literal(match.group(3))
+            compare = {
+                "eq": lambda a: a == value, "ne": lambda a: a != value,
+                "gt": lambda a: a is not None and a > value, "ge": lambda a: a is not None and a >= value,
+                "lt": lambda a: a is not None and a < value, "le": lambda a: a is not None and a <= value,
+            }[op]
+            return lambda doc: compare(doc.get(name))
+        match = _ANY_IN.match(text)
+        if match:
+            name, values = match.group(1), set(_literal(match.group(2)).split(match.group(3)))
+            return lambda doc: bool(values.intersection(doc.get(name) or []))
+        raise ValueError(f"[fake search] Unsupported filter: {text}")
+
+    groups = [[clause(part) for part in group.split(" and ")] for group in expression.split(" or ")]
+    return lambda doc: any(all(check(doc) for check in group) for group in groups)
+
+
+def _cosine(a, b) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class FakeSearchIndex:
+    """인덱스 하나 (문서 dict 저장) - SearchClient 대체"""
+
+    def __init__(self, service, name):
+        self._service = service
+        self.name = name
+        self.documents = {}
+        self.document_throttle_rate = service.document_throttle_rate
+
+    def _write(self, documents, action):
+        self._service._rpc(action)
+        from azure.search.documents.models import IndexingResult
+
+        results = []
+        for document in documents:
+            key = document["id"]
+            if self._service._random.random() < self.document_throttle_rate:
+                results.append(IndexingResult(key=key, succeeded=False, status_code=429, error_message="throttled"))
+                continue
+            if action == "delete":
+                self.documents.pop(key, None)
+            elif action == "merge_or_upload" and key in self.documents:
+                self.documents[key] = {**self.documents[key], **document}
+            else:
+                self.documents[key] = dict(document)
+            results.append(IndexingResult(key=key, succeeded=True, status_code=200))
+        return results
+
+    def upload_documents(self, documents):
+        return self._write(documents, "upload")
+
+    def merge_or_upload_documents(self, documents):
+        return self._write(documents, "merge_or_upload")
+
+    def delete_documents(self, documents):
+        return self._write(documents, "delete")
+
+    def get_document(self, key, selected_fields=None):
+        self._service._rpc("get_document")
+        if key not in self.documents:
+            raise _not_found(f"Document not found: {key}")
+        document = self.documents[key]
+        return {k: document.get(k) for k in selected_fields} if selected_fields else dict(document)
+
+    def get_document_count(self):
+        self._service._rpc("count")
+        return len(self.documents)
+
+    def search(self, search_text=None, filter=None, select=None, top=None, skip=None, order_by=None,
+               include_total_count=False, facets=None, vector_queries=None, **kwargs):
+        self._service._rpc("search")
+        predicate = _compile_filter(filter)
+        candidates = [doc for doc in self.documents.values() if predicate(doc)]
+
+        if vector_queries:
+            vector = vector_queries[0].vector
+            scored = [(_cosine(vector, doc.get("content_vector") or []), doc) for doc in candidates]
+        elif search_text and search_text != "*":
+            terms = set(search_text.lower().split())
+            scored = [(len(terms.intersection(str(doc.get("content", "")).lower().split())), doc) for doc in candidates]
+        else:
+            scored = [(1.0, doc) for doc in candidates]
+
+        if order_by:
+            for clause in reversed(order_by):
+                name, _, direction = clause.partition(" ")
+                scored.sort(key=lambda pair: pair[1].get(name) or "", reverse=direction == "desc")
+        else:
+            scored.sort(key=lambda pair: pair[0], reverse=True)
+
+        facet_results = {}
+        for spec in facets or []:
+            name = spec.split(",")[0]
+            counts = {}
+            for doc in candidates:
+                values = doc.get(name)
+                for value in values if isinstance(values, list) else [values]:
+                    if value is not None:
+                        counts[value] = counts.get(value, 0) + 1
+            facet_results[name] = [{"value": v, "count": c} for v, c in sorted(counts.items(), key=lambda kv: -kv[1])]
+
+        start = skip or 0
+        page = scored[start:start + top] if top is not None else scored[start:]
+        items = []
+        for score, doc in page:
+            item = {k: doc.get(k) for k in select} if select else {k: v for k, v in doc.items() if k != "content_vector"}
+            item["@search.score"] = score
+            items.append(item)
+        return FakeSearchResults(items, len(candidates) if include_total_count else None, facet_results)
+
+
+class _FakeSearchClients(dict):
+    """search_service._search_clients 자리에 들어가는 dict - 처음 조회하는 인덱스는 fake로 생성"""
+
+    def __init__(self, service):
+        super().__init__()
+        self._service = service
+
+    def get(self, index_name, default=None):
+        return self.setdefault(index_name, self._service.index(index_name))
+
+
+class FakeSearchService(FakeService):
+    """SearchIndexClient 대체 + 인덱스별 FakeSearchIndex 보관"""
+
+    def __init__(self, profile: FakeProfile, document_throttle_rate: float = 0.0):
+        super().__init__("search", profile)
+        self.document_throttle_rate = document_throttle_rate
+        self.indexes = {}  # {name: FakeSearchIndex}
+        self.schemas = {}  # {name: SearchIndex}
+
+    def index(self, name) -> FakeSearchIndex:
+        with self._lock:
+            if name not in self.indexes:
+                self.indexes[name] = FakeSearchIndex(self, name)
+            return self.indexes[name]
+
+    def get_index(self, name):
+        self._rpc("get_index")
+        if name not in self.schemas:
+            raise _not_found(f"Index not found: {name}")
+        return self.schemas[name]
+
+    def create_index(self, index):
+        self._rpc("create_index")
+        self.schemas[index.name] = index
+        self.index(index.name)
+        return index
+
+    def list_indexes(self):
+        self._rpc("list_indexes")
+        return list(self.schemas.values())
+
+
+# ===== Document Intelligence =====
+
+class FakeDocumentIntelligence(FakeService):
+    """DocumentAnalysisClient 대체 - Blob fake에 저장된 파일을 UTF-8 텍스트로 읽어 줄 단위로 반환"""
+
+    def __init__(self, profile: FakeProfile, blob: FakeBlobService):
+        super().__init__("document_intelligence", profile)
+        self._blob = blob
+
+    def begin_analyze_document_from_url(self, model_id, document_url):
+        self._rpc("analyze")
+        text = self._blob.read_url(document_url).decode("utf-8", errors="ignore")
+        lines = [SimpleNamespace(content=line) for line in text.splitlines()]
+        result = SimpleNamespace(pages=[SimpleNamespace(lines=lines)])
+        return SimpleNamespace(result=lambda: result)
+
+
+# ===== Azure OpenAI / Gemini (OpenAI 호환 클라이언트) =====
+
+def fake_embedding(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> list:
+    """텍스트 해시 기반 결정적 벡터 (같은 텍스트 → 같은 벡터)"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    return [rng.uniform(-1, 1) for _ in range(dimensions)]
+
+
+def _usage(prompt: str, completion: str):
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(completion) // 4)
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+    )
+
+
+def _fake_chunks(text: str, chunk_chars: int = 800) -> dict:
+    """전처리 프롬프트 응답 흉내 - 번호 붙은 입력 줄(L번호:)을 묶어 줄 범위 청크로 반환 (본문은 서비스가 채움)"""
+    body = text.split("[Input Text]", 1)[-1]
+    lines = [(int(m.group(1)), m.group(2)) for m in re.finditer(r"^L(\d+): (.*)$", body, re.M)]
+    spans, start, size = [], None, 0
+    for number, line in lines:
+        if start is not None and size + len(line) > chunk_chars:
+            spans.append((start, number - 1))
+            start, size = None, 0
+        start = number if start is None else start
+        size += len(line)
+    if start is not None:
+        spans.append((start, lines[-1][0]))
+
+    return {
+        "parentSummary": "fake parent summary",
+        "chunks": [
+            {
+                "startLine": first,
+                "endLine": last,
+                "chunkSummary": f"fake summary L{first}-L{last}",
+                "paraCategory": "overview" if i == 0 else "detail",
+                "fileType": "doc",
+                "tags": ["fake", f"part-{i % 3}"],
+                "relatedSection": ["overview"],
+                "language": "ko",
+            }
+            for i, (first, last) in enumerate(spans)
+        ],
+    }
+
+
+class _Completions:
+    def __init__(self, service):
+        self._service = service
+
+    def create(self, model=None, messages=None, response_format=None, stream=False, **kwargs):
+        self._service._rpc("chat.completions")
+        prompt = "\n".join(str(m.get("content", "")) for m in messages or [])
+        system = str(messages[0].get("content", "")) if messages else ""
+        user = str(messages[-1].get("content", "")) if messages else ""
+
+        if response_format and response_format.get("type") == "json_object":
+            section = re.search(r'지금은 인수인계서 전체 중 "(\w+)"', system)
+            if section:
+                content = json.dumps({section.group(1): {}}, ensure_ascii=False)
+            else:
+                content = json.dumps(_fake_chunks(user), ensure_ascii=False)
+        else:
+            content = f"[fake answer] {user[-200:]}"
+
+        self._service.completion_tokens += len(content) // 4
+        usage = _usage(prompt, content)
+        if stream:
+            pieces = [content[i:i + 40] for i in range(0, len(content), 40)]
+            return iter([
+                SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece), finish_reason=None)], usage=None)
+                for piece in pieces
+            ])
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content, role="assistant"), finish_reason="stop")],
+            usage=usage,
+        )
+
+
+class _Embeddings:
+    def __init__(self, service):
+        self._service = service
+
+    def create(self, input=None, model=None, dimensions=None, **kwargs):
+        self._service._rpc("embeddings")
+        texts = [input] if isinstance(input, str) else list(input)
+        return SimpleNamespace(
+            model=model,
+            data=[
+                SimpleNamespace(index=i, embedding=fake_embedding(text, dimensions or EMBEDDING_DIMENSIONS))
+                for i, text in enumerate(texts)
+            ],
+            usage=_usage(" ".join(texts), ""),
+        )
+
+
+class FakeOpenAI(FakeService):
+    """AzureOpenAI / OpenAI(Gemini 호환) 클라이언트 대체"""
+
+    def __init__(self, name: str, profile: FakeProfile):
+        super().__init__(name, profile)
+        self.completion_tokens = 0
+        self.chat = SimpleNamespace(completions=_Completions(self))
+        self.embeddings = _Embeddings(self)
+        self.models = SimpleNamespace(list=lambda: self._rpc("models.list") or [])
+
+    def _error(self, status_code: int, message: str) -> Exception:
+        import openai
+
+        response = SimpleNamespace(status_code=status_code, headers={}, request=None)
+        if status_code == 429:
+            return openai.RateLimitError(message, response=response, body=None)
+        return openai.InternalServerError(message, response=response, body=None)
+
+
+# ===== 설치 =====
+
+@dataclass
+class FakeEnvironment:
+    blob: FakeBlobService
+    search: FakeSearchService
+    document_intelligence: FakeDocumentIntelligence
+    openai: FakeOpenAI
+    gemini: FakeOpenAI
+
+    def stats(self) -> dict:
+        return {
+            name: service.stats()
+            for name, service in (
+                ("blob", self.blob),
+                ("search", self.search),
+                ("document_intelligence", self.document_intelligence),
+                ("openai", self.openai),
+                ("gemini", self.gemini),
+            )
+        }
+
+
+def install_fakes(profiles=None, document_throttle_rate: float = 0.0) -> FakeEnvironment:
+    """
+    서비스 모듈의 싱글톤 클라이언트를 fake로 교체하고 관련 캐시를 비움
+
+    Args:
+        profiles: FakeProfiles 또는 모든 서비스에 공통 적용할 FakeProfile
+        document_throttle_rate: 인덱싱 결과에서 문서 단위 429를 돌려줄 비율 (index_writer 재시도 경로)
+    """
+    from app.services import (
+        blob_service, document_service, handover_service, openai_service, search_service, stats_service
+    )
+
+    if profiles is None:
+        profiles = FakeProfiles()
+    elif isinstance(profiles, FakeProfile):
+        profiles = FakeProfiles(default=profiles)
+
+    blob = FakeBlobService(profiles.get("blob"))
+    env = FakeEnvironment(
+        blob=blob,
+        search=FakeSearchService(profiles.get("search"), document_throttle_rate=document_throttle_rate),
+        document_intelligence=FakeDocumentIntelligence(profiles.get("document_intelligence"), blob),
+        openai=FakeOpenAI("openai", profiles.get("openai")),
+        gemini=FakeOpenAI("gemini", profiles.get("gemini")),
+    )
+
+    blob_service._blob_client = env.blob
+    search_service._search_clients = _FakeSearchClients(env.search)
+    search_service._search_index_client = env.search
+    document_service._document_client = env.document_intelligence
+    openai_service._openai_client = env.openai
+    openai_service._google_client = env.gemini
+
+    search_service._id_sortable_cache.clear()
+    search_service._embedding_settings.clear()
+    handover_service.clear_section_cache()
+    stats_service._stats_cache.clear()
+    stats_service._index_list_cache.update({"indexes": None, "fetched_at": 0.0})
+    return env
@@ -0,0 +1,295 @@
+# HTTP 부하 테스트 (동시 사용자 수 단계별 측정)
+# 사용법:
+#   python -m benchmarks.loadtest                                  # fake 의존성으로 앱을 띄워서 측정
+#   python -m benchmarks.loadtest --concurrency 1,4,16,32 --duration 15 --latency 0.3
+#   python -m benchmarks.loadtest --url http://localhost:8000      # 이미 떠 있는 서버 대상 (fake 미사용)
+#
+# 가상 사용자마다: 로그인(/api/auth/login) → access/CSRF 토큰 획득 →
+# /api/chat, /api/upload, /api/upload/status/{task_id} 요청을 --mix 비율로 섞어서 반복.
+# 동시성 단계마다 엔드포인트별 p50/p95/p99 지연, 처리량, 오류율(429 별도)을 표와 JSON으로 출력.
+#
+# in-process 모드에서는 rate limit을 끄고 사용자당 admission 제한을 풀어둠 (테스트 계정이 3개뿐이라
+# 사용자당 제한이 동시성 자체를 막지 않도록). 환경 변수로 직접 지정하면 그 값을 사용.
+
+from benchmarks import fakes  # app보다 먼저 (가짜 환경 변수 설정)
+
+import argparse
+import json
+import os
+import random
+import socket
+import threading
+import uuid
+from datetime import datetime
+from time import perf_counter, sleep, time
+from urllib import request as urlrequest
+from urllib.error import HTTPError, URLError
+
+os.environ.setdefault("ADMISSION_CHAT_MAX_PER_USER", "1000")
+os.environ.setdefault("ADMISSION_ANALYZE_MAX_PER_USER", "1000")
+
+from benchmarks.run import RESULTS_DIR, sample_text, _git_commit  # noqa: E402
+
+TEST_ACCOUNTS = [
+    ("user1@company.com", "password123"),
+    ("user2@company.com", "password123"),
+    ("admin@company.com", "admin123"),
+]
+CHAT_QUESTIONS = [
+    "정산 배치 장애 시 어떻게 하나요?",
+    "주문 처리 배치는 언제 실행되나요?",
+    "재처리 스크립트 담당자는 누구인가요?",
+]
+
+
+# ===== HTTP =====
+
+def http(method: str, url: str, body: bytes = None, headers: dict = None, timeout: float = 120) -> tuple:
+    """요청 1회 → (status_code, 응답 본문 bytes, 경과 초)"""
+    req = urlrequest.Request(url, data=body, method=method, headers=headers or {})
+    started = perf_counter()
+    try:
+        with urlrequest.urlopen(req, timeout=timeout) as response:
+            data = response.read()
+            return response.status, data, perf_counter() - started
+    except HTTPError as e:
+        return e.code, e.read(), perf_counter() - started
+    except (URLError, OSError) as e:
+        return 0, str(e).encode(), perf_counter() - started
+
+
+def multipart(fields: dict, file_field: str, file_name: str, file_data: bytes) -> tuple:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode()
+        )
+    parts.append(
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"{file_field}\"; filename=\"{file_name}\"\r\n"
+        f"Content-Type: text/plain\r\n\r\n".encode() + file_data + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+# ===== 가상 사용자 =====
+
+class Recorder:
+    """엔드포인트별 (지연, 상태 코드) 기록"""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: str, status_code: int, elapsed: float):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append((elapsed, status_code))
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, base_url: str, account: tuple, mix: dict, deadline: float, recorder: Recorder,
+                 payload: bytes, seed: int):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.account = account
+        self.mix = mix
+        self.deadline = deadline
+        self.recorder = recorder
+        self.payload = payload
+        self.random = random.Random(seed)
+        self.headers = {}
+        self.task_ids = []
+
+    def login(self) -> bool:
+        email, password = self.account
+        status_code, data, elapsed = http(
+            "POST", f"{self.base_url}/api/auth/login",
+            json.dumps({"email": email, "password": password}).encode(),
+            {"Content-Type": "application/json"},
+        )
+        self.recorder.add("login", status_code, elapsed)
+        if status_code != 200:
+            return False
+        tokens = json.loads(data)
+        self.headers = {"Authorization": f"Bearer {tokens['access_token']}", "X-CSRF-Token": tokens["csrf_token"]}
+        return True
+
+    def chat(self):
+        body = {"messages": [{"role": "user", "content": self.random.choice(CHAT_QUESTIONS)}]}
+        status_code, _, elapsed = http(
+            "POST", f"{self.base_url}/api/chat", json.dumps(body).encode(),
+            {**self.headers, "Content-Type": "application/json"},
+        )
+        self.recorder.add("chat", status_code, elapsed)
+
+    def upload(self):
+        body, content_type = multipart({}, "file", f"load-{uuid.uuid4().hex[:8]}.txt", self.payload)
+        status_code, data, elapsed = http(
+            "POST", f"{self.base_url}/api/upload", body, {**self.headers, "Content-Type": content_type}
+        )
+        self.recorder.add("upload", status_code, elapsed)
+        if status_code == 200:
+            self.task_ids.append(json.loads(data)["task_id"])
+
+    def status(self):
+        if not self.task_ids:
+            return self.upload()
+        task_id = self.random.choice(self.task_ids[-5:])
+        status_code, _, elapsed = http("GET", f"{self.base_url}/api/upload/status/{task_id}", headers=self.headers)
+        self.recorder.add("status", status_code, elapsed)
+
+    def run(self):
+        if not self.login():
+            return
+        actions = list(self.mix)
+        weights = [self.mix[a] for a in actions]
+        while time() < self.deadline:
+            getattr(self, self.random.choices(actions, weights)[0])()
+
+
+# ===== 집계 =====
+
+def percentile(sorted_values: list, p: float):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def summarize(recorder: Recorder, duration: float) -> dict:
+    summary = {}
+    for endpoint, samples in sorted(recorder.samples.items()):
+        latencies = sorted(elapsed for elapsed, _ in samples)
+        ok = sum(1 for _, code in samples if 200 <= code < 300)
+        throttled = sum(1 for _, code in samples if code == 429)
+        summary[endpoint] = {
+            "requests": len(samples),
+            "throughput_rps": round(len(samples) / duration, 2),
+            "error_rate": round((len(samples) - ok) / len(samples), 4),
+            "throttled_429": throttled,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        }
+    return summary
+
+
+def print_table(results: list):
+    print(f"\n{'conc':>5} {'endpoint':<8} {'reqs':>6} {'rps':>8} {'err%':>6} {'429':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for level in results:
+        for endpoint, row in level["endpoints"].items():
+            print(
+                f"{level['concurrency']:>5} {endpoint:<8} {row['requests']:>6} {row['throughput_rps']:>8.2f} "
+                f"{row['error_rate'] * 100:>5.1f}% {row['throttled_429']:>5} "
+                f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}"
+            )
+
+
+# ===== in-process 서버 =====
+
+def start_server(port: int):
+    import uvicorn
+    from app.main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        status_code, _, _ = http("GET", f"{base_url}/api/ready", timeout=1)
+        if status_code == 200:
+            return server, thread
+        sleep(0.05)
+    raise RuntimeError("Server did not become ready")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_index():
+    """검색 결과가 비어 있지 않도록 기본 인덱스에 샘플 청크 적재"""
+    from benchmarks.run import sample_chunks, _quiet
+    from app.services.search_service import index_processed_chunks
+
+    _quiet(index_processed_chunks)(sample_chunks(30))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 부하 테스트 (동시성 단계별)")
+    parser.add_argument("--url", default=None, help="대상 서버 (지정하지 않으면 fake 의존성으로 앱을 직접 띄움)")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="동시 사용자 수 단계 (쉼표 구분)")
+    parser.add_argument("--duration", type=float, default=10, help="단계별 측정 시간(초)")
+    parser.add_argument("--mix", default="chat=70,upload=10,status=20", help="요청 비율")
+    parser.add_argument("--upload-paragraphs", type=int, default=10, help="업로드 파일 크기 (문단 수)")
+    parser.add_argument("--latency", type=float, default=0.05, help="[in-process] fake 서비스 호출당 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    mix = {name: float(weight) for name, weight in (item.split("=") for item in args.mix.split(","))}
+    levels = [int(c) for c in args.concurrency.split(",")]
+    payload = sample_text(args.upload_paragraphs).encode("utf-8")
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        fakes.install_fakes(fakes.FakeProfile(
+            latency=args.latency, jitter=args.jitter,
+            error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=7
+        ))
+        seed_index()
+        server, _ = start_server(free_port())
+        base_url = f"http://127.0.0.1:{server.config.port}"
+        print(f"🚀 In-process server with fakes: {base_url} (latency {args.latency}s ± {args.jitter}s)")
+
+    results = []
+    for concurrency in levels:
+        recorder = Recorder()
+        started = time()
+        users = [
+            VirtualUser(base_url, TEST_ACCOUNTS[i % len(TEST_ACCOUNTS)], mix, started + args.duration,
+                        recorder, payload, seed=i)
+            for i in range(concurrency)
+        ]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        elapsed = time() - started
+        results.append({"concurrency": concurrency, "duration": round(elapsed, 2), "endpoints": summarize(recorder, elapsed)})
+        print(f"  concurrency {concurrency}: done in {elapsed:.1f}s")
+
+    print_table(results)
+
+    commit = _git_commit()
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"loadtest_{datetime.now():%Y%m%d-%H%M%S}_{commit}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "target": args.url or "in-process",
+            "config": {
+                "concurrency": levels, "duration": args.duration, "mix": mix,
+                "latency": args.latency, "jitter": args.jitter,
+                "error_rate": args.error_rate, "throttle_rate": args.throttle_rate,
+            },
+            "results": results,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Results saved: {output}")
+
+    if server is not None:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+# 오프라인 벤치마크 (외부 의존성은 benchmarks/fakes.py의 in-process fake 사용)
+# 사용법:
+#   python -m benchmarks.run                          # 전체 실행, benchmarks/results/에 JSON 저장
+#   python -m benchmarks.run --only stage.             # 이름 prefix로 골라서 실행
+#   python -m benchmarks.run --latency 0.02 --throttle-rate 0.05
+#   python -m benchmarks.run --compare benchmarks/results/<이전 결과>.json
+#
+# - stage.*   : 순수 로컬 단계 (청크 매핑, 직렬화, 배치 분할, id 부여, 텍스트 추출)
+# - service.* : 서비스 함수 (index_processed_chunks, search_documents, process_file_background)
+# - api.*     : HTTP 엔드포인트 (/api/chat) - TestClient 사용
+
+from benchmarks import fakes  # app보다 먼저 (가짜 환경 변수 설정)
+
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from time import perf_counter
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SAMPLE_PARAGRAPH = (
+    "인수인계 대상 시스템은 주문 처리 배치와 정산 API로 구성되어 있으며, "
+    "매일 새벽 2시에 배치가 실행됩니다. 장애 발생 시 운영팀 채널에 알림이 전송되고 "
+    "담당자는 재처리 스크립트를 실행해야 합니다. "
+)
+
+
+def sample_text(paragraphs: int) -> str:
+    return "\n\n".join(f"{i}. {SAMPLE_PARAGRAPH * 3}" for i in range(paragraphs))
+
+
+def sample_chunks(count: int) -> list:
+    from app.services.search_service import assign_stable_chunk_ids
+
+    chunks = fakes._fake_chunks(sample_text(count), chunk_chars=1)
+    return assign_stable_chunk_ids(chunks, "bench.txt")
+
+
+def sample_docx(paragraphs: int) -> bytes:
+    from docx import Document
+
+    document = Document()
+    for i in range(paragraphs):
+        document.add_paragraph(f"{i}. {SAMPLE_PARAGRAPH * 3}")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _quiet(fn):
+    """서비스 코드의 print/traceback 출력이 측정/결과 화면을 덮지 않도록 stdout/stderr 억제"""
+    def wrapper(*args, **kwargs):
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr = io.StringIO()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+    return wrapper
+
+
+def measure(name: str, fn, setup=None, runs: int = 5, warmup: int = 1) -> dict:
+    """fn을 runs번 실행해서 통계 반환 (setup()의 반환값을 fn 인자로 전달, setup 시간은 제외)"""
+    samples = []
+    errors = {}
+    for i in range(warmup + runs):
+        arg = setup() if setup else None
+        started = perf_counter()
+        try:
+            _quiet(fn)(arg) if setup else _quiet(fn)()
+        except Exception as e:
+            # 오류/429 주입 시 실패한 실행은 시간 통계에서 제외하고 횟수만 기록
+            if i >= warmup:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        elapsed = perf_counter() - started
+        if i >= warmup:
+            samples.append(elapsed)
+
+    samples.sort()
+    result = {"name": name, "runs": runs, "errors": sum(errors.values()), "error_types": errors}
+    if samples:
+        result.update({
+            "mean_ms": round(statistics.mean(samples) * 1000, 3),
+            "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+            "min_ms": round(samples[0] * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3),
+        })
+        print(f"  {name:<52} p50 {result['p50_ms']:>10.2f} ms   p95 {result['p95_ms']:>10.2f} ms   errors {result['errors']}")
+    else:
+        result.update({"mean_ms": None, "p50_ms": None, "p95_ms": None, "min_ms": None, "max_ms": None})
+        print(f"  {name:<52} all {runs} runs failed: {errors}")
+    return result
+
+
+# ===== 벤치마크 정의 =====
+
+def bench_stage(args) -> list:
+    from app.services.search_service import build_search_document, build_embedding_input, assign_stable_chunk_ids
+    from app.services.index_writer import split_batches
+    from app.services.document_service import extract_text_from_docx
+
+    chunks = sample_chunks(args.chunks)
+    vector = fakes.fake_embedding("bench")
+    documents = [build_search_document(copy.deepcopy(c), vector) for c in chunks]
+    docx_bytes = sample_docx(args.chunks)
+
+    return [
+        measure(f"stage.embedding_input[{len(chunks)}]", lambda: [build_embedding_input(c) for c in chunks], runs=args.runs),
+        measure(
+            f"stage.chunk_mapping[{len(chunks)}]",
+            lambda batch: [build_search_document(c, vector) for c in batch],
+            setup=lambda: copy.deepcopy(chunks), runs=args.runs
+        ),
+        measure(
+            f"stage.stable_ids[{len(chunks)}]",
+            lambda batch: assign_stable_chunk_ids(batch, "bench.txt"),
+            setup=lambda: copy.deepcopy(chunks), runs=args.runs
+        ),
+        measure(f"stage.serialize_processed_json[{len(chunks)}]", lambda: json.dumps(chunks, ensure_ascii=False, indent=2), runs=args.runs),
+        measure(f"stage.split_batches[{len(documents)}]", lambda: split_batches(documents), runs=args.runs),
+        measure(f"stage.extract_docx[{args.chunks} paragraphs]", lambda: extract_text_from_docx(docx_bytes), runs=args.runs),
+    ]
+
+
+def bench_service(args) -> list:
+    from app.services.search_service import index_processed_chunks, search_documents
+    from app.routers.upload import process_file_background
+    from app.state import task_manager
+
+    results = []
+    index_name = "bench-index"
+
+    def fresh_env():
+        env = fakes.install_fakes(args.profile, document_throttle_rate=args.document_throttle_rate)
+        return env
+
+    # 새 인덱스에 전체 청크 인덱싱 (임베딩 + 인덱스 생성 + 배치 업로드)
+    def index_setup():
+        fresh_env()
+        return copy.deepcopy(sample_chunks(args.chunks))
+
+    results.append(measure(
+        f"service.index_processed_chunks[{args.chunks}]",
+        lambda chunks: index_processed_chunks(chunks, index_name=index_name),
+        setup=index_setup, runs=args.runs
+    ))
+
+    # 같은 파일 재인덱싱 (변경 없음 → 임베딩/업로드 생략 경로)
+    def reindex_setup():
+        fresh_env()
+        chunks = sample_chunks(args.chunks)
+        _quiet(index_processed_chunks)(copy.deepcopy(chunks), index_name=index_name)
+        return chunks
+
+    results.append(measure(
+        f"service.index_processed_chunks.unchanged[{args.chunks}]",
+        lambda chunks: index_processed_chunks(chunks, index_name=index_name),
+        setup=reindex_setup, runs=args.runs
+    ))
+
+    # 하이브리드 검색
+    fresh_env()
+    _quiet(index_processed_chunks)(sample_chunks(args.chunks), index_name=index_name)
+    results.append(measure(
+        "service.search_documents",
+        lambda: search_documents("정산 배치 장애 재처리", top_k=5, index_name=index_name),
+        runs=args.runs
+    ))
+
+    # 업로드 파이프라인 전체 (Blob → 추출 → LLM → 저장 → 인덱싱)
+    payload = sample_text(args.chunks).encode("utf-8")
+
+    def pipeline_setup():
+        fresh_env()
+        task_id = f"bench-{perf_counter()}"
+        task_manager.create_task(task_id)
+        return task_id
+
+    def run_pipeline(task_id):
+        process_file_background(task_id, "bench.txt", payload, "txt", index_name)
+        status = task_manager.get_task(task_id)["status"]
+        if status not in ("completed", "completed_with_warning"):
+            raise RuntimeError(f"pipeline ended with status {status}")
+
+    results.append(measure(
+        f"service.process_file_background[txt, {args.chunks} paragraphs]",
+        run_pipeline, setup=pipeline_setup, runs=args.runs
+    ))
+    return results
+
+
+def bench_api(args) -> list:
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.search_service import index_processed_chunks
+
+    fakes.install_fakes(args.profile)
+    _quiet(index_processed_chunks)(sample_chunks(args.chunks))
+
+    with TestClient(app) as client:
+        login = client.post("/api/auth/login", json={"email": "user1@company.com", "password": "password123"}).json()
+        headers = {"Authorization": f"Bearer {login['access_token']}", "X-CSRF-Token": login["csrf_token"]}
+        body = {"messages": [{"role": "user", "content": "정산 배치 장애 시 어떻게 하나요?"}]}
+
+        def chat():
+            response = client.post("/api/chat", json=body, headers=headers)
+            response.raise_for_status()
+
+        return [measure("api.chat", chat, runs=args.runs)]
+
+
+SUITES = [("stage", bench_stage), ("service", bench_service), ("api", bench_api)]
+
+
+# ===== 결과 저장 / 비교 =====
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: list, previous_path: str):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"\n📈 Compared with {os.path.basename(previous_path)} (p50)")
+    for result in current:
+        before = previous.get(result["name"])
+        if not before or not before["p50_ms"] or result["p50_ms"] is None:
+            continue
+        change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100
+        marker = "⚠️" if change > 10 else "  "
+        print(f"{marker} {result['name']:<52} {before['p50_ms']:>10.2f} → {result['p50_ms']:>10.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크 (fake 의존성)")
+    parser.add_argument("--only", default=None, help="이름이 이 prefix로 시작하는 벤치마크만 (stage., service., api.)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chunks", type=int, default=50, help="청크/문단 수")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake 서비스 호출당 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="호출 단위 429 비율")
+    parser.add_argument("--document-throttle-rate", type=float, default=0.0, help="인덱싱 결과 문서 단위 429 비율")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: benchmarks/results/<시각>_<커밋>.json)")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    args.profile = fakes.FakeProfile(
+        latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=42
+    )
+
+    results = []
+    for suite, run in SUITES:
+        if args.only and not (args.only.startswith(suite) or suite.startswith(args.only.rstrip("."))):
+            continue
+        print(f"\n[{suite}]")
+        results.extend(run(args))
+    if args.only:
+        results = [r for r in results if r["name"].startswith(args.only)]
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "runs": args.runs, "chunks": args.chunks, "latency": args.latency, "jitter": args.jitter,
+            "error_rate": args.error_rate, "throttle_rate": args.throttle_rate,
+            "document_throttle_rate": args.document_throttle_rate,
+        },
+        "results": results,
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}_{commit}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Results saved: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# 백엔드 시작 시간 리포트 (python -X importtime 기반)
+# 사용법:
+#   python -m benchmarks.startup                 # 리포트 출력 + 예산 검사 (초과 시 exit 1)
+#   python -m benchmarks.startup --top 30 --runs 5
+#   STARTUP_BUDGET_MS=800 python -m benchmarks.startup
+#
+# - `import app.main`을 새 프로세스에서 여러 번 실행해서 wall-clock 중앙값을 예산과 비교
+# - importtime 출력으로 누적 시간이 큰 모듈 상위 N개를 보여줌
+# - 무거운 SDK가 시작 시점에 import되면 실패 (처음 사용할 때 import되어야 함)
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+# 시작 시점에 로드되면 안 되는 모듈 (lazy import 대상)
+LAZY_MODULES = [
+    "azure.search.documents",
+    "azure.ai.formrecognizer",
+    "azure.storage.blob",
+    "azure.identity",
+    "azure.keyvault",
+    "openai",
+    "docx",
+]
+
+
+def parse_importtime(stderr: str) -> list:
+    """importtime 출력 → [(module, self_us, cumulative_us), ...]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # "import time:      6592 |      97417 |     openai.types"
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module: str) -> tuple:
+    """새 인터프리터에서 module import (wall-clock ms, importtime 행)"""
+    started = perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    elapsed_ms = (perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return elapsed_ms, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="백엔드 시작 시간 리포트")
+    parser.add_argument("--module", default="app.main", help="측정할 모듈")
+    parser.add_argument("--runs", type=int, default=3, help="측정 횟수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=20, help="표시할 상위 모듈 수")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="시작 시간 예산 (ms)")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    measure(args.module)  # 워밍업 (.pyc 생성, 파일시스템 캐시)
+    samples = []
+    rows = []
+    for _ in range(args.runs):
+        elapsed_ms, rows = measure(args.module)
+        samples.append(elapsed_ms)
+    median_ms = statistics.median(samples)
+
+    loaded = {module for module, _, _ in rows}
+    eager = [name for name in LAZY_MODULES if any(m == name or m.startswith(name + ".") for m in loaded)]
+
+    print(f"\n📊 import {args.module}: median {median_ms:.0f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for module, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {module}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "module": args.module,
+                "samples_ms": [round(s, 1) for s in samples],
+                "median_ms": round(median_ms, 1),
+                "budget_ms": args.budget_ms,
+                "eager_heavy_modules": eager,
+                "top_modules": [
+                    {"module": m, "self_ms": s / 1000, "cumulative_ms": c / 1000}
+                    for m, s, c in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]
+                ],
+            }, f, ensure_ascii=False, indent=2)
+
+    failed = False
+    if eager:
+        print(f"❌ Heavy SDKs imported at startup: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"❌ Startup {median_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("✅ Startup within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -239,8 +239,9 @@ const App: React.FC = () => {
           "📚 업로드된 파일이 없음 - AI Search 인덱스에서 문서 조회..."
         );
         try {
+          // 본문은 서버가 섹션별 검색(relatedSection)으로 직접 가져옴 → 여기서는 문서가 있는지만 확인 (본문 없는 1건)
           const response = await fetchWithRetry(
-            API_ENDPOINTS.DOCUMENTS,
+            `${API_ENDPOINTS.DOCUMENTS}?page_size=1`,
             {
               headers: getAuthHeaders(), // ← 토큰 포함
             }
@@ -255,33 +256,20 @@ const App: React.FC = () => {
             window.location.href = "/";
             return;
           }
-          if (response.ok) {
-            const data = await response.json();
-            if (data.documents && data.documents.length > 0) {
-              console.log(`✅ 인덱스에서 ${data.documents.length}개 문서 조회`);
-              // 인덱스 문서들을 SourceFile 형식으로 변환
-              filesToAnalyze = data.documents.map((doc: any, idx: number) => ({
-                id: doc.id,
-                name: doc.file_name,
-                type: "text/plain",
-                content: doc.content || `[파일: ${doc.file_name}]\n`, // 실제 content 사용!
-                mimeType: "text/plain",
-              }));
-              console.log(
-                `📄 변환된 파일 수: ${
-                  filesToAnalyze.length
-                }, 총 길이: ${filesToAnalyze.reduce(
-                  (sum, f) => sum + f.content.length,
-                  0
-                )}`
-              );
-            } else {
-              alert(
-                "업로드된 파일도 없고, AI Search 인덱스에도 문서가 없습니다. 먼저 자료를 추가해주세요!"
-              );
-              setIsProcessing(false);
-              return;
-            }
+          if (!response.ok) {
+            throw new Error(`문서 목록 조회 실패 (HTTP ${response.status})`);
+          }
+          const data = await response.json();
+
+          if ((data.documents || []).length > 0) {
+            console.log("✅ 인덱스에 문서 있음 - 서버에서 섹션별로 검색하여 생성");
+            filesToAnalyze = [];
+          } else {
+            alert(
+              "업로드된 파일도 없고, AI Search 인덱스에도 문서가 없습니다. 먼저 자료를 추가해주세요!"
+            );
+            setIsProcessing(false);
+            return;
           }
         } catch (error) {
           console.error("❌ 인덱스 조회 실패:", error);
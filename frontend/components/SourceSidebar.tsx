@@ -76,6 +76,10 @@ const SourceSidebar: React.FC<Props> = ({
         // 모든 파일을 백엔드로 업로드 (RAG 파이프라인 처리)
         const formData = new FormData();
         formData.append("file", file);
+        // 폴더 업로드면 상대 경로를 파일 식별자로 사용 (다른 폴더의 같은 이름 파일과 구분)
+        if (file.webkitRelativePath) {
+          formData.append("source_path", file.webkitRelativePath);
+        }
         // RAG 인덱스 선택 정보 전송
         if (selectedIndex) {
           formData.append("index_name", selectedIndex);
@@ -264,7 +264,10 @@ export const analyzeFilesForHandover = async (
       },
       {
         role: "user",
-        content: `다음 자료를 분석해 인수인계서 JSON을 만들어줘. 파일이 없으면 샘플 데이터로 만들어줘:\n\n${fileContext}`,
+        // 파일이 없으면 빈 메시지 → 서버가 인덱스에서 섹션별로 자료를 검색
+        content: fileContext
+          ? `다음 자료를 분석해 인수인계서 JSON을 만들어줘:\n\n${fileContext}`
+          : "",
       },
     ],
     response_format: { type: "json_object" },
@@ -0,0 +1,33 @@
+# 테스트 공통 설정
+# benchmarks.fakes는 import 시 가짜 환경변수를 채우므로 app.config보다 먼저 import 해야 함
+
+import os
+import tempfile
+
+# 체크포인트 DB 등 파일은 임시 폴더에 (작업 폴더에 남지 않도록)
+os.environ.setdefault("INGEST_CHECKPOINT_PATH", os.path.join(tempfile.mkdtemp(prefix="kkuldanji-test-"), "checkpoints.db"))
+
+import pytest
+
+from benchmarks import fakes
+
+
+@pytest.fixture
+def fake_env():
+    """Azure / OpenAI / Gemini 클라이언트를 메모리 fake로 교체 (benchmarks.fakes)"""
+    return fakes.install_fakes()
+
+
+@pytest.fixture
+def client(fake_env):
+    """fake 환경에서 앱 실행 + 로그인된 TestClient (client.headers에 인증/CSRF 헤더)"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        login = test_client.post("/api/auth/login", json={"email": "user1@company.com", "password": "password123"}).json()
+        test_client.headers.update({
+            "Authorization": f"Bearer {login['access_token']}",
+            "X-CSRF-Token": login["csrf_token"],
+        })
+        yield test_client
@@ -0,0 +1,133 @@
+# app.admission - 대기열 / 사용자별 제한 / 스트리밍 슬롯 반납
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import ClientDisconnect
+
+from app.admission import AdmissionController, SlotStreamingResponse
+
+
+def _controller(max_concurrent=2, max_per_user=1, max_queue=10, queue_timeout=1.0):
+    return AdmissionController("test", max_concurrent, max_per_user, max_queue, queue_timeout)
+
+
+def test_other_user_not_blocked_by_waiter_held_by_its_own_cap():
+    async def scenario():
+        controller = _controller(max_concurrent=3, max_per_user=1)
+        await controller.acquire("alice")
+        # alice의 두 번째 요청은 사용자 제한에 걸려 대기
+        alice_waiting = asyncio.create_task(controller.acquire("alice"))
+        await asyncio.sleep(0)
+        assert len(controller.waiters) == 1
+
+        # 전체 슬롯은 남아 있으므로 bob은 바로 실행
+        await asyncio.wait_for(controller.acquire("bob"), timeout=0.1)
+        assert controller.active == 2
+        assert controller.active_per_user == {"alice": 1, "bob": 1}
+
+        controller.release("alice")
+        await asyncio.wait_for(alice_waiting, timeout=0.1)
+        assert controller.active_per_user == {"alice": 1, "bob": 1}
+
+    asyncio.run(scenario())
+
+
+def test_eligible_waiter_keeps_its_place_in_line():
+    async def scenario():
+        controller = _controller(max_concurrent=1, max_per_user=1)
+        await controller.acquire("alice")
+        bob_waiting = asyncio.create_task(controller.acquire("bob"))
+        await asyncio.sleep(0)
+
+        # 슬롯이 반납되면 먼저 기다린 bob이 받음 (새로 온 carol이 끼어들지 않음)
+        controller.release("alice")
+        carol_waiting = asyncio.create_task(controller.acquire("carol"))
+        await asyncio.wait_for(bob_waiting, timeout=0.1)
+        await asyncio.sleep(0)
+        assert not carol_waiting.done()
+        assert controller.active_per_user == {"bob": 1}
+
+        controller.release("bob")
+        await asyncio.wait_for(carol_waiting, timeout=0.1)
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_and_timeout_return_429():
+    async def scenario():
+        controller = _controller(max_concurrent=1, max_per_user=1, max_queue=1, queue_timeout=0.05)
+        await controller.acquire("alice")
+        waiting = asyncio.create_task(controller.acquire("bob"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as full:
+            await controller.acquire("carol")
+        assert full.value.status_code == 429
+        assert "Retry-After" in full.value.headers
+
+        with pytest.raises(HTTPException) as timeout:
+            await waiting
+        assert timeout.value.status_code == 429
+        assert not controller.waiters
+        assert (controller.rejected_queue_full, controller.rejected_timeout) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_streaming_slot_released_when_stream_never_starts():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire("alice")
+        started = []
+
+        async def body():
+            started.append(True)
+            yield b"never sent"
+
+        response = SlotStreamingResponse(body(), controller, "alice", media_type="application/x-ndjson")
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # 헤더를 보내기 전에 클라이언트 연결이 끊김
+            raise OSError("client disconnected")
+
+        with pytest.raises((OSError, ClientDisconnect)):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        assert not started
+        assert controller.active == 0
+
+        # 반납은 한 번만
+        response.release_slot()
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_streaming_slot_released_after_stream_completes():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire("alice")
+
+        async def body():
+            assert controller.active == 1
+            yield b"line\n"
+
+        sent = []
+
+        async def receive():
+            await asyncio.sleep(1)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        response = SlotStreamingResponse(body(), controller, "alice")
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        assert any(message.get("body") == b"line\n" for message in sent)
+        assert controller.active == 0 and controller.active_per_user == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,74 @@
+# 줄 번호 기반 청크 재구성
+from app.services.chunk_spans import number_lines, rebuild_chunks
+
+TEXT = "첫째 줄\n둘째 줄\n\n셋째 줄\n넷째 줄\n다섯째 줄\n여섯째 줄\n"
+
+
+def _rebuild(ranges, text=TEXT, **kwargs):
+    _, segments = number_lines(text)
+    chunks = [{"startLine": start, "endLine": end, "chunkSummary": f"c{i}"} for i, (start, end) in enumerate(ranges)]
+    return rebuild_chunks(chunks, text, segments, **kwargs)
+
+
+def _lines(chunk):
+    return chunk["chunkMeta"]["startLine"], chunk["chunkMeta"]["endLine"]
+
+
+def test_number_lines_skips_blank_lines():
+    numbered, segments = number_lines(TEXT)
+
+    assert numbered.splitlines()[2] == "L3: 셋째 줄"
+    assert len(segments) == 6
+    assert TEXT[slice(*segments[2])] == "셋째 줄"
+
+
+def test_long_line_is_split_into_segments():
+    text = "가나다 " * 50
+    _, segments = number_lines(text, max_chars=40)
+
+    assert len(segments) > 1
+    assert all(end - start <= 40 for start, end in segments)
+    assert "".join(text[start:end] for start, end in segments) == text
+
+
+def test_overlapping_ranges_are_trimmed():
+    chunks = _rebuild([(1, 3), (2, 6)])
+
+    assert [chunk["content"] for chunk in chunks] == ["첫째 줄\n둘째 줄\n\n셋째 줄", "넷째 줄\n다섯째 줄\n여섯째 줄"]
+    # 원본 파일 줄 번호 (빈 줄 포함)
+    assert [_lines(chunk) for chunk in chunks] == [(1, 4), (5, 7)]
+
+
+def test_gaps_are_absorbed_by_previous_chunk():
+    chunks = _rebuild([(2, 2), (5, 6)])
+
+    assert chunks[0]["content"].startswith("첫째 줄")
+    assert chunks[0]["content"].endswith("넷째 줄")
+    assert chunks[1]["content"] == "다섯째 줄\n여섯째 줄"
+    assert "".join(chunk["content"] for chunk in chunks).replace("\n", "") == TEXT.replace("\n", "")
+
+
+def test_unusable_ranges_are_dropped():
+    _, segments = number_lines(TEXT)
+    chunks = [
+        {"startLine": 1, "endLine": 4, "chunkSummary": "a"},
+        {"startLine": 2, "endLine": 3, "chunkSummary": "inside a"},
+        {"startLine": 5, "chunkSummary": "no end"},
+        {"startLine": "L9", "endLine": "L12", "chunkSummary": "past end"},
+        {"startLine": "L5", "endLine": "L40", "chunkSummary": "clamped"},
+    ]
+
+    rebuilt = rebuild_chunks(chunks, TEXT, segments)
+
+    assert [chunk["chunkSummary"] for chunk in rebuilt] == ["a", "clamped"]
+    assert rebuilt[-1]["content"] == "다섯째 줄\n여섯째 줄"
+    assert [chunk["chunkMeta"]["index"] for chunk in rebuilt] == [1, 2]
+    assert rebuilt[-1]["chunkMeta"]["isLast"] and rebuilt[-1]["chunkMeta"]["total"] == 2
+
+
+def test_code_chunks_get_raw_code_and_document_fields():
+    chunks = _rebuild([(1, 6)], file_type="code", document={"language": "python", "unknown": "x"})
+
+    assert chunks[0]["rawCode"] == TEXT.rstrip("\n")
+    assert chunks[0]["language"] == "python" and "unknown" not in chunks[0]
+    assert chunks[0]["content"] == chunks[0]["rawCode"]
@@ -0,0 +1,63 @@
+# app.services.search_service - 문서 목록 페이지네이션
+
+import pytest
+
+from app.services import search_service
+from app.services.search_service import (
+    DocumentListTruncated,
+    create_index_if_not_exists,
+    get_search_client,
+    iter_documents,
+    list_documents_page,
+)
+
+
+def _fill(index_name: str, count: int):
+    create_index_if_not_exists(index_name)
+    get_search_client(index_name=index_name).upload_documents([
+        {"id": f"doc-{i:04d}", "fileName": f"f{i}.txt", "content": f"본문 {i}"} for i in range(count)
+    ])
+
+
+@pytest.mark.parametrize("sortable", [True, False])
+def test_pages_cover_every_document_once(fake_env, sortable):
+    _fill("docs", 23)
+    search_service._id_sortable_cache["docs"] = sortable
+
+    seen, cursor = [], None
+    while True:
+        page = list_documents_page("docs", cursor=cursor, page_size=5)
+        assert not page["truncated"]
+        seen += [doc["id"] for doc in page["documents"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert sorted(seen) == [f"doc-{i:04d}" for i in range(23)]
+    assert "content" not in page["documents"][0]
+
+
+def test_skip_limit_is_reported_not_silent(fake_env, monkeypatch):
+    _fill("docs", 12)
+    search_service._id_sortable_cache["docs"] = False
+    monkeypatch.setattr(search_service, "MAX_SKIP", 5)
+
+    first = list_documents_page("docs", page_size=5)
+    second = list_documents_page("docs", cursor=first["next_cursor"], page_size=5)
+    assert second["truncated"] and second["next_cursor"] is None
+
+    with pytest.raises(DocumentListTruncated):
+        list(iter_documents("docs", page_size=5))
+
+
+def test_listing_with_content_requires_login(client):
+    _fill("docs", 3)
+    auth = client.headers.pop("Authorization")
+
+    assert client.get("/api/upload/documents", params={"index_name": "docs"}).status_code == 200
+    assert client.get("/api/upload/documents", params={"index_name": "docs", "include_content": True}).status_code == 401
+
+    client.headers["Authorization"] = auth
+    page = client.get("/api/upload/documents", params={"index_name": "docs", "include_content": True}).json()
+    assert page["count"] == 3
+    assert all("content" in doc for doc in page["documents"])
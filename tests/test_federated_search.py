@@ -0,0 +1,59 @@
+# 여러 인덱스 검색 결과 병합 (Reciprocal Rank Fusion)
+import time
+
+from app.config import FEDERATED_RRF_K
+from app.services import search_service
+from app.services.search_service import fuse_ranked_results
+
+
+def _docs(*ids):
+    return [{"id": doc_id, "content": doc_id} for doc_id in ids]
+
+
+def test_same_chunk_in_two_indexes_is_fused():
+    results = {
+        "team-a": _docs("file_x_1", "file_y_1"),
+        "team-b": _docs("file_z_1", "file_x_1"),
+    }
+
+    merged = fuse_ranked_results(results, ["team-a", "team-b"], top_k=10)
+
+    assert [doc["id"] for doc in merged][0] == "file_x_1"
+    top = merged[0]
+    assert top["fused_score"] == 1 / (FEDERATED_RRF_K + 1) + 1 / (FEDERATED_RRF_K + 2)
+    assert top["index_name"] == "team-a" and top["index_names"] == ["team-a", "team-b"]
+    assert len(merged) == 3
+
+
+def test_legacy_ids_are_not_fused_across_indexes():
+    results = {"team-a": _docs("chunk_1"), "team-b": _docs("chunk_1")}
+
+    merged = fuse_ranked_results(results, ["team-a", "team-b"], top_k=10)
+
+    assert [(doc["index_name"], doc["id"]) for doc in merged] == [("team-a", "chunk_1"), ("team-b", "chunk_1")]
+
+
+def test_ties_break_by_index_order_then_rank():
+    results = {
+        "team-b": _docs("file_b1", "file_b2"),
+        "team-a": _docs("file_a1", "file_a2"),
+    }
+
+    for _ in range(3):
+        merged = fuse_ranked_results(results, ["team-a", "team-b"], top_k=4)
+        assert [doc["id"] for doc in merged] == ["file_a1", "file_b1", "file_a2", "file_b2"]
+
+
+def test_slow_index_is_dropped_after_its_own_deadline(fake_env, monkeypatch):
+    def fake_search(query, filters, top_k, index_name, query_embedding):
+        if index_name == "slow":
+            time.sleep(1.0)
+        return _docs(f"file_{index_name}")
+
+    monkeypatch.setattr(search_service, "search_documents", fake_search)
+    started = time.monotonic()
+
+    merged = search_service.search_documents_federated("질문", ["fast", "slow"], timeout=0.2)
+
+    assert time.monotonic() - started < 0.9
+    assert [doc["index_name"] for doc in merged] == ["fast"]
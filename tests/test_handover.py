@@ -0,0 +1,84 @@
+# 인수인계서 섹션 생성 - 모델 라우팅 / 섹션 캐시
+from types import SimpleNamespace
+
+from app.services import handover_service, openai_service
+
+FAST_ROUTE = {"operation": "generate_handover_section", "tier": "fast", "model": "fast-model",
+              "reason": "test", "escalate_to": "big-model"}
+
+
+class _StubCompletions:
+    """모델별로 정해진 응답을 돌려주는 chat.completions"""
+
+    def __init__(self, replies: dict):
+        self.replies = replies
+        self.models = []
+
+    def create(self, model=None, **kwargs):
+        self.models.append(model)
+        message = SimpleNamespace(content=self.replies[model])
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def _stub_client(monkeypatch, replies: dict) -> _StubCompletions:
+    completions = _StubCompletions(replies)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(openai_service, "get_openai_client", lambda: client)
+    monkeypatch.setattr(openai_service, "route_model", lambda *args, **kwargs: dict(FAST_ROUTE))
+    return completions
+
+
+def test_invalid_json_from_fast_tier_escalates(monkeypatch):
+    completions = _stub_client(monkeypatch, {
+        "fast-model": '{"risks": [깨진 JSON',
+        "big-model": '{"risks": ["일정 지연"]}',
+    })
+
+    value = openai_service.generate_handover_section("risks", "[]", "자료")
+
+    assert value == ["일정 지연"]
+    assert completions.models == ["fast-model", "big-model"]
+
+
+def test_valid_json_from_fast_tier_is_kept(monkeypatch):
+    completions = _stub_client(monkeypatch, {"fast-model": '{"risks": []}', "big-model": "unused"})
+
+    assert openai_service.generate_handover_section("risks", "[]", "자료") == []
+    assert completions.models == ["fast-model"]
+
+
+def test_section_cache_is_keyed_by_model(monkeypatch):
+    handover_service.clear_section_cache()
+    chunks = [{"id": "file_a_1", "content": "위험 요소: 일정", "processedDate": "2026-01-01"}]
+    models = iter(["fast-model", "big-model"])
+    route = {}
+    calls = []
+
+    def fake_route(operation, chars=0, **kwargs):
+        return {"model": route["model"]}
+
+    def fake_generate(section, schema, context):
+        calls.append(route["model"])
+        return [route["model"]]
+
+    monkeypatch.setattr(handover_service, "route_model", fake_route)
+    monkeypatch.setattr(handover_service, "generate_handover_section", fake_generate)
+
+    route["model"] = next(models)
+    assert handover_service._generate_section("risks", chunks, "") == ["fast-model"]
+    assert handover_service._generate_section("risks", chunks, "") == ["fast-model"]
+
+    # 라우팅 설정이 바뀌면 캐시된 fast 결과를 쓰지 않음
+    route["model"] = next(models)
+    assert handover_service._generate_section("risks", chunks, "") == ["big-model"]
+    assert calls == ["fast-model", "big-model"]
+
+
+def test_section_hash_ignores_context_beyond_prompt_limit():
+    from app.config import HANDOVER_SECTION_CONTEXT_CHARS
+
+    used = "가" * HANDOVER_SECTION_CONTEXT_CHARS
+    assert handover_service.section_input_hash("risks", [], used + "뒤쪽 자료") == \
+        handover_service.section_input_hash("risks", [], used + "다른 자료")
+    assert handover_service.section_input_hash("risks", [], "자료 A") != \
+        handover_service.section_input_hash("risks", [], "자료 B")
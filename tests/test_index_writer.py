@@ -0,0 +1,92 @@
+# 인덱싱 Writer: 배치 크기 추정 / 배치 분할 / 실패 문서만 재시도
+import json
+import random
+from types import SimpleNamespace
+
+from app.services import index_writer
+from app.services.index_writer import _write_batch, document_size, split_batches
+
+
+def _document(i: int, dims: int = 3072) -> dict:
+    return {
+        "id": f"doc_{i}",
+        "content": f"본문 \"{i}\" \\ 내용\n" * 20,
+        "tags": ["업무", "tag"],
+        "chunkMeta": {"index": i, "lines": [1, 20]},
+        "content_vector": [random.uniform(-1, 1) for _ in range(dims)],
+        "isArchived": False,
+        "summary": None,
+    }
+
+
+def test_document_size_is_upper_bound_of_serialised_size():
+    for i in range(5):
+        document = _document(i)
+        actual = max(
+            len(json.dumps(document).encode("utf-8")),
+            len(json.dumps(document, ensure_ascii=False).encode("utf-8")),
+        )
+        estimate = document_size(document)
+        assert actual <= estimate < actual * 1.5
+
+
+def test_split_batches_respects_doc_and_byte_limits():
+    documents = [_document(i, dims=16) for i in range(10)]
+    size = document_size(documents[0])
+
+    batches = split_batches(documents, max_docs=3, max_bytes=10 ** 9)
+    assert [len(b) for b in batches] == [3, 3, 3, 1]
+
+    batches = split_batches(documents, max_docs=100, max_bytes=size * 2 + 1)
+    assert all(sum(document_size(d) for d in b) <= size * 2 + 1 for b in batches)
+    assert [d["id"] for b in batches for d in b] == [d["id"] for d in documents]
+
+
+class _FlakyClient:
+    """처음 한 번은 지정한 키를 503으로 실패시키는 가짜 SearchClient"""
+
+    def __init__(self, fail_once: set, fail_always: dict = None):
+        self.fail_once = set(fail_once)
+        self.fail_always = fail_always or {}
+        self.calls = []
+
+    def upload_documents(self, documents):
+        self.calls.append([d["id"] for d in documents])
+        results = []
+        for document in documents:
+            key = document["id"]
+            if key in self.fail_always:
+                results.append(SimpleNamespace(key=key, succeeded=False, status_code=self.fail_always[key],
+                                               error_message="bad"))
+            elif key in self.fail_once:
+                self.fail_once.discard(key)
+                results.append(SimpleNamespace(key=key, succeeded=False, status_code=503, error_message="busy"))
+            else:
+                results.append(SimpleNamespace(key=key, succeeded=True, status_code=201, error_message=None))
+        return results
+
+
+def test_write_batch_retries_only_failed_retryable_documents(monkeypatch):
+    monkeypatch.setattr(index_writer, "_backoff", lambda attempt: None)
+    documents = [{"id": f"doc_{i}"} for i in range(5)]
+    client = _FlakyClient(fail_once={"doc_1", "doc_3"}, fail_always={"doc_4": 400})
+    reported = {}
+
+    statuses = _write_batch(client, "upload", documents, "id", 3, lambda key, status: reported.update({key: status}))
+
+    assert client.calls == [["doc_0", "doc_1", "doc_2", "doc_3", "doc_4"], ["doc_1", "doc_3"]]
+    assert statuses["doc_1"]["succeeded"] and statuses["doc_1"]["attempts"] == 2
+    assert statuses["doc_0"]["attempts"] == 1
+    # 400은 재시도 대상이 아님
+    assert not statuses["doc_4"]["succeeded"] and statuses["doc_4"]["attempts"] == 1
+    assert reported == statuses
+
+
+def test_write_batch_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(index_writer, "_backoff", lambda attempt: None)
+    client = _FlakyClient(fail_once=set(), fail_always={"doc_0": 503})
+
+    statuses = _write_batch(client, "upload", [{"id": "doc_0"}], "id", 2, None)
+
+    assert len(client.calls) == 3
+    assert statuses["doc_0"] == {"succeeded": False, "status_code": 503, "error": "bad", "attempts": 3}
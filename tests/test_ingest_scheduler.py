@@ -0,0 +1,103 @@
+# 업로드 스케줄러 - 공정 순서 / 레인 / 결과 집계
+import threading
+import uuid
+
+from app.ingest_scheduler import IngestScheduler
+from app.state import task_manager
+
+
+def _noop(*args):
+    pass
+
+
+def _queue(scheduler, user: str, size: int = 1000, file_ext: str = "txt", lane: str = "interactive",
+           index_name: str = None) -> str:
+    task_id = f"{user}-{uuid.uuid4().hex[:6]}"
+    scheduler.submit(task_id, _noop, (), user=user, index_name=index_name, size=size, file_ext=file_ext, lane=lane)
+    return task_id
+
+
+def _dispatch_order(scheduler) -> list:
+    order = []
+    job = scheduler._pop_next()
+    while job is not None:
+        order.append(job.task_id)
+        job = scheduler._pop_next()
+    return order
+
+
+def test_new_user_is_not_stuck_behind_a_backlog():
+    # 워커 0개 - 대기열만 검사
+    scheduler = IngestScheduler(workers=0)
+    backlog = [_queue(scheduler, "a") for _ in range(5)]
+    memo = _queue(scheduler, "b")
+
+    assert scheduler.queue_position(memo) == 2
+    assert _dispatch_order(scheduler) == [backlog[0], memo] + backlog[1:]
+
+
+def test_flows_alternate_by_served_cost():
+    scheduler = IngestScheduler(workers=0)
+    a = [_queue(scheduler, "a") for _ in range(3)]
+    b = [_queue(scheduler, "b") for _ in range(3)]
+
+    assert _dispatch_order(scheduler) == [a[0], b[0], a[1], b[1], a[2], b[2]]
+
+
+def test_small_text_file_overtakes_large_pdf_in_same_flow():
+    scheduler = IngestScheduler(workers=0)
+    pdf = _queue(scheduler, "a", size=20_000_000, file_ext="pdf")
+    memo = _queue(scheduler, "a", size=2_000, file_ext="txt")
+
+    assert _dispatch_order(scheduler) == [memo, pdf]
+
+
+def test_bulk_lane_gets_every_nth_slot():
+    scheduler = IngestScheduler(workers=0, bulk_every=3)
+    bulk = [_queue(scheduler, "bulk-user", lane="bulk") for _ in range(2)]
+    interactive = [_queue(scheduler, f"user{i}") for i in range(4)]
+
+    order = _dispatch_order(scheduler)
+    assert order[:3] == interactive[:2] + [bulk[0]]
+    assert order[3:] == interactive[2:] + [bulk[1]]
+
+
+def test_positions_follow_queue_changes():
+    scheduler = IngestScheduler(workers=0)
+    first, second, third, fourth = (_queue(scheduler, user) for user in ("a", "b", "c", "d"))
+
+    assert scheduler.cancel(fourth)
+    assert scheduler.queue_position(first) == 1
+    # 앞 작업만 조회하면 뒤쪽 순서는 재현하지 않음
+    assert len(scheduler._positions["positions"]) == 1
+    assert scheduler.queue_position(third) == 3
+
+    assert scheduler.cancel(first)
+    assert scheduler.queue_position(first) is None
+    assert scheduler.queue_position(second) == 1
+    assert scheduler.queue_position(third) == 2
+
+
+def test_outcome_is_read_from_task_status():
+    scheduler = IngestScheduler(workers=1)
+    finished = threading.Semaphore(0)
+
+    def pipeline(task_id, status):
+        # process_file_background처럼 오류를 직접 잡아서 task 상태로 남김
+        task_manager.update_task(task_id, status=status)
+        finished.release()
+
+    for status in ("failed", "completed", "cancelled"):
+        task_id = str(uuid.uuid4())
+        task_manager.create_task(task_id)
+        scheduler.submit(task_id, pipeline, (task_id, status), user="a")
+    for _ in range(3):
+        assert finished.acquire(timeout=5)
+
+    scheduler.stop()
+    for _ in range(100):
+        snapshot = scheduler.snapshot()
+        if snapshot["running"] == 0:
+            break
+        threading.Event().wait(0.01)
+    assert (snapshot["completed_total"], snapshot["failed_total"], snapshot["cancelled_total"]) == (1, 1, 1)
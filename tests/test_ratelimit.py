@@ -0,0 +1,71 @@
+# 슬라이딩 윈도우 요청 제한
+import pytest
+
+from app import ratelimit
+from app.ratelimit import MemoryRateLimiter, SQLiteRateLimiter, match_route_limit, parse_limit
+
+
+class _Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 윈도우(60초) 경계에서 시작
+    clock = _Clock(6000.0)
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path, clock):
+    if request.param == "memory":
+        return MemoryRateLimiter()
+    return SQLiteRateLimiter(path=str(tmp_path / "ratelimit.db"))
+
+
+def test_limit_within_window(limiter, clock):
+    results = [limiter.hit("user:a", 3, 60) for _ in range(4)]
+
+    assert [allowed for allowed, _, _ in results] == [True, True, True, False]
+    assert [remaining for _, remaining, _ in results[:3]] == [2, 1, 0]
+    assert results[3][2] == 60
+    # 다른 키는 따로 계산
+    assert limiter.hit("user:b", 3, 60)[0]
+
+
+def test_previous_window_is_weighted_by_overlap(limiter, clock):
+    for _ in range(4):
+        assert limiter.hit("user:a", 4, 60)[0]
+
+    # 다음 윈도우 1/4 지점: 이전 4회 × 0.75 = 3 → 1회만 더 허용
+    clock.now += 60 + 15
+    assert limiter.hit("user:a", 4, 60)[0]
+    allowed, _, retry_after = limiter.hit("user:a", 4, 60)
+    assert not allowed and retry_after == 45
+
+    # 두 윈도우 이상 지나면 이전 기록 없음
+    clock.now += 120
+    assert limiter.hit("user:a", 4, 60) == (True, 3, 0)
+
+
+def test_idle_keys_are_swept(clock):
+    limiter = MemoryRateLimiter()
+    limiter.hit("user:a", 3, 60)
+    clock.now += 60
+    limiter.hit("user:b", 3, 60)
+
+    clock.now += 61
+    assert limiter.sweep() == 1
+    assert len(limiter) == 1
+
+
+def test_route_rules():
+    assert parse_limit("30/60") == (30, 60.0)
+    assert match_route_limit("POST", "/api/chat")[0] == "chat"
+    assert match_route_limit("GET", "/api/chat/history")[0] == "default"
+    assert match_route_limit("GET", "/static/app.js") is None
@@ -0,0 +1,56 @@
+# app.services.reindex_service - 파일별 최신 processed Blob만 적재 / 임베딩 설정 검증
+
+import json
+
+import pytest
+
+from benchmarks import fakes
+from app.services import reindex_service, search_service
+from app.services.blob_service import save_processed_json
+from app.services.search_service import assign_stable_chunk_ids, get_search_client
+
+
+def _save(task_id: str, file_name: str, contents: list, index_name: str = "src", with_metadata: bool = True):
+    chunks = assign_stable_chunk_ids([{"content": content} for content in contents], file_name)
+    metadata = {"parent_id": chunks[0]["parentId"]} if with_metadata else None
+    save_processed_json(f"{task_id}_processed.json", json.dumps(chunks), index_name=index_name, metadata=metadata)
+    return chunks
+
+
+def _indexed_contents(index_name: str) -> set:
+    return {doc["content"] for doc in get_search_client(index_name=index_name).search(search_text="*", select=["content"])}
+
+
+def test_reindex_keeps_only_newest_blob_per_file(fake_env):
+    _save("t1", "a.txt", ["old first", "removed later"])
+    _save("t2", "b.txt", ["other file"], with_metadata=False)
+    _save("t3", "a.txt", ["new first"], with_metadata=False)  # 메타데이터 없는 예전 형식이어도 파일 기준으로 묶임
+
+    report = reindex_service.run_reindex("src", "dst", resume=False)
+
+    assert report["blobs_superseded"] == 1
+    assert report["blobs_processed"] == 2
+    assert _indexed_contents("dst") == {"new first", "other file"}
+
+
+def test_reindex_records_embedding_settings_for_queries(fake_env):
+    _save("t1", "a.txt", ["hello"])
+    reindex_service.run_reindex("src", "small", resume=False, embedding_model="text-embedding-3-small", dimensions=1536)
+
+    search_service._embedding_settings.clear()
+    assert search_service.get_index_embedding_settings("small") == {"model": "text-embedding-3-small", "dimensions": 1536}
+    assert len(search_service.embed_for_index("query", "small")) == 1536
+    assert len(search_service.embed_for_index("query", "src")) == fakes.EMBEDDING_DIMENSIONS
+
+
+def test_reindex_rejects_mismatched_existing_index(fake_env):
+    _save("t1", "a.txt", ["hello"])
+    reindex_service.run_reindex("src", "dst", resume=False)
+
+    with pytest.raises(ValueError):
+        reindex_service.run_reindex("src", "dst", resume=False, dimensions=1536)
+
+
+def test_reindex_rejects_zero_concurrency(fake_env):
+    with pytest.raises(ValueError):
+        reindex_service.run_reindex("src", "dst", download_concurrency=0)
@@ -0,0 +1,40 @@
+# Key Vault 시크릿 캐시 - 만료 전 예약 갱신
+import threading
+from types import SimpleNamespace
+
+from app import config
+
+
+class _FakeVault:
+    def __init__(self):
+        self.version = 0
+        self.fetched = threading.Event()
+
+    def get_secret(self, name):
+        self.version += 1
+        self.fetched.set()
+        return SimpleNamespace(value=f"{name}-v{self.version}")
+
+
+def test_secret_is_refreshed_before_expiry_without_being_read(monkeypatch):
+    vault = _FakeVault()
+    monkeypatch.setattr(config, "ENVIRONMENT", "production")
+    monkeypatch.setattr(config, "get_keyvault_client", lambda: vault)
+    monkeypatch.setattr(config, "SECRET_CACHE_TTL", 0.3)
+    monkeypatch.setattr(config, "SECRET_REFRESH_AHEAD", 0.2)
+    monkeypatch.setattr(config, "_secret_cache", {})
+    monkeypatch.setattr(config, "_secret_timers", {})
+
+    assert config.get_secret("db-key") == "db-key-v1"
+    vault.fetched.clear()
+
+    # 아무도 읽지 않아도 만료 전에 갱신됨
+    assert vault.fetched.wait(timeout=2)
+    for _ in range(100):
+        if config._secret_cache["db-key"][0] == "db-key-v2":
+            break
+        threading.Event().wait(0.01)
+    assert config.get_secret("db-key") == "db-key-v2"
+
+    for timer in config._secret_timers.values():
+        timer.cancel()
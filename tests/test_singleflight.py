@@ -0,0 +1,72 @@
+# 단일 실행 병합
+import threading
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def _run_concurrently(flight, key, fn, callers: int):
+    results, errors = [], []
+    started = threading.Barrier(callers)
+
+    def call():
+        started.wait()
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return {"value": 42}
+
+    threads, results, errors = _run_concurrently(flight, "k", work, 4)
+    # 모든 호출이 합류할 시간
+    threading.Event().wait(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1] and not errors
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert all(result is results[0][0] for result, _ in results)
+
+
+def test_error_is_propagated_to_every_waiter():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def work():
+        release.wait(5)
+        raise ValueError("LLM failed")
+
+    threads, results, errors = _run_concurrently(flight, "k", work, 3)
+    threading.Event().wait(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert not results
+    assert len(errors) == 3 and all(isinstance(e, ValueError) for e in errors)
+
+
+def test_key_is_released_after_failure():
+    flight = SingleFlight("test")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+
+    assert flight.do("k", lambda: "ok") == ("ok", False)
@@ -0,0 +1,27 @@
+# 인덱스 통계 캐시 - 인덱싱 후 증분 반영
+from app.services.search_service import assign_stable_chunk_ids, index_processed_chunks
+from app.services.stats_service import get_index_stats
+
+
+def _chunks(file_name: str, *contents):
+    return assign_stable_chunk_ids([{"content": c, "paraCategory": "업무"} for c in contents], file_name)
+
+
+def test_reupload_without_sync_does_not_inflate_count(fake_env):
+    index_processed_chunks(_chunks("a.txt", "하나", "둘"), index_name="stats")
+    assert get_index_stats("stats")["count"] == 2
+
+    # 같은 문서를 비교 없이 다시 올려도 (merge_or_upload로 덮어씀) 문서 수는 그대로
+    index_processed_chunks(_chunks("a.txt", "하나", "둘"), index_name="stats", sync_file=False)
+    stats = get_index_stats("stats")
+    assert stats["count"] == 2 and not stats["cached"]
+
+
+def test_synced_upload_updates_cache_incrementally(fake_env):
+    index_processed_chunks(_chunks("b.txt", "하나"), index_name="stats")
+    assert get_index_stats("stats")["count"] == 1
+
+    index_processed_chunks(_chunks("b.txt", "하나", "셋"), index_name="stats")
+    stats = get_index_stats("stats")
+    assert stats["count"] == 2 and stats["cached"]
+    assert stats["facets"]["paraCategory"] == {"업무": 2}
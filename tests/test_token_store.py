@@ -0,0 +1,89 @@
+# 토큰 저장소 - 만료 / 정리 / 크기 제한
+import logging
+
+import pytest
+
+from app import token_store as token_store_module
+from app.token_store import MemoryTokenStore, SQLiteTokenStore, TokenStore
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(token_store_module, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        return MemoryTokenStore(max_entries=3)
+    return SQLiteTokenStore(path=str(tmp_path / "tokens.db"), max_entries=3)
+
+
+def test_expired_token_is_not_returned(store, clock):
+    store.put("csrf", "token-a", {"email": "a@company.com"}, ttl=60)
+    assert store.get("csrf", "token-a") == {"email": "a@company.com"}
+    assert store.get("refresh", "token-a") is None
+
+    clock.now += 61
+    assert store.get("csrf", "token-a") is None
+    assert store.sweep() == 1
+
+
+def test_overflow_evicts_tokens_closest_to_expiry(store, clock):
+    for name, ttl in (("short", 10), ("long", 300), ("mid", 100), ("newest", 200)):
+        store.put("csrf", name, {"name": name}, ttl=ttl)
+    # sqlite는 sweep 때 제한 적용, memory는 put 때 바로 적용
+    store.sweep()
+
+    assert store.get("csrf", "short") is None
+    assert [store.get("csrf", name)["name"] for name in ("long", "mid", "newest")] == ["long", "mid", "newest"]
+
+
+def test_memory_store_skips_stale_heap_entries(clock):
+    store = MemoryTokenStore(max_entries=2)
+    store.put("csrf", "a", {}, ttl=10)
+    # 덮어쓰기 / 삭제된 항목의 힙 기록은 제거 대상에서 건너뜀
+    store.put("csrf", "a", {"v": 2}, ttl=500)
+    store.put("csrf", "b", {}, ttl=50)
+    store.delete("csrf", "b")
+    store.put("csrf", "c", {}, ttl=100)
+    store.put("csrf", "d", {}, ttl=400)
+
+    assert len(store) == 2
+    assert store.get("csrf", "a") == {"v": 2} and store.get("csrf", "d") == {}
+    assert store.get("csrf", "c") is None
+
+
+def test_backend_must_implement_store_interface():
+    class PutOnlyStore(TokenStore):
+        def put(self, namespace, token, data, ttl):
+            pass
+
+    with pytest.raises(TypeError):
+        PutOnlyStore()
+
+
+def test_full_store_warns_once_and_counts_evictions(store, clock, caplog):
+    before = token_store_module.evicted_total._values.get((store.backend,), 0)
+    with caplog.at_level(logging.WARNING, logger=token_store_module.__name__):
+        for i in range(6):
+            store.put("csrf", f"token-{i}", {}, ttl=60 + i)
+            store.sweep()
+
+    assert len([r for r in caplog.records if r.levelno == logging.WARNING]) == 1
+    assert token_store_module.evicted_total._values[(store.backend,)] - before == 3
+
+    # 제한 아래로 내려가면 다음에 가득 찰 때 다시 경고
+    clock.now += 64
+    store.sweep()
+    assert not store._full
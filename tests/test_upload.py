@@ -0,0 +1,89 @@
+# app.routers.upload - 업로드 접수 / 같은 파일 병합
+
+import time
+
+from app.ingest_scheduler import ingest_scheduler
+
+
+def _wait(client, task_id: str, timeout: float = 10) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/api/upload/status/{task_id}").json()
+        if status["status"] not in ("pending", "queued", "processing", "cancelling"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"task {task_id} did not finish: {status}")
+
+
+def _upload(client, data: bytes, name: str = "memo.txt"):
+    return client.post("/api/upload", files={"file": (name, data, "text/plain")})
+
+
+def test_identical_uploads_share_one_task(client):
+    data = "공유 폴더 메모\n\n내용 한 줄".encode()
+    first = _upload(client, data).json()
+    second = _upload(client, data).json()
+
+    assert second["shared_with"] == first["task_id"]
+    assert _wait(client, first["task_id"])["status"] == "completed"
+    assert _wait(client, second["task_id"])["status"] == "completed"
+
+
+def test_failed_submit_does_not_leave_a_phantom_leader(client, monkeypatch):
+    data = "제출 실패 후 재시도\n\n본문".encode()
+    original_submit = ingest_scheduler.submit
+
+    def failing_submit(*args, **kwargs):
+        raise RuntimeError("scheduler unavailable")
+
+    monkeypatch.setattr(ingest_scheduler, "submit", failing_submit)
+    failed = _upload(client, data)
+    assert failed.status_code == 500
+
+    # 같은 파일을 다시 올리면 실행되지 않은 작업에 붙지 않고 새로 처리됨
+    monkeypatch.setattr(ingest_scheduler, "submit", original_submit)
+    retried = _upload(client, data).json()
+    assert "shared_with" not in retried
+    assert _wait(client, retried["task_id"])["status"] == "completed"
+
+
+def _indexed_parents(name: str) -> dict:
+    from app.services.search_service import get_search_client
+
+    index = get_search_client()
+    parents = {}
+    for document in index.documents.values():
+        if document.get("fileName") == name:
+            parents.setdefault(document["parentId"], set()).add(document["content"])
+    return parents
+
+
+def test_same_file_name_in_different_folders_keeps_both(client):
+    for folder in ("teamA", "teamB"):
+        response = client.post(
+            "/api/upload",
+            files={"file": ("report.txt", f"{folder} 보고서\n\n{folder} 본문".encode(), "text/plain")},
+            data={"source_path": f"{folder}/report.txt"},
+        )
+        assert _wait(client, response.json()["task_id"])["status"] == "completed"
+
+    parents = _indexed_parents("report.txt")
+    assert len(parents) == 2
+
+
+def test_legacy_file_name_match_only_replaces_untracked_chunks(fake_env):
+    from app.services.search_service import get_existing_chunks, get_search_client, make_parent_id
+
+    index = get_search_client()
+    index.documents.update({
+        "legacy": {"id": "legacy", "parentId": "doc_llm_1", "fileName": "notes.txt"},
+        "other": {"id": "other", "parentId": make_parent_id("notes.txt", "teamB/notes.txt"), "fileName": "notes.txt"},
+        "mine": {"id": "mine", "parentId": make_parent_id("notes.txt"), "fileName": "notes.txt"},
+    })
+
+    by_name = {doc["id"] for doc in get_existing_chunks(make_parent_id("notes.txt"), "notes.txt")}
+    assert by_name == {"legacy", "mine"}
+
+    # 경로 기준 식별자는 파일명 매칭을 쓰지 않음
+    parent_id = make_parent_id("notes.txt", "teamA/notes.txt")
+    assert get_existing_chunks(parent_id, "notes.txt") == []